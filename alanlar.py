@@ -0,0 +1,14 @@
+# --- GOOGLE SHEETS SÜTUN DÜZENİ ---
+# DİKKAT: Excel'deki sütun başlıkları bu sırayla olmalı!
+# Sıra: ID | YAS_YIL | YAS_AY | TOPLAM_AY | HGB | PLT | ... | Prokalsitonin | MODEL
+# MODEL: değerleri okuyan model (kademeli okumada hangi kademenin kullanıldığı)
+SUTUNLAR = ["ID", "YAS_YIL", "YAS_AY", "TOPLAM_AY", "HGB", "PLT", "RDW", "NEUT_HASH", "LYMPH_HASH", "IG_HASH", "CRP", "Prokalsitonin", "MODEL"]
+
+
+def satira_cevir(veri):
+    """Sözlük ya da DataFrame satırını Sheets'e yazılacak listeye çevirir."""
+    import pandas as pd   # Ağır import: ana sayfanın ilk açılışında gerekmiyor
+
+    row = [veri.get(sutun) for sutun in SUTUNLAR]
+    # NaN (Boş) değerleri temizle (Google Sheets hatasını önler)
+    return [str(x) if pd.notna(x) else "" for x in row]
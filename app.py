@@ -1,13 +1,16 @@
 import streamlit as st
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import json
-import pandas as pd
+import time
+import uuid
 from datetime import datetime
-from PIL import Image
-import requests
-import base64
-import io
+import dogrulama
+import goruntu
+import isitma
+import isler
+import kimlik_indeksi
+import okuma
+import olcum
+import ortak
+from alanlar import SUTUNLAR, satira_cevir
 
 # --- 1. AYARLAR ---
 st.set_page_config(page_title="Makale Kulübü Lab Asistanı", page_icon="👶", layout="wide")
@@ -15,42 +18,23 @@ st.set_page_config(page_title="Makale Kulübü Lab Asistanı", page_icon="👶",
 # Session State Başlatma (Hafıza)
 if 'okunan_veri' not in st.session_state:
     st.session_state.okunan_veri = None
+if 'is_kimlikleri' not in st.session_state:
+    st.session_state.is_kimlikleri = []
+if 'oturum' not in st.session_state:
+    # Okuma işleri bu oturuma bağlıdır; iş kimliğini bilen başka biri sonucu alamaz
+    st.session_state.oturum = uuid.uuid4().hex
 
-try:
-    if "GEMINI_API_KEY" in st.secrets:
-        API_KEY = st.secrets["GEMINI_API_KEY"]
-    else:
-        st.error("API Key eksik! Secrets ayarlarını kontrol et.")
-        st.stop()
-        
-    if "gcp_service_account" in st.secrets:
-        sheets_secrets = st.secrets["gcp_service_account"]
-    else:
-        st.error("Google Sheets yetkisi eksik! Secrets ayarlarını kontrol et.")
-        st.stop()
-except Exception as e:
-    st.error(f"Ayar hatası: {e}")
-    st.stop()
-
-# --- 2. GOOGLE SHEETS BAĞLANTISI ---
-try:
-    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(sheets_secrets, scope)
-    client = gspread.authorize(creds)
-    SHEET_NAME = "Hasta Takip" 
-except Exception as e:
-    st.error(f"Google Sheets Bağlantı Hatası: {e}")
-    st.stop()
-
-# --- 3. YARDIMCI FONKSİYON ---
-def image_to_base64(image):
-    buffered = io.BytesIO()
-    image.save(buffered, format="PNG")
-    return base64.b64encode(buffered.getvalue()).decode("utf-8")
-
-# --- 4. ARAYÜZ ---
+API_KEY = ortak.ayarlari_yukle()
+kayit_kuyrugu = ortak.kayit_kuyrugu()
+
+# --- ARAYÜZ ---
 st.title("👶 Makale Kulübü Lab Asistanı")
 
+ortak.kuyruk_paneli(kayit_kuyrugu)
+ortak.ayna_paneli()
+on_isleme = ortak.on_isleme_paneli()
+modeller = ortak.model_paneli()
+
 # --- YAŞ BİLGİSİ ---
 st.markdown("### 1. Hasta Bilgileri")
 st.info("Lütfen ekranda yazan yaşı giriniz. Sadece ay varsa 'Yıl' kısmını 0 bırakın.")
@@ -78,107 +62,175 @@ with col2:
     bio_file = st.file_uploader("Biyokimya Yükle / Çek", type=["jpg", "png", "jpeg"], key="bio")
 
 # --- ADIM 1: ANALİZ BUTONU (KAYDETMEZ) ---
+onbellegi_atla = st.checkbox("♻️ Önbelleği atla (modeli yeniden çalıştır)", value=False,
+                             help="Aynı fotoğraf daha önce okunduysa sonuç önbellekten anında gelir.")
+ayri_oku = st.checkbox("⚡ Hemogram ve biyokimyayı ayrı ve paralel oku", value=True,
+                       help="Her belge kendi isteğinde okunur; biri bulanıksa diğerinin değerleri yine gelir.")
+akisli = st.checkbox("📡 Değerleri geldikçe göster (akışlı okuma)", value=True)
+ortak.kota_uyarisi("gemini", "Gemini")
+
 if st.button("🔍 1. Fotoğrafları Oku (Kaydetmez)", type="primary"):
     
     if not hemo_file and not bio_file:
         st.warning("Lütfen dosya yükleyin veya fotoğraf çekin.")
         st.stop()
 
-    with st.spinner('Hmm...'):
-        try:
-            content_parts = []
-            
-            # --- PROMPT ---
-            prompt_text = """
-            GÖREV: Sen titiz bir veri giriş operatörüsün.
-            
-            YÖNTEM (SATIR TAKİP):
-            1. Sol sütunda Parametre Adını bul.
-            2. Parmağını sağa kaydır, REFERANS ARALIĞINI ATLA, SONUÇ (Result) değerini al.
-            
-            BULUNACAKLAR:
-            - HGB (Hemoglobin)
-            - PLT (Trombosit)
-            - RDW
-            - NEU# (Nötrofil Mutlak) -> Yoksa 'null'
-            - LYM# (Lenfosit Mutlak) -> Yoksa 'null'
-            - IG# (İmmatür Granülosit) -> Yoksa 'null'
-            - CRP -> Yoksa 'null'
-            - Prokalsitonin -> Yoksa 'null'
-            
-            KİMLİK:
-            - Sol üstteki İsim/Protokol -> 'ID'
-            
-            ÇIKTI (JSON):
-            { "ID": "...", "HGB": 0.0, "PLT": 0, "RDW": 0.0, "NEUT_HASH": 0.0, "LYMPH_HASH": 0.0, "IG_HASH": 0.0, "CRP": 0.0, "Prokalsitonin": 0.0 }
-            """
-            
-            content_parts.append({"text": prompt_text})
-
-            if hemo_file:
-                content_parts.append({"inline_data": {"mime_type": "image/png", "data": image_to_base64(Image.open(hemo_file))}})
-            if bio_file:
-                content_parts.append({"inline_data": {"mime_type": "image/png", "data": image_to_base64(Image.open(bio_file))}})
-
-            # MODEL: Gemini 3.0 Pro Preview
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-3-pro-preview:generateContent?key={API_KEY}"
-            
-            headers = {'Content-Type': 'application/json'}
-            payload = {"contents": [{"parts": content_parts}]}
-            
-            response = requests.post(url, headers=headers, json=payload)
-            
-            if response.status_code == 200:
-                result = response.json()
-                try:
-                    text_content = result['candidates'][0]['content']['parts'][0]['text']
-                    text_content = text_content.replace("```json", "").replace("```", "").strip()
-                    
-                    start = text_content.find('{')
-                    end = text_content.rfind('}') + 1
-                    data = json.loads(text_content[start:end] if start != -1 else text_content)
-
-                    # --- YAŞ HESAPLAMA VE VERİ BİRLEŞTİRME ---
-                    # Veriyi DataFrame'e çevirip yaş bilgilerini ekliyoruz
-                    data["YAS_YIL"] = yas_yil
-                    data["YAS_AY"] = yas_ay
-                    data["TOPLAM_AY"] = (yas_yil * 12) + yas_ay
-                    
-                    # Session State'e kaydet (Hafızaya al)
-                    st.session_state.okunan_veri = pd.DataFrame([data])
-                    
-                    # Sayfayı yenile ki editör açılsın
-                    st.rerun()
+    # Okuma arka planda iş olarak çalışır; beklerken sonraki hastanın bilgileri girilebilir
+    dosya_adi = (hemo_file or bio_file).name
+    belgeler = {"hemo": hemo_file.getvalue() if hemo_file else None, "bio": bio_file.getvalue() if bio_file else None}
+    okuma_isi = isler.get_yonetici().gonder(
+        f"{dosya_adi} · {yas_yil} yıl {yas_ay} ay",
+        okuma.hasta_oku,
+        API_KEY,
+        belgeler["hemo"],
+        belgeler["bio"],
+        yas_yil, yas_ay, on_isleme,
+        akisli=akisli,
+        bilgi=lambda sonuc: {"model": sonuc[0].get("MODEL"), "onbellek": sonuc[0]["KAYNAK"] == "🗂️ Önbellek"},
+        ek={"belgeler": {ad: b for ad, b in belgeler.items() if b}},   # Alan bazında yeniden okuma için
+        sahip=st.session_state.oturum,
+        ayri_oku=ayri_oku, onbellegi_atla=onbellegi_atla, modeller=modeller,
+    )
+    st.session_state.is_kimlikleri = st.session_state.is_kimlikleri + [okuma_isi.id]
+    st.toast(f"Okuma başladı: {dosya_adi}")
+
+
+def sonucu_yukle(okuma_isi):
+    """Biten işin sonucunu düzenleyiciye alır ve işi listeden çıkarır."""
+    data, st.session_state.okuma_uyarilari, boyut_raporlari = okuma_isi.sonuc
+    st.session_state.boyut_raporu = goruntu.rapor_metni(boyut_raporlari)
+    st.session_state.son_olcum = okuma_isi.olcum_ozeti
+    import pandas as pd   # Ağır import: ilk çizimde değil, ilk okumada (çoğunlukla ısınmada yüklenmiş olur)
+    st.session_state.okunan_veri = pd.DataFrame([data])
+    st.session_state.okunan_belgeler = okuma_isi.ek.get("belgeler", {})
+    st.session_state.dogrulanan_alanlar = set()
+    isi_kapat(okuma_isi)
+
+
+def isi_kapat(okuma_isi):
+    if okuma_isi.olcum_ozeti:
+        st.session_state.son_olcum = okuma_isi.olcum_ozeti
+    isler.get_yonetici().birak(okuma_isi.id, st.session_state.oturum)
+    st.session_state.is_kimlikleri = [i for i in st.session_state.is_kimlikleri if i != okuma_isi.id]
+
 
-                except Exception as parse_error:
-                    st.error("Veri okunamadı. Resim net olmayabilir.")
-                    st.text(text_content)
+@st.fragment(run_every=1.0)
+def okuma_isleri():
+    # Yalnızca bu bölüm saniyede bir yeniden çalışır; sayfanın geri kalanı etkilenmez
+    yonetici = isler.get_yonetici()
+    ortak.kota_uyarisi("gemini", "Gemini")
+    for is_id in list(st.session_state.is_kimlikleri):
+        okuma_isi = yonetici.getir(is_id, st.session_state.oturum)
+        if okuma_isi is None:
+            # Saklama süresi dolmuş
+            st.session_state.is_kimlikleri = [i for i in st.session_state.is_kimlikleri if i != is_id]
+            continue
+
+        with st.container(border=True):
+            c1, c2 = st.columns([5, 1])
+            if not okuma_isi.bitti_mi:
+                durum = "sırada" if okuma_isi.durum == isler.BEKLIYOR else f"{okuma_isi.gecen_sure():.0f} sn"
+                c1.markdown(f"⏳ **{okuma_isi.etiket}** · okunuyor ({durum})")
+                if c2.button("⏹️ Durdur", key=f"durdur_{is_id}"):
+                    yonetici.iptal_et(is_id, st.session_state.oturum)
+                if okuma_isi.canli:
+                    ortak.canli_degerler(st.empty(), okuma_isi.canli)
+            elif okuma_isi.durum == isler.BITTI:
+                if st.session_state.okunan_veri is None:
+                    # Düzenleyici boşsa sonuç hemen açılır
+                    sonucu_yukle(okuma_isi)
+                    st.rerun()
+                c1.markdown(f"✅ **{okuma_isi.etiket}** · okundu ({okuma_isi.gecen_sure():.0f} sn)")
+                if c2.button("📝 Düzenle", key=f"duzenle_{is_id}",
+                             help="Düzenleyicideki kaydedilmemiş verinin yerine geçer."):
+                    sonucu_yukle(okuma_isi)
+                    st.rerun()
             else:
-                st.error(f"Sunucu Hatası: {response.status_code}")
-                st.write(response.text)
+                if okuma_isi.durum == isler.IPTAL:
+                    c1.info(f"{okuma_isi.etiket}: okuma durduruldu.")
+                elif isinstance(okuma_isi.hata, okuma.AyristirmaHatasi):
+                    c1.error(f"{okuma_isi.etiket}: {okuma_isi.hata}")
+                    c1.text(okuma_isi.hata.metin)
+                elif isinstance(okuma_isi.hata, okuma.SunucuHatasi):
+                    c1.error(f"{okuma_isi.etiket}: {okuma_isi.hata}")
+                    c1.write(okuma_isi.hata.metin)
+                else:
+                    c1.error(f"{okuma_isi.etiket}: Hata: {okuma_isi.hata}")
+                if c2.button("✖️ Kapat", key=f"kapat_{is_id}"):
+                    isi_kapat(okuma_isi)
+                    st.rerun()
 
-        except Exception as e:
-            st.error(f"Hata: {e}")
+
+if st.session_state.is_kimlikleri:
+    okuma_isleri()
 
 # --- ADIM 2: KONTROL VE DÜZELTME EKRANI ---
 if st.session_state.okunan_veri is not None:
     st.markdown("---")
     st.info("⚠️ Lütfen aşağıdaki değerleri kontrol edin. Hatalı bir yer varsa **üzerine tıklayıp düzeltebilirsiniz.**")
+    if st.session_state.get("boyut_raporu"):
+        st.caption(st.session_state.boyut_raporu)
+    for uyari in st.session_state.get("okuma_uyarilari", []):
+        st.warning(uyari)
     
     # EDİTÖR: Excel gibi düzenlenebilir tablo
     # Sütun sırasını kullanıcı dostu yapalım
-    column_order = ["ID", "YAS_YIL", "YAS_AY", "TOPLAM_AY", "HGB", "PLT", "RDW", "NEUT_HASH", "LYMPH_HASH", "IG_HASH", "CRP", "Prokalsitonin"]
+    column_order = SUTUNLAR
     
     # Sadece veride var olan sütunları seç (Hata önlemek için)
-    existing_cols = [col for col in column_order if col in st.session_state.okunan_veri.columns]
+    existing_cols = [col for col in ["KAYNAK"] + column_order if col in st.session_state.okunan_veri.columns]
     
     duzenlenmis_df = st.data_editor(
         st.session_state.okunan_veri, 
         column_order=existing_cols,
+        column_config=ortak.kontrol_sutunlari(st.session_state.okunan_veri),
+        disabled=["KAYNAK", "MODEL"],
         num_rows="fixed", 
         hide_index=True,
         use_container_width=True
     )
+    # Düzeltmeler sonrası değerler yeniden kontrol edilir
+    ortak.kontrol_uyarilari(duzenlenmis_df)
+    ortak.referans_uyarilari(duzenlenmis_df)
+    ortak.indeks_degerleri(duzenlenmis_df.iloc[0])
+
+    # Tek bir değer hatalıysa yalnızca o alan yeniden okunur; elle düzeltilenlere dokunulmaz
+    dogrulanan = st.session_state.setdefault("dogrulanan_alanlar", set())
+    dogrulanan |= ortak.elle_duzeltilenler(st.session_state.okunan_veri, duzenlenmis_df)
+    belgeler = st.session_state.get("okunan_belgeler")
+    istek = ortak.alan_okuma_paneli(duzenlenmis_df.iloc[0], belgeler, dogrulanan) if belgeler else None
+    if istek:
+        alanlar, kirplar = istek
+        satir = duzenlenmis_df.iloc[0].to_dict()
+        onceki = dogrulama.tiplendir(satir)
+        alan_olcumu = olcum.Olcum("alan_okuma")
+        try:
+            with st.spinner(f"{', '.join(alanlar)} yeniden okunuyor..."):
+                yeni, alan_modelleri = alan_olcumu.calistir(
+                    okuma.alanlari_oku, API_KEY, belgeler, alanlar, on_isleme, kirplar, modeller=modeller)
+        except Exception as e:
+            st.session_state.son_olcum = alan_olcumu.sonuclandir("hata", hata=type(e).__name__)
+            st.error(f"Yeniden okuma hatası: {e}")
+        else:
+            kullanilan = list(dict.fromkeys(alan_modelleri.values()))
+            st.session_state.son_olcum = alan_olcumu.sonuclandir("basarili", model=" + ".join(kullanilan),
+                                                                 alanlar=alanlar)
+            birlesik, degisenler, bos_gelenler = okuma.birlestir(satir, yeni, dogrulanan, alan_modelleri)
+            import pandas as pd
+            # Editör yeni veriyle baştan çizilir; düzeltmeler satir üzerinden taşınır
+            st.session_state.okunan_veri = pd.DataFrame([birlesik])
+            uyarilar = st.session_state.setdefault("okuma_uyarilari", [])
+            if degisenler:
+                uyarilar.append(f"🎯 Yeniden okundu ({', '.join(kullanilan)}): "
+                                + ", ".join(f"{alan} {onceki.get(alan) or '—'} → {birlesik[alan]}" for alan in degisenler))
+            if bos_gelenler:
+                uyarilar.append(f"🎯 Yeniden okumada da bulunamadı: {', '.join(bos_gelenler)}")
+            if degisenler or bos_gelenler:
+                st.rerun()
+            st.info(f"🎯 Yeniden okunan değerler aynı çıktı: {', '.join(alanlar)}")
+    # Aynı hasta daha önce girildi mi? (bellekteki indeksten, sheet'e gitmeden)
+    indeks = ortak.kimlik_indeksi_al(kayit_kuyrugu)
+    hedef_satir = ortak.mukerrer_kontrolu(indeks, duzenlenmis_df.iloc[0].get("ID"))
     
     col_save, col_cancel = st.columns([1, 4])
     
@@ -189,29 +241,16 @@ if st.session_state.okunan_veri is not None:
                 # Düzenlenmiş veriyi al
                 final_data = duzenlenmis_df.iloc[0]
                 
-                # Google Sheets'e Kayıt (Sıraya dikkat)
-                sheet = client.open(SHEET_NAME).sheet1
-                row = [
-                    final_data.get("ID"),
-                    final_data.get("YAS_YIL"),
-                    final_data.get("YAS_AY"),
-                    final_data.get("TOPLAM_AY"),
-                    final_data.get("HGB"),
-                    final_data.get("PLT"),
-                    final_data.get("RDW"),
-                    final_data.get("NEUT_HASH"),
-                    final_data.get("LYMPH_HASH"),
-                    final_data.get("IG_HASH"),
-                    final_data.get("CRP"),
-                    final_data.get("Prokalsitonin")
-                ]
-                
-                # NaN (Boş) değerleri temizle (Google Sheets hatasını önler)
-                row = [str(x) if pd.notna(x) else "" for x in row]
+                # Önce yerel kuyruğa yaz (anında), Sheets'e arka planda gönderilir
+                # Elle girilen "12,3" gibi değerler de sayıya/sheet birimine çevrilir
+                baslangic = time.perf_counter()
+                kayit_kuyrugu.ekle(satira_cevir(dogrulama.tiplendir(final_data.to_dict())), hedef_satir=hedef_satir,
+                                   beklenen_kimlik=final_data.get("ID") if hedef_satir else None)
+                olcum.olay("kuyruga_yazma", time.perf_counter() - baslangic)
+                indeks.ekle(final_data.get("ID"), hedef_satir or kimlik_indeksi.KUYRUK)
                 
-                sheet.append_row(row)
-                
-                st.success(f"Başarıyla Kaydedildi! (ID: {final_data.get('ID')})")
+                islem = f"Satır {hedef_satir} güncellendi" if hedef_satir else "Başarıyla Kaydedildi"
+                st.success(f"{islem}! (ID: {final_data.get('ID')}) — Sheets'e arka planda gönderiliyor.")
                 
                 # Hafızayı temizle (Yeni hasta için)
                 st.session_state.okunan_veri = None
@@ -224,3 +263,8 @@ if st.session_state.okunan_veri is not None:
         if st.button("❌ İptal / Temizle"):
             st.session_state.okunan_veri = None
             st.rerun()
+
+ortak.olcum_paneli()
+
+# Form çizildi: ağır modüller ve Sheets bağlantısı arka planda hazırlansın
+isitma.baslat()
@@ -0,0 +1,19 @@
+# --- ORTAK AYARLAR ---
+# Uygulamanın yerel dosyaları (kuyruk, önbellek vb.) bu klasörde tutulur.
+import os
+
+VERI_DIZINI = os.environ.get("LAB_VERI_DIZINI", ".lab_veri")
+# Kıyaslama/test için Gemini isteklerini yerel sahte sunucuya yönlendirmek üzere değiştirilebilir
+GEMINI_API_TABANI = os.environ.get("GEMINI_API_TABANI", "https://generativelanguage.googleapis.com").rstrip("/")
+# Dış API'lerin dakikadaki istek kotası (süreçteki tüm oturumların toplamı, hiz_siniri).
+# Sheets: servis hesabı başına okuma ve yazma için ayrı ayrı 60/dk; Gemini: anahtarın kademesine göre.
+KOTALAR = {
+    "gemini": float(os.environ.get("KOTA_GEMINI", 60)),
+    "sheets_okuma": float(os.environ.get("KOTA_SHEETS_OKUMA", 60)),
+    "sheets_yazma": float(os.environ.get("KOTA_SHEETS_YAZMA", 60)),
+}
+
+
+def veri_yolu(dosya_adi):
+    os.makedirs(VERI_DIZINI, exist_ok=True)
+    return os.path.join(VERI_DIZINI, dosya_adi)
@@ -0,0 +1,200 @@
+# --- "HASTA TAKİP" SHEET'İNİN YEREL KOPYASI ---
+# Analiz ve arama için her seferinde get_all_records() ile bütün sheet'i indirmek yerine
+# yerel SQLite tablosunu güncel tutarız. Her senkronda tek bir toplu istekle bütün ID sütunu,
+# son senkron edilen satırlardan sonrası ve kontrol için son birkaç satır alınır.
+# ID sütunu ya da kontrol satırları değişmişse (satır eklenmiş, silinmiş, sıralanmış) tam
+# senkron yapılır. Uygulama bir satırın üzerine yazınca kopya "kirli" işaretlenir ve sıradaki
+# senkron tam yapılır; daha eski satırlardaki elle düzeltmeler için periyodik tam senkron vardır.
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import dogrulama
+from alanlar import SUTUNLAR
+from ayarlar import veri_yolu
+
+KONTROL_SATIRI = 20              # Her senkronda yeniden karşılaştırılan son satır sayısı
+TAM_SENKRON_ARALIGI = 24 * 3600  # Bu süreden sonra bir sonraki senkron tam yapılır (sn)
+ESKIME_SURESI = 600              # Sayfa açılınca bundan eski kopya arka planda güncellenir (sn)
+SON_SUTUN = chr(ord("A") + len(SUTUNLAR) - 1)
+_SUTUN_LISTESI = ", ".join(f'"{sutun}"' for sutun in SUTUNLAR)
+
+# Sütun tipleri: ID | YAS_YIL | YAS_AY | TOPLAM_AY | HGB | PLT | RDW | NEUT_HASH | ... | MODEL
+SUTUN_TIPLERI = {
+    "ID": "TEXT",
+    "YAS_YIL": "INTEGER",
+    "YAS_AY": "INTEGER",
+    "TOPLAM_AY": "INTEGER",
+    "HGB": "REAL",
+    "PLT": "INTEGER",
+    "RDW": "REAL",
+    "NEUT_HASH": "REAL",
+    "LYMPH_HASH": "REAL",
+    "IG_HASH": "REAL",
+    "CRP": "REAL",
+    "Prokalsitonin": "REAL",
+    "MODEL": "TEXT",
+}
+PANDAS_TIPLERI = {"TEXT": "string", "INTEGER": "Int64", "REAL": "Float64"}
+
+
+def _hucre(deger, tip):
+    if tip == "TEXT":
+        deger = str(deger).strip()
+        return deger or None
+    try:
+        sayi = dogrulama.sayiya_cevir(deger)
+    except ValueError:
+        return None
+    if sayi is None:
+        return None
+    return int(round(sayi)) if tip == "INTEGER" else sayi
+
+
+def tiplendir(ham_satir):
+    """Sheet'ten gelen metin satırını SUTUNLAR sırasıyla tipli değerlere çevirir."""
+    ham_satir = list(ham_satir) + [""] * (len(SUTUNLAR) - len(ham_satir))
+    return [_hucre(deger, SUTUN_TIPLERI[sutun]) for sutun, deger in zip(SUTUNLAR, ham_satir)]
+
+
+class SheetAynasi:
+    def __init__(self, yol):
+        self.yol = yol
+        self._kilit = threading.Lock()
+        self._thread = None
+        self.son_hata = None
+        sutunlar = ", ".join(f'"{sutun}" {SUTUN_TIPLERI[sutun]}' for sutun in SUTUNLAR)
+        with closing(self._baglan()) as db, db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(f"CREATE TABLE IF NOT EXISTS hastalar (satir_no INTEGER PRIMARY KEY, {sutunlar})")
+            db.execute("CREATE TABLE IF NOT EXISTS senkron (anahtar TEXT PRIMARY KEY, deger REAL)")
+
+    def _baglan(self):
+        return sqlite3.connect(self.yol, timeout=30)
+
+    def _meta(self, db, anahtar, varsayilan=0):
+        kayit = db.execute("SELECT deger FROM senkron WHERE anahtar = ?", (anahtar,)).fetchone()
+        return kayit[0] if kayit else varsayilan
+
+    def durum(self):
+        with closing(self._baglan()) as db:
+            return {
+                "satir": db.execute("SELECT COUNT(*) FROM hastalar").fetchone()[0],
+                "son_senkron": self._meta(db, "son_senkron", None),
+                "surum": int(self._meta(db, "surum")),
+                "kirli": bool(self._meta(db, "kirli")),
+            }
+
+    def kirli_isaretle(self):
+        """Sheet'te mevcut bir satır değiştirildi: sıradaki senkron tam yapılır."""
+        with closing(self._baglan()) as db, db:
+            db.execute("INSERT OR REPLACE INTO senkron VALUES ('kirli', ?)", (time.time(),))
+
+    def surum(self):
+        """Veri her değiştiğinde artan sayı; analiz sonuçlarını önbelleklemek için anahtar."""
+        with closing(self._baglan()) as db:
+            return int(self._meta(db, "surum"))
+
+    def senkronize(self, worksheet, tam=False):
+        """Sheet'teki yeni satırları yerel tabloya ekler; {"yeni": n, "tam": bool} döndürür."""
+        with self._kilit, closing(self._baglan()) as db:
+            baslama = time.time()
+            son_satir = int(self._meta(db, "son_satir", 1))        # 1 = başlık satırı
+            son_tam = self._meta(db, "son_tam_senkron")
+            tam = (tam or son_satir <= 1 or time.time() - son_tam > TAM_SENKRON_ARALIGI
+                   or bool(self._meta(db, "kirli")))
+
+            if not tam:
+                ilk = max(2, son_satir - KONTROL_SATIRI + 1)
+                kimlik_sutunu, gelen = worksheet.batch_get([f"A2:A{son_satir}", f"A{ilk}:{SON_SUTUN}"])
+                gelen = [list(satir) for satir in gelen]
+                kontrol_sayisi = son_satir - ilk + 1
+                kontrol = [tiplendir(satir) for satir in gelen[:kontrol_sayisi]]
+                yerel = [
+                    list(satir) for satir in db.execute(
+                        f"SELECT {_SUTUN_LISTESI} FROM hastalar "
+                        "WHERE satir_no BETWEEN ? AND ? ORDER BY satir_no",
+                        (ilk, son_satir),
+                    )
+                ]
+                # Sondaki boş hücreleri API döndürmez
+                kimlikler = [_hucre(satir[0] if satir else "", "TEXT") for satir in kimlik_sutunu]
+                kimlikler += [None] * (son_satir - 1 - len(kimlikler))
+                yerel_kimlikler = dict(db.execute(
+                    'SELECT satir_no, "ID" FROM hastalar WHERE satir_no <= ?', (son_satir,)))
+                # ID sırası ya da kontrol satırları değiştiyse yerel kopya güvenilmez
+                if (kimlikler != [yerel_kimlikler.get(no) for no in range(2, son_satir + 1)]
+                        or len(gelen) < kontrol_sayisi or kontrol != yerel):
+                    tam = True
+                else:
+                    yeni = gelen[kontrol_sayisi:]
+                    baslangic = son_satir + 1
+
+            if tam:
+                yeni = worksheet.get_all_values()[1:]
+                baslangic = 2
+
+            # Sondaki boş satırları sayma
+            while yeni and not any(str(h).strip() for h in yeni[-1]):
+                yeni.pop()
+
+            with db:
+                if tam:
+                    db.execute("DELETE FROM hastalar")
+                yer = ", ".join("?" * (len(SUTUNLAR) + 1))
+                db.executemany(
+                    f"INSERT OR REPLACE INTO hastalar VALUES ({yer})",
+                    [(baslangic + i, *tiplendir(satir)) for i, satir in enumerate(yeni)],
+                )
+                simdi = time.time()
+                meta = {"son_satir": baslangic + len(yeni) - 1, "son_senkron": simdi}
+                if tam:
+                    meta["son_tam_senkron"] = simdi
+                    if self._meta(db, "kirli") < baslama:   # Senkron sürerken yazılan satır varsa kirli kalır
+                        meta["kirli"] = 0
+                if tam or yeni:
+                    meta["surum"] = self._meta(db, "surum") + 1
+                db.executemany("INSERT OR REPLACE INTO senkron VALUES (?, ?)", meta.items())
+
+            return {"yeni": len(yeni), "tam": tam}
+
+    def arka_planda_senkronize(self, sheets_ile, en_eski=ESKIME_SURESI):
+        """Kopya en_eski saniyeden eskiyse senkronu arka planda başlatır (sayfayı bekletmez)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        durum = self.durum()
+        if durum["son_senkron"] is not None and time.time() - durum["son_senkron"] < en_eski and not durum["kirli"]:
+            return
+
+        def _calis():
+            try:
+                sheets_ile(self.senkronize)
+                self.son_hata = None
+            except Exception as e:
+                self.son_hata = str(e)
+
+        self._thread = threading.Thread(target=_calis, name="sheet-aynasi", daemon=True)
+        self._thread.start()
+
+    def veri(self):
+        """Yerel kopyayı sheet sütun tipleriyle DataFrame olarak döndürür."""
+        import pandas as pd   # Ağır import: yalnızca analiz/arama sırasında
+
+        with closing(self._baglan()) as db:
+            df = pd.read_sql_query(
+                f"SELECT satir_no, {_SUTUN_LISTESI} FROM hastalar ORDER BY satir_no", db
+            )
+        return df.astype({sutun: PANDAS_TIPLERI[SUTUN_TIPLERI[sutun]] for sutun in SUTUNLAR})
+
+
+_ayna = None
+_ayna_kilidi = threading.Lock()
+
+
+def get_ayna():
+    global _ayna
+    with _ayna_kilidi:
+        if _ayna is None:
+            _ayna = SheetAynasi(veri_yolu("ayna.db"))
+        return _ayna
@@ -0,0 +1,101 @@
+# --- GOOGLE SHEETS BAĞLANTI KATMANI ---
+# Streamlit her etkileşimde betiği baştan çalıştırır; bu modül ise süreç boyunca
+# bir kez import edilir. Yetkilendirilmiş istemciyi ve çalışma sayfasını burada
+# tutarak her yeniden çalıştırmada OAuth el sıkışmasını ve Drive aramasını önlüyoruz.
+# gspread/oauth2client ve yetkilendirme ilk kullanıma (ya da arka plan ısınmasına) kadar
+# ertelenir: sayfa açılışı Google'a bağlanmayı beklemez.
+import sys
+import threading
+
+import hiz_siniri
+
+KOTA_CEZASI = 30.0      # Sheets yine de 429 döndürürse kovanın duraklatılacağı süre (sn)
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+
+_kilit = threading.RLock()
+_durum = {
+    "secrets": None,
+    "sheet_name": None,
+    "creds": None,
+    "client": None,
+    "worksheet": None,
+}
+
+
+def _yetki_hatasi_mi(hata):
+    gspread = sys.modules.get("gspread")
+    if gspread is not None and isinstance(hata, gspread.exceptions.APIError):
+        kod = getattr(getattr(hata, "response", None), "status_code", None)
+        return kod in (401, 403)
+    # oauth2client.client.AccessTokenRefreshError / google.auth.exceptions.RefreshError
+    return type(hata).__name__ in ("AccessTokenRefreshError", "RefreshError", "HttpAccessTokenRefreshError")
+
+
+def sifirla():
+    """Önbellekteki istemciyi ve sayfayı bırakır; bir sonraki çağrı sıfırdan bağlanır."""
+    with _kilit:
+        _durum["creds"] = None
+        _durum["client"] = None
+        _durum["worksheet"] = None
+
+
+def baglan(sheets_secrets, sheet_name):
+    """Ayarları kaydeder; yetkilendirme ilk get_client() çağrısında yapılır."""
+    sheets_secrets = dict(sheets_secrets)
+    with _kilit:
+        if _durum["secrets"] != sheets_secrets or _durum["sheet_name"] != sheet_name:
+            sifirla()
+            _durum["secrets"] = sheets_secrets
+            _durum["sheet_name"] = sheet_name
+
+
+def get_client():
+    with _kilit:
+        if _durum["secrets"] is None:
+            raise RuntimeError("Google Sheets bağlantısı ayarlanmadı (önce baglan() çağrılmalı).")
+
+        if _durum["client"] is None:
+            import gspread
+            from oauth2client.service_account import ServiceAccountCredentials
+
+            creds = ServiceAccountCredentials.from_json_keyfile_dict(_durum["secrets"], SCOPE)
+            _durum["creds"] = creds
+            _durum["client"] = gspread.authorize(creds)
+
+        return _durum["client"]
+
+
+def get_worksheet():
+    with _kilit:
+        client = get_client()
+        if _durum["worksheet"] is None:
+            _durum["worksheet"] = client.open(_durum["sheet_name"]).sheet1
+        return _durum["worksheet"]
+
+
+def _kota_hatasi_mi(hata):
+    gspread = sys.modules.get("gspread")
+    if gspread is not None and isinstance(hata, gspread.exceptions.APIError):
+        return getattr(getattr(hata, "response", None), "status_code", None) == 429
+    return False
+
+
+def sheets_ile(islem, kota="sheets_okuma"):
+    """islem(worksheet) çağırır; yetki hatasında (ör. süresi dolmuş token) bağlantıyı tazeleyip bir kez daha dener.
+
+    Her deneme önce kota kovasından ("sheets_okuma" / "sheets_yazma") jeton alır.
+    """
+    kova = hiz_siniri.get_kova(kota)
+    kova.al()
+    try:
+        return islem(get_worksheet())
+    except Exception as e:
+        if _kota_hatasi_mi(e):
+            # Kota başka bir süreçle paylaşılıyor olabilir: bu süreçteki herkes bir süre beklesin
+            kova.geri_bas(KOTA_CEZASI)
+            raise
+        if not _yetki_hatasi_mi(e):
+            raise
+        sifirla()
+        kova.al()
+        return islem(get_worksheet())
@@ -0,0 +1,178 @@
+# --- CEVAP ŞEMASI, TİP DÖNÜŞÜMÜ VE MAKULLÜK KONTROLÜ ---
+# Model JSON modunda, aşağıdaki şemaya uyan cevap vermeye zorlanır. Gelen değerler tek
+# geçişte sayıya çevrilir ("12,3" -> 12.3), birimi farklı yazılmış değerler (g/L, /µL)
+# sheet'teki birime getirilir ve fizyolojik olarak makul aralık dışındakiler işaretlenir.
+import json
+import math
+import re
+import sys
+
+# Sheets'teki birimler: HGB g/dL, PLT 10³/µL, NEU#/LYM#/IG# 10³/µL, RDW %, CRP mg/L, PCT ng/mL
+SAYISAL_ALANLAR = ["HGB", "PLT", "RDW", "NEUT_HASH", "LYMPH_HASH", "IG_HASH", "WBC", "CRP", "Prokalsitonin"]
+TAM_SAYI_ALANLARI = {"PLT"}
+
+# Bu eşiğin üstündeki değer başka birimle yazılmış kabul edilip bölünür
+BIRIM_DONUSUMLERI = {
+    "HGB": (30, 10),             # g/L -> g/dL
+    "PLT": (2000, 1000),         # /µL -> 10³/µL
+    "NEUT_HASH": (200, 1000),    # /µL -> 10³/µL
+    "LYMPH_HASH": (200, 1000),
+    "IG_HASH": (200, 1000),
+    "WBC": (200, 1000),
+}
+
+# Çocuklarda bile görülmesi neredeyse imkansız değerler (okuma hatası şüphesi)
+MAKUL_ARALIKLAR = {
+    "HGB": (3, 25),
+    "PLT": (5, 1500),
+    "RDW": (9, 35),
+    "NEUT_HASH": (0, 80),
+    "LYMPH_HASH": (0, 80),
+    "IG_HASH": (0, 20),
+    "WBC": (0.5, 150),
+    "CRP": (0, 500),
+    "Prokalsitonin": (0, 200),
+}
+
+BOS_DEGERLER = {"", "null", "none", "nan", "-", "yok", "n/a"}
+_SAYI = re.compile(r"([-+]?\d[\d.,]*)(?:[eE]([-+]?\d+))?")     # Üslü yazım da ("1e3", "2,5E-2")
+# Akış sırasında tamamlanmış "anahtar": değer çiftleri (değerden sonra , ya da } gelmiş olmalı)
+_TAMAM_ALAN = re.compile(
+    r'"(\w+)"\s*:\s*("(?:[^"\\]|\\.)*"|null|true|false|-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*(?=[,}])'
+)
+
+
+def yanit_semasi(alanlar):
+    """generationConfig.responseSchema için ID + verilen alanlardan oluşan şema."""
+    ozellikler = {"ID": {"type": "STRING", "nullable": True}}
+    for alan in alanlar:
+        ozellikler[alan] = {"type": "NUMBER", "nullable": True}
+    return {"type": "OBJECT", "properties": ozellikler, "propertyOrdering": list(ozellikler)}
+
+
+def bos_mu(deger):
+    """None, NaN ve pandas'ın eksik değerleri (pd.NA, NaT): editör/ayna sütunlarından gelebilir."""
+    if deger is None:
+        return True
+    if isinstance(deger, float):
+        return math.isnan(deger)
+    pd = sys.modules.get("pandas")   # pandas yüklenmemişse pd.NA da gelemez
+    if pd is not None:
+        try:
+            return bool(pd.isna(deger))
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def sayiya_cevir(deger):
+    """Sayı, '12,3', '1.234,5', '<0.05', '1e3', '250 x10^3/µL' gibi değerleri float'a çevirir; boşsa None."""
+    if isinstance(deger, bool) or bos_mu(deger):
+        return None
+    if isinstance(deger, (int, float)):
+        return float(deger)
+
+    metin = str(deger).strip()
+    if metin.lower() in BOS_DEGERLER:
+        return None
+    eslesme = _SAYI.search(metin)
+    if not eslesme:
+        raise ValueError(f"Sayı değil: {metin}")
+
+    sayi = eslesme.group(1).rstrip(".,")
+    if "," in sayi and "." in sayi:
+        # Sondaki ayraç ondalık ayracıdır
+        if sayi.rfind(",") > sayi.rfind("."):
+            sayi = sayi.replace(".", "").replace(",", ".")
+        else:
+            sayi = sayi.replace(",", "")
+    else:
+        sayi = sayi.replace(",", ".")
+    if sayi.count(".") > 1:
+        sayi = sayi.replace(".", "", sayi.count(".") - 1)
+    us = eslesme.group(2)
+    return float(sayi) * 10 ** int(us) if us else float(sayi)
+
+
+def tiplendir(veri, alanlar=SAYISAL_ALANLAR):
+    """Model cevabındaki alanları sheet tiplerine ve birimlerine getirir.
+
+    Sayıya çevrilemeyen değer olduğu gibi bırakılır; kontrol_et onu ayrıca işaretler.
+    """
+    sonuc = dict(veri)
+    kimlik = sonuc.get("ID")
+    sonuc["ID"] = str(kimlik).strip() if not bos_mu(kimlik) and str(kimlik).strip() else None
+
+    for alan in alanlar:
+        try:
+            sayi = sayiya_cevir(sonuc.get(alan))
+        except ValueError:
+            continue
+        if sayi is not None and alan in BIRIM_DONUSUMLERI:
+            esik, bolen = BIRIM_DONUSUMLERI[alan]
+            if sayi > esik:
+                sayi = sayi / bolen
+        if sayi is not None and alan in TAM_SAYI_ALANLARI:
+            sayi = int(round(sayi))
+        sonuc[alan] = sayi
+    return sonuc
+
+
+def kontrol_et(veri, alanlar=SAYISAL_ALANLAR):
+    """Makul aralık dışındaki veya sayı olmayan alanlar için {alan: açıklama} döndürür."""
+    sorunlar = {}
+    for alan in alanlar:
+        deger = veri.get(alan)
+        try:
+            sayi = sayiya_cevir(deger)
+        except ValueError:
+            sorunlar[alan] = f"{alan} sayı değil: '{deger}'"
+            continue
+        if sayi is None or alan not in MAKUL_ARALIKLAR:
+            continue
+        alt, ust = MAKUL_ARALIKLAR[alan]
+        if not alt <= sayi <= ust:
+            sorunlar[alan] = f"{alan} = {sayi:g} makul aralık dışında ({alt}–{ust})"
+    return sorunlar
+
+
+def tutarlilik_kontrolu(veri):
+    """Alt gruplar toplam lökositle uyumlu mu? (NEU# + LYM# + IG# <= WBC vb.)"""
+    sorunlar = {}
+    try:
+        wbc, neu, lym, ig = (sayiya_cevir(veri.get(a)) for a in ("WBC", "NEUT_HASH", "LYMPH_HASH", "IG_HASH"))
+    except ValueError:
+        return sorunlar
+
+    if wbc:
+        toplam = sum(x for x in (neu, lym, ig) if x is not None)
+        # %5 + 0.1 pay: yuvarlama farkları
+        if toplam > wbc * 1.05 + 0.1:
+            sorunlar["WBC"] = f"NEU# + LYM# + IG# ({toplam:g}) toplam lökositten ({wbc:g}) büyük"
+        elif neu is not None and lym is not None and neu + lym < wbc * 0.3:
+            sorunlar["WBC"] = f"NEU# + LYM# ({neu + lym:g}) toplam lökositin ({wbc:g}) %30'undan az"
+    if ig is not None and neu is not None and ig > neu:
+        sorunlar["IG_HASH"] = f"IG# ({ig:g}) NEU#'tan ({neu:g}) büyük"
+    return sorunlar
+
+
+def tum_sorunlar(veri, alanlar=SAYISAL_ALANLAR):
+    sorunlar = kontrol_et(veri, alanlar)
+    sorunlar.update(tutarlilik_kontrolu(veri))
+    return sorunlar
+
+
+def kismi_json(metin):
+    """Henüz tamamlanmamış JSON metninden o ana kadar tamamlanan alanları çıkarır."""
+    return {anahtar: json.loads(deger) for anahtar, deger in _TAMAM_ALAN.findall(metin)}
+
+
+def json_coz(metin):
+    """JSON modundaki cevabı doğrudan çözer; eski tip (``` bloklu) cevaplar için yedek yol."""
+    try:
+        return json.loads(metin)
+    except ValueError:
+        temiz = metin.replace("```json", "").replace("```", "").strip()
+        start = temiz.find('{')
+        end = temiz.rfind('}') + 1
+        return json.loads(temiz[start:end] if start != -1 else temiz)
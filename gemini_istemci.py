@@ -0,0 +1,154 @@
+# --- GEMINI HTTP İSTEMCİSİ ---
+# Tüm oturumlar tek bir requests.Session (keep-alive, bağlantı havuzu) kullanır.
+# Zaman aşımı olmadan takılan istek Streamlit iş parçacığını sonsuza dek bekletiyordu;
+# 429/503 gibi geçici hatalar artık Retry-After'a uyularak yeniden denenir.
+# Art arda başarısız çağrılarda devre açılır ve API düzelene kadar hemen hata verilir.
+# requests ilk istemci oluşturulurken import edilir (ilk sayfa açılışını yavaşlatmasın).
+# Her deneme süreç genelindeki "gemini" kota kovasından jeton alır (hiz_siniri); 429 gelirse
+# kova duraklatılır ve bu süreçteki tüm oturumlar aynı süre bekler.
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import hiz_siniri
+
+BAGLANTI_ZAMAN_ASIMI = 10       # sn
+OKUMA_ZAMAN_ASIMI = 180         # sn (Pro modelin düşünme süresi uzun olabilir)
+DENEME_SAYISI = 4
+BEKLEME_TABANI = 1.0            # İlk yeniden deneme beklemesi (sn)
+BEKLEME_TAVANI = 30.0           # Tek bir beklemenin üst sınırı (sn)
+TEKRAR_DENENECEK = {429, 500, 502, 503, 504}
+
+DEVRE_ESIGI = 3                 # Art arda bu kadar çağrı başarısız olursa devre açılır
+DEVRE_BEKLEMESI = 60.0          # Devre açıkken deneme yapılmayan süre (sn)
+
+
+class DevreAcik(Exception):
+    def __init__(self, kalan):
+        super().__init__(f"Gemini şu an yanıt vermiyor; {kalan:.0f} sn sonra tekrar deneyin.")
+        self.kalan = kalan
+
+
+class DevreKesici:
+    def __init__(self, esik=DEVRE_ESIGI, bekleme=DEVRE_BEKLEMESI, saat=time.monotonic):
+        self.esik = esik
+        self.bekleme = bekleme
+        self.saat = saat
+        self._kilit = threading.Lock()
+        self._ardisik_hata = 0
+        self._acilma = None
+        self._deneme_suruyor = False
+
+    def izin_ver(self):
+        """Devre açıksa DevreAcik yükseltir; bekleme bittiyse tek bir deneme çağrısına izin verir."""
+        with self._kilit:
+            if self._acilma is None:
+                return
+            kalan = self._acilma + self.bekleme - self.saat()
+            if kalan > 0 or self._deneme_suruyor:
+                raise DevreAcik(max(kalan, 0))
+            self._deneme_suruyor = True
+
+    def basarili(self):
+        with self._kilit:
+            self._ardisik_hata = 0
+            self._acilma = None
+            self._deneme_suruyor = False
+
+    def basarisiz(self):
+        with self._kilit:
+            self._ardisik_hata += 1
+            self._deneme_suruyor = False
+            if self._ardisik_hata >= self.esik:
+                self._acilma = self.saat()
+
+
+def _retry_after(response):
+    deger = response.headers.get("Retry-After")
+    if not deger:
+        return None
+    try:
+        return max(0.0, float(deger))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(deger).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class GeminiIstemcisi:
+    def __init__(self, havuz_boyutu=16):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=havuz_boyutu)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.devre = DevreKesici()
+
+    def _bekleme(self, deneme, response=None):
+        # Üstel artış + tam rastgele sapma; sunucu Retry-After verdiyse ona uyulur
+        bekleme = random.uniform(0, min(BEKLEME_TAVANI, BEKLEME_TABANI * 2 ** deneme))
+        if response is not None:
+            sunucu_istegi = _retry_after(response)
+            if sunucu_istegi is not None:
+                bekleme = min(max(bekleme, sunucu_istegi), BEKLEME_TAVANI)
+        return bekleme
+
+    def post(self, url, json, timeout=None, **kwargs):
+        """Yeniden denemeli POST. Son yanıtı (başarısız olsa da) döndürür; ağ hatasında son hatayı yükseltir."""
+        self.devre.izin_ver()
+        try:
+            return self._dene(url, json, timeout or (BAGLANTI_ZAMAN_ASIMI, OKUMA_ZAMAN_ASIMI), **kwargs)
+        except Exception:
+            # Beklenmedik hatalar da (SSL, kod çözme, ...) başarısız sayılır; yoksa yarı açık
+            # devrenin deneme bayrağı hiç bırakılmaz ve devre süreç yeniden başlayana dek açık kalır
+            self.devre.basarisiz()
+            raise
+
+    def _dene(self, url, json, timeout, **kwargs):
+        import requests
+
+        kova = hiz_siniri.get_kova("gemini")
+        for deneme in range(DENEME_SAYISI):
+            son_deneme = deneme == DENEME_SAYISI - 1
+            kova.al()
+            try:
+                response = self.session.post(url, json=json, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if son_deneme:
+                    raise
+                time.sleep(self._bekleme(deneme))
+                continue
+
+            if response.status_code not in TEKRAR_DENENECEK:
+                self.devre.basarili()
+                return response
+            if son_deneme:
+                if response.status_code == 429:
+                    kova.geri_bas(self._bekleme(deneme, response))
+                self.devre.basarisiz()
+                return response
+            bekleme = self._bekleme(deneme, response)
+            # stream=True ile gövde okunmadıkça bağlantı havuza dönmez; yeniden denemeden önce bırakılır
+            response.close()
+            if response.status_code == 429:
+                # Bekleme kovada: sıradaki deneme (ve diğer oturumların istekleri) kovadan geçer
+                kova.geri_bas(bekleme)
+            else:
+                time.sleep(bekleme)
+
+
+_istemci = None
+_istemci_kilidi = threading.Lock()
+
+
+def get_istemci():
+    global _istemci
+    with _istemci_kilidi:
+        if _istemci is None:
+            _istemci = GeminiIstemcisi()
+        return _istemci
@@ -0,0 +1,112 @@
+# --- GÖRÜNTÜ ÖN İŞLEME ---
+# Telefon fotoğrafları (12 MP JPEG) eskiden tam çözünürlükte kayıpsız PNG'ye çevrilip
+# gönderiliyordu. Burada fotoğrafı düzeltip küçültüyor ve JPEG/WEBP olarak kodluyoruz;
+# mobil veride en büyük gecikme kaynağı yükleme boyutu.
+import base64
+import io
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps
+
+import olcum
+
+MIME_TIPLERI = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+
+@dataclass
+class OnIslemeAyarlari:
+    uzun_kenar: int = 2048          # Uzun kenar bundan büyükse küçültülür (px)
+    gri: bool = True                # Laboratuvar çıktıları için renk gereksiz
+    kontrast: bool = False          # Soluk çıktılarda otomatik kontrast
+    kirp: object = None             # None, "otomatik" ya da (sol, üst, sağ, alt) oranları (0-1)
+    format: str = "JPEG"            # "JPEG" veya "WEBP"
+    kalite: int = 85
+    dokunma_siniri: int = 500_000   # Bu boyuttan küçük, zaten uygun dosyalar olduğu gibi gönderilir (bayt)
+
+
+def _tablo_bolgesi(img):
+    # Açık zemin üzerindeki koyu yazıların kapladığı alanı bul, kenar boşluklarını at
+    gri = ImageOps.autocontrast(img.convert("L"))
+    maske = gri.point(lambda p: 255 if p < 128 else 0)
+    kutu = maske.getbbox()
+    if not kutu:
+        return img
+    pay_x, pay_y = int(img.width * 0.02), int(img.height * 0.02)
+    sol, ust, sag, alt = kutu
+    return img.crop((max(0, sol - pay_x), max(0, ust - pay_y), min(img.width, sag + pay_x), min(img.height, alt + pay_y)))
+
+
+def _oldugu_gibi_gonderilebilir(img, boyut, ayarlar):
+    if boyut > ayarlar.dokunma_siniri or ayarlar.kirp:
+        return False
+    if img.format not in MIME_TIPLERI or max(img.size) > ayarlar.uzun_kenar:
+        return False
+    # EXIF yönü düz değilse model fotoğrafı yan görebilir
+    return img.getexif().get(0x0112, 1) == 1
+
+
+def hazirla(dosya_bytes, ayarlar=None):
+    """Görüntüyü modele gönderilecek hale getirir: (bytes, mime_type, rapor) döndürür."""
+    ayarlar = ayarlar or OnIslemeAyarlari()
+    orijinal_boyut = len(dosya_bytes)
+    with olcum.aralik("goruntu_acma", bayt=orijinal_boyut):
+        img = Image.open(io.BytesIO(dosya_bytes))
+
+    if _oldugu_gibi_gonderilebilir(img, orijinal_boyut, ayarlar):
+        rapor = {
+            "orijinal_bayt": orijinal_boyut,
+            "yeni_bayt": orijinal_boyut,
+            "boyut": img.size,
+            "mime_type": MIME_TIPLERI[img.format],
+            "dokunulmadi": True,
+        }
+        return dosya_bytes, MIME_TIPLERI[img.format], rapor
+
+    # Piksel çözme (decode) ilk işlemde yapılır; süresi bu aralığa dahildir
+    with olcum.aralik("goruntu_isleme"):
+        img = ImageOps.exif_transpose(img)
+
+        if ayarlar.kirp == "otomatik":
+            img = _tablo_bolgesi(img)
+        elif ayarlar.kirp:
+            sol, ust, sag, alt = ayarlar.kirp
+            img = img.crop((int(sol * img.width), int(ust * img.height), int(sag * img.width), int(alt * img.height)))
+
+        if max(img.size) > ayarlar.uzun_kenar:
+            img.thumbnail((ayarlar.uzun_kenar, ayarlar.uzun_kenar), Image.LANCZOS)
+
+        img = img.convert("L") if ayarlar.gri else img.convert("RGB")
+        if ayarlar.kontrast:
+            img = ImageOps.autocontrast(img, cutoff=1)
+
+    with olcum.aralik("goruntu_kodlama", format=ayarlar.format) as bilgi:
+        buffered = io.BytesIO()
+        img.save(buffered, format=ayarlar.format, quality=ayarlar.kalite, optimize=True)
+        yeni = buffered.getvalue()
+        bilgi["bayt"] = len(yeni)
+
+    rapor = {
+        "orijinal_bayt": orijinal_boyut,
+        "yeni_bayt": len(yeni),
+        "boyut": img.size,
+        "mime_type": MIME_TIPLERI[ayarlar.format],
+        "dokunulmadi": False,
+    }
+    return yeni, MIME_TIPLERI[ayarlar.format], rapor
+
+
+def inline_part(dosya_bytes, ayarlar=None):
+    """Gemini isteği için inline_data parçası ve boyut raporu."""
+    veri, mime_type, rapor = hazirla(dosya_bytes, ayarlar)
+    with olcum.aralik("base64"):
+        data = base64.b64encode(veri).decode("utf-8")
+    return {"inline_data": {"mime_type": mime_type, "data": data}}, rapor
+
+
+def rapor_metni(raporlar):
+    orijinal = sum(r["orijinal_bayt"] for r in raporlar)
+    yeni = sum(r["yeni_bayt"] for r in raporlar)
+    if not orijinal:
+        return ""
+    tasarruf = 100 * (1 - yeni / orijinal)
+    return f"📦 Gönderilen görüntü: {orijinal / 1024:.0f} KB → {yeni / 1024:.0f} KB (%{tasarruf:.0f} küçüldü)"
@@ -0,0 +1,76 @@
+# --- DIŞ API KOTALARI (JETON KOVASI) ---
+# Aynı anda birkaç asistan çalışınca her oturumun kendi append_row / generateContent
+# çağrıları Sheets ve Gemini'nin dakikalık kotasını aşıp rastgele 429 hatalarına dönüyordu.
+# Süreçteki tüm dış çağrılar API başına tek bir kovadan sırayla jeton alır: kota dolunca
+# hata alıp yeniden denemek yerine sırasını bekler, verim kota tavanında kalır.
+#
+# Kova GCRA (sanal zamanlama) ile tutulur: her çağrı sıradaki boş zamanı ayırır, ayırma
+# sırası geliş sırasıdır (adil) ve yeni gelen birinin beklemesi doğrudan hesaplanabilir.
+# Herhangi bir 60 sn'lik pencerede de kota aşılmasın diye hız (dakikada - ani_kapasite) / 60 alınır.
+import threading
+import time
+
+import olcum
+from ayarlar import KOTALAR
+
+ANI_ORANI = 0.1     # Kotanın bu kadarı beklemeden art arda kullanılabilir (en az 1)
+
+
+class JetonKovasi:
+    def __init__(self, ad, dakikada, ani_kapasite=None, saat=time.monotonic, uyu=time.sleep):
+        self.ad = ad
+        self.dakikada = dakikada
+        self.ani_kapasite = ani_kapasite or max(1, int(dakikada * ANI_ORANI))
+        self._aralik = 60.0 / max(dakikada - self.ani_kapasite, 1)
+        self._tolerans = (self.ani_kapasite - 1) * self._aralik
+        self._tat = 0.0            # Bir sonraki çağrının teorik zamanı (monotonic)
+        self._bekleyen = 0
+        self._kilit = threading.Lock()
+        self._saat = saat          # Testlerde sahte saat verilebilir
+        self._uyu = uyu
+
+    def _ayir(self, simdi):
+        tat = max(self._tat, simdi)
+        self._tat = tat + self._aralik
+        return max(0.0, tat - self._tolerans - simdi)
+
+    def al(self):
+        """Sıradaki jetonu ayırır ve zamanı gelene kadar bekler; beklenen süreyi döndürür."""
+        with self._kilit:
+            bekleme = self._ayir(self._saat())
+            self._bekleyen += 1
+        try:
+            if bekleme > 0:
+                with olcum.aralik("kota_bekleme", api=self.ad, sure_tahmini=round(bekleme, 3)):
+                    self._uyu(bekleme)
+        finally:
+            with self._kilit:
+                self._bekleyen -= 1
+        return bekleme
+
+    def beklenen_sure(self):
+        """Şimdi gelen bir çağrının bekleyeceği süre (sn)."""
+        with self._kilit:
+            simdi = self._saat()
+            return max(0.0, max(self._tat, simdi) - self._tolerans - simdi)
+
+    def geri_bas(self, sure):
+        """Sunucu yine de 429 döndürdüyse (başka süreçler, kota değişikliği) herkes sure kadar bekler."""
+        with self._kilit:
+            self._tat = max(self._tat, self._saat() + sure + self._tolerans)
+
+    def durum(self):
+        return {"ad": self.ad, "dakikada": self.dakikada, "bekleyen": self._bekleyen,
+                "beklenen_sure": self.beklenen_sure()}
+
+
+_kovalar = {}
+_kovalar_kilidi = threading.Lock()
+
+
+def get_kova(ad):
+    """API başına süreç genelinde tek kova (ayarlar.KOTALAR)."""
+    with _kovalar_kilidi:
+        if ad not in _kovalar:
+            _kovalar[ad] = JetonKovasi(ad, KOTALAR[ad])
+        return _kovalar[ad]
@@ -0,0 +1,108 @@
+# --- TÜRETİLMİŞ İNFLAMASYON İNDEKSLERİ (NLR, PLR, ...) ---
+# Elle tabloda hesaplanan oranlar tüm veri için tek seferde, dizi işlemleriyle hesaplanır.
+# Payda sıfır ya da eksikse sonuç tanımsızdır (NaN, sonsuz değil).
+# Yerel kopyadan gelen yeni/değişen satırlar artımlı işlenir: girdisi değişmeyen satırın
+# sonucu yeniden hesaplanmaz; kopya sürümü aynıysa hiçbir şey yapılmaz.
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import dogrulama
+
+
+@dataclass(frozen=True)
+class Indeks:
+    ad: str
+    aciklama: str
+    pay: tuple       # Çarpılacak alanlar
+    payda: tuple     # Bölünecek alanlar
+
+
+INDEKSLER = [
+    Indeks("NLR", "Nötrofil / lenfosit", ("NEUT_HASH",), ("LYMPH_HASH",)),
+    Indeks("PLR", "Trombosit / lenfosit", ("PLT",), ("LYMPH_HASH",)),
+    Indeks("SII", "Sistemik immün-inflamasyon indeksi (PLT × NEU# / LYM#)", ("PLT", "NEUT_HASH"), ("LYMPH_HASH",)),
+    Indeks("IG_NEU", "İmmatür granülosit / nötrofil", ("IG_HASH",), ("NEUT_HASH",)),
+    Indeks("CLR", "CRP / lenfosit", ("CRP",), ("LYMPH_HASH",)),
+]
+INDEKS_ADLARI = [indeks.ad for indeks in INDEKSLER]
+GIRDILER = sorted({alan for indeks in INDEKSLER for alan in indeks.pay + indeks.payda})
+
+
+def _dizi(df, alan):
+    if alan not in df:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[alan], errors="coerce").astype("float64").to_numpy()
+
+
+def hesapla(df):
+    """Her satır için tüm indeksler (float64, tanımsızsa NaN)."""
+    sonuc = {}
+    with np.errstate(invalid="ignore"):
+        for indeks in INDEKSLER:
+            pay = np.prod([_dizi(df, alan) for alan in indeks.pay], axis=0)
+            payda = np.prod([_dizi(df, alan) for alan in indeks.payda], axis=0)
+            gecerli = ~np.isnan(pay) & ~np.isnan(payda) & (payda > 0)
+            sonuc[indeks.ad] = np.divide(pay, payda, out=np.full(len(df), np.nan), where=gecerli)
+    return pd.DataFrame(sonuc, index=df.index)
+
+
+def satir_indeksleri(veri):
+    """Editördeki tek hasta için {indeks: değer}; hesaplanamayanlar None."""
+    def _sayi(deger):
+        try:
+            return dogrulama.sayiya_cevir(deger)
+        except ValueError:
+            return None
+    df = pd.DataFrame([{alan: _sayi(veri.get(alan)) for alan in GIRDILER}], dtype="float64")
+    return {ad: (None if np.isnan(deger) else float(deger)) for ad, deger in hesapla(df).iloc[0].items()}
+
+
+class OzellikKatmani:
+    """Yerel kopyanın satırları (satir_no) için indeksleri tutar ve artımlı günceller."""
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self._sonuc = pd.DataFrame(columns=INDEKS_ADLARI, dtype="float64")
+        self._girdi_ozeti = pd.Series(dtype="uint64")
+        self.surum = None
+        self.son_hesaplanan = 0
+
+    def guncelle(self, df, surum=None):
+        """df: satir_no sütunlu kopya verisi. İndeksleri satir_no sırasıyla döndürür."""
+        with self._kilit:
+            if surum is not None and surum == self.surum:
+                return self._sonuc
+            df = df.set_index("satir_no")
+            girdiler = df.reindex(columns=GIRDILER)
+            ozet = pd.util.hash_pandas_object(girdiler, index=False)
+            eski = self._girdi_ozeti.reindex(ozet.index)
+            degisen = ozet.index[eski.isna().to_numpy() | (eski.to_numpy() != ozet.to_numpy())]
+
+            yeni = hesapla(girdiler.loc[degisen])
+            sonuc = self._sonuc.reindex(ozet.index)
+            sonuc.loc[degisen] = yeni
+            self._sonuc, self._girdi_ozeti = sonuc.astype("float64"), ozet
+            self.surum, self.son_hesaplanan = surum, len(degisen)
+            return self._sonuc
+
+    def getir(self, sheet_aynasi):
+        """Kopya sürümü değiştiyse günceller; değişmediyse kopyayı okumadan önceki sonucu döndürür."""
+        surum = sheet_aynasi.surum()
+        if surum == self.surum:
+            return self._sonuc
+        return self.guncelle(sheet_aynasi.veri(), surum)
+
+
+_katman = None
+_katman_kilidi = threading.Lock()
+
+
+def get_katman():
+    global _katman
+    with _katman_kilidi:
+        if _katman is None:
+            _katman = OzellikKatmani()
+        return _katman
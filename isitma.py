@@ -0,0 +1,69 @@
+# --- SOĞUK BAŞLANGIÇ: ARKA PLANDA ISINMA ---
+# Ücretsiz sunucuda konteyner uykudan uyanınca ilk sayfa, ağır kütüphaneleri (pandas, gspread,
+# oauth2client, requests) ve Google yetkilendirmesini beklemeden çizilir. İlk çizimden sonra
+# bunlar bir arka plan iş parçacığında hazırlanır; kullanıcı fotoğrafı seçip "Oku"ya basana
+# kadar çoğu zaman ısınma bitmiş olur. Isınma bitmeden gelen istek aynı import'u bekler.
+import importlib
+import threading
+import time
+
+import baglanti
+import gemini_istemci
+import olcum
+
+# Ana sayfanın ilk çiziminde import edilmemesi gereken modüller (kiyaslama.baslangic bunu kontrol eder)
+AGIR_MODULLER = ["pandas", "numpy", "requests", "gspread", "oauth2client.service_account"]
+# Düzenleyici ve analizde kullanılan, pandas/numpy'a bağlı uygulama modülleri
+UYGULAMA_MODULLERI = ["indeksler", "referans"]
+
+_durum = {"basladi": None, "bitti": None, "sureler": {}, "hata": None}
+_kilit = threading.Lock()
+
+
+def _isit():
+    sureler = {}
+    for ad in AGIR_MODULLER + UYGULAMA_MODULLERI:
+        baslangic = time.perf_counter()
+        importlib.import_module(ad)
+        sureler[ad] = time.perf_counter() - baslangic
+
+    baslangic = time.perf_counter()
+    gemini_istemci.get_istemci()
+    sureler["gemini_istemci"] = time.perf_counter() - baslangic
+
+    # Yetkilendirme + sayfayı açma (ağ); hata ilk gerçek kullanımda yeniden denenecek.
+    # Sayfayı açmak da API çağrısıdır: okuma kotasından jeton alınır, yetki hatasında bir kez daha denenir
+    baslangic = time.perf_counter()
+    try:
+        baglanti.sheets_ile(lambda sheet: sheet)
+        sureler["sheets_baglantisi"] = time.perf_counter() - baslangic
+    except Exception as e:
+        _durum["hata"] = str(e)
+    return sureler
+
+
+def _calis():
+    baslangic = time.perf_counter()
+    try:
+        sureler = _isit()
+    except Exception as e:
+        _durum["hata"] = str(e)
+        sureler = {}
+    _durum["sureler"] = sureler
+    _durum["bitti"] = time.time()
+    toplam = time.perf_counter() - baslangic
+    olcum.olay("isinma", toplam, sonuc="hata" if _durum["hata"] else "basarili",
+               asamalar={"isinma": toplam, **{f"isinma_{ad}": sure for ad, sure in sureler.items()}})
+
+
+def baslat():
+    """Isınmayı süreç başına bir kez arka planda başlatır (ilk çizimden sonra çağrılmalı)."""
+    with _kilit:
+        if _durum["basladi"] is not None:
+            return
+        _durum["basladi"] = time.time()
+    threading.Thread(target=_calis, name="isitma", daemon=True).start()
+
+
+def durum():
+    return dict(_durum)
@@ -0,0 +1,131 @@
+# --- ARKA PLAN OKUMA İŞLERİ ---
+# Okuma düğmenin içinde çalışınca, bekleme sırasında yapılan her etkileşim betiği yeniden
+# başlatıp okumayı boşa çıkarıyordu. Okumalar artık süreç genelindeki bir havuza iş olarak
+# gönderilir; oturum yalnızca iş kimliklerini tutar. Sonuç, yeniden çalıştırmalardan bağımsız
+# olarak burada bekler. Sonuçlar hasta verisi içerir: iş yalnızca onu başlatan oturuma (sahip)
+# verilir, kimlik adres çubuğuna yazılmaz; alınan ya da kapatılan işin sonucu hemen silinir.
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import okuma
+import olcum
+
+ESZAMANLI_IS = 4
+TUTMA_SURESI = 3600     # Biten işin sonucu bu kadar süre saklanır (sn)
+
+BEKLIYOR = "bekliyor"
+CALISIYOR = "calisiyor"
+BITTI = "bitti"
+HATA = "hata"
+IPTAL = "iptal"
+
+
+class Is:
+    def __init__(self, etiket, akisli, ek=None, sahip=None):
+        self.id = uuid.uuid4().hex[:10]
+        self.sahip = sahip
+        self.etiket = etiket
+        self.durum = BEKLIYOR
+        self.gonderilme = time.time()
+        self.baslangic = None
+        self.bitis = None
+        self.canli = {} if akisli else None     # Akışlı okumada gelen kısmi değerler
+        self.iptal = okuma.IptalBayragi()
+        self.olcum = olcum.Olcum("okuma")
+        self.sonuc = None
+        self.hata = None
+        self.olcum_ozeti = None
+        self.ek = ek or {}      # Sonuçla birlikte sayfaya dönecek veriler (ör. okunan fotoğraflar)
+
+    @property
+    def bitti_mi(self):
+        return self.durum in (BITTI, HATA, IPTAL)
+
+    def gecen_sure(self):
+        if self.baslangic is None:
+            return 0.0
+        return (self.bitis or time.time()) - self.baslangic
+
+
+class IsYoneticisi:
+    def __init__(self, eszamanli=ESZAMANLI_IS):
+        self._havuz = ThreadPoolExecutor(max_workers=eszamanli, thread_name_prefix="okuma-isi")
+        self._isler = {}
+        self._kilit = threading.Lock()
+
+    def gonder(self, etiket, fn, *args, akisli=False, bilgi=None, ek=None, sahip=None, **kwargs):
+        """fn(*args, geri_bildirim=..., iptal=..., **kwargs) çağrısını arka planda çalıştırır, işi döndürür.
+
+        bilgi(sonuc) verilirse dönen sözlük ölçüm kaydına eklenir (ör. model, önbellek).
+        sahip verilirse iş yalnızca aynı sahiple getirilebilir, durdurulabilir ve bırakılabilir.
+        """
+        is_ = Is(etiket, akisli, ek, sahip)
+        with self._kilit:
+            self._temizle()
+            self._isler[is_.id] = is_
+
+        def _calis():
+            if is_.iptal.iptal_edildi:
+                is_.durum, is_.bitis = IPTAL, time.time()
+                return
+            is_.durum, is_.baslangic = CALISIYOR, time.time()
+            geri_bildirim = is_.canli.update if akisli else None
+            try:
+                sonuc = is_.olcum.calistir(fn, *args, geri_bildirim=geri_bildirim, iptal=is_.iptal, **kwargs)
+            except okuma.OkumaIptal:
+                is_.olcum_ozeti = is_.olcum.sonuclandir("iptal")
+                is_.durum = IPTAL
+            except Exception as e:
+                is_.olcum_ozeti = is_.olcum.sonuclandir("hata", hata=type(e).__name__)
+                is_.hata, is_.durum = e, HATA
+            else:
+                if is_.iptal.iptal_edildi:
+                    # Akışsız istek yarıda kesilemez; durdurulan okumanın sonucu kullanılmaz
+                    is_.olcum_ozeti = is_.olcum.sonuclandir("iptal")
+                    is_.durum = IPTAL
+                    return
+                is_.olcum_ozeti = is_.olcum.sonuclandir("basarili", **(bilgi(sonuc) if bilgi else {}))
+                is_.sonuc, is_.durum = sonuc, BITTI
+            finally:
+                is_.bitis = time.time()
+
+        self._havuz.submit(_calis)
+        return is_
+
+    def getir(self, is_id, sahip=None):
+        """İş başka bir oturuma aitse None döner (kimliği bilen başkası sonucu alamaz)."""
+        with self._kilit:
+            is_ = self._isler.get(is_id)
+        return is_ if is_ is not None and is_.sahip == sahip else None
+
+    def iptal_et(self, is_id, sahip=None):
+        is_ = self.getir(is_id, sahip)
+        if is_ is not None and not is_.bitti_mi:
+            is_.iptal.iptal_et()
+
+    def birak(self, is_id, sahip=None):
+        """Sonucu alınan ya da kapatılan işi unutur."""
+        with self._kilit:
+            is_ = self._isler.get(is_id)
+            if is_ is not None and is_.sahip == sahip:
+                del self._isler[is_id]
+
+    def _temizle(self):
+        # Sahibi gelip almayan eski sonuçlar belleği doldurmasın
+        sinir = time.time() - TUTMA_SURESI
+        for is_id in [i for i, is_ in self._isler.items() if is_.bitti_mi and is_.bitis < sinir]:
+            del self._isler[is_id]
+
+
+_yonetici = None
+_yonetici_kilidi = threading.Lock()
+
+
+def get_yonetici():
+    global _yonetici
+    with _yonetici_kilidi:
+        if _yonetici is None:
+            _yonetici = IsYoneticisi()
+        return _yonetici
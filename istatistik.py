@@ -0,0 +1,105 @@
+# --- KOHORT İSTATİSTİKLERİ ---
+# Toplanan satırlardan Tablo 1 (tableone) ve grup karşılaştırmaları. Veri yerel sheet
+# kopyasından gelir; sayfa sonuçları veri sürümüne göre önbelleğe alır, yani sürüm
+# değişmedikçe hiçbir şey yeniden hesaplanmaz ya da indirilmez.
+import pandas as pd
+from scipy import stats
+from tableone import TableOne
+
+from indeksler import INDEKS_ADLARI
+
+LAB_ALANLARI = ["HGB", "PLT", "RDW", "NEUT_HASH", "LYMPH_HASH", "IG_HASH", "CRP", "Prokalsitonin"]
+DEGISKENLER = LAB_ALANLARI + INDEKS_ADLARI     # İndeks sütunları veride varsa tablolara girer
+ETIKETLER = {
+    "TOPLAM_AY": "Yaş (ay)",
+    "HGB": "HGB (g/dL)",
+    "PLT": "PLT (10³/µL)",
+    "RDW": "RDW (%)",
+    "NEUT_HASH": "NEU# (10³/µL)",
+    "LYMPH_HASH": "LYM# (10³/µL)",
+    "IG_HASH": "IG# (10³/µL)",
+    "CRP": "CRP (mg/L)",
+    "Prokalsitonin": "Prokalsitonin (ng/mL)",
+    "IG_NEU": "IG# / NEU#",
+    "CLR": "CRP / LYM#",
+}
+
+# TOPLAM_AY sınırları: [alt, üst)
+YAS_GRUPLARI = [
+    (0, 1, "Yenidoğan (<1 ay)"),
+    (1, 12, "Süt çocuğu (1–11 ay)"),
+    (12, 60, "Oyun çağı (1–4 yaş)"),
+    (60, 144, "Okul çağı (5–11 yaş)"),
+    (144, 216, "Adölesan (12–17 yaş)"),
+]
+GRUPLAMALAR = ["Yok", "Yaş grubu", "CRP eşiği", "Prokalsitonin eşiği"]
+VARSAYILAN_ESIKLER = {"CRP eşiği": 10.0, "Prokalsitonin eşiği": 0.5}
+
+
+def sayisal(df):
+    """Nullable (Int64/Float64) sütunları istatistik kütüphanelerinin beklediği float'a çevirir."""
+    sonuc = df.copy()
+    for sutun in ["TOPLAM_AY"] + DEGISKENLER:
+        if sutun in sonuc:
+            sonuc[sutun] = pd.to_numeric(sonuc[sutun], errors="coerce").astype("float64")
+    return sonuc
+
+
+def grupla(df, yontem, esik=None):
+    """Her satırın grup etiketini döndürür (gruplanamayan satır: NaN)."""
+    if yontem == "Yaş grubu":
+        sinirlar = [alt for alt, _, _ in YAS_GRUPLARI] + [YAS_GRUPLARI[-1][1]]
+        etiketler = [etiket for _, _, etiket in YAS_GRUPLARI]
+        return pd.cut(df["TOPLAM_AY"], sinirlar, right=False, labels=etiketler)
+    if yontem in VARSAYILAN_ESIKLER:
+        alan = "CRP" if yontem == "CRP eşiği" else "Prokalsitonin"
+        esik = VARSAYILAN_ESIKLER[yontem] if esik is None else esik
+        deger = df[alan]
+        grup = pd.Series(pd.NA, index=df.index, dtype="object")
+        grup[deger >= esik] = f"{alan} ≥ {esik:g}"
+        grup[deger < esik] = f"{alan} < {esik:g}"
+        return pd.Categorical(grup, categories=[f"{alan} < {esik:g}", f"{alan} ≥ {esik:g}"])
+    raise ValueError(f"Bilinmeyen gruplama: {yontem}")
+
+
+def tablo_bir(df, grup=None):
+    """Tablo 1: sürekli değişkenler medyan [ÇAA]; grup verildiyse gruplar arası p değeri."""
+    df = sayisal(df)
+    sutunlar = [s for s in ["TOPLAM_AY"] + DEGISKENLER if s in df and df[s].notna().any()]
+    parametreler = {}
+    if grup is not None:
+        df = df.assign(GRUP=grup).dropna(subset=["GRUP"])
+        parametreler = {"groupby": "GRUP", "pval": df["GRUP"].nunique() > 1, "htest_name": True}
+    tablo = TableOne(
+        df,
+        columns=sutunlar,
+        categorical=[],         # Az farklı değeri olan sütunlar kategorik sanılmasın
+        continuous=sutunlar,
+        nonnormal=sutunlar,     # Laboratuvar değerleri çoğunlukla çarpık dağılır
+        rename=ETIKETLER,
+        **parametreler,
+    )
+    # Karışık tipli hücreler (sayı + boş metin) ekranda/CSV'de sorun çıkarmasın
+    return tablo.tableone.astype(str)
+
+
+def grup_karsilastirmasi(df, grup):
+    """Her laboratuvar değeri ve indeks için grup başına n ve medyan, Kruskal-Wallis (2 grupta Mann-Whitney) p değeri."""
+    df = sayisal(df).assign(GRUP=grup).dropna(subset=["GRUP"])
+    gruplar = list(pd.Categorical(grup).categories)     # Yaş/eşik sırasıyla
+    satirlar = []
+    for alan in [a for a in DEGISKENLER if a in df]:
+        ornekler = {g: df.loc[df["GRUP"] == g, alan].dropna() for g in gruplar}
+        ornekler = {g: o for g, o in ornekler.items() if len(o)}
+        satir = {"Değişken": ETIKETLER.get(alan, alan)}
+        for g, o in ornekler.items():
+            satir[f"{g} (n)"] = len(o)
+            satir[f"{g} medyan"] = o.median()
+        p = None
+        if len(ornekler) == 2:
+            p = stats.mannwhitneyu(*ornekler.values()).pvalue
+        elif len(ornekler) > 2:
+            p = stats.kruskal(*ornekler.values()).pvalue
+        satir["p"] = p
+        satirlar.append(satir)
+    return pd.DataFrame(satirlar)
@@ -0,0 +1,113 @@
+# --- HASTA KİMLİK İNDEKSİ ---
+# Kaydetmeden önce aynı protokol/ID'nin daha önce girilip girilmediğini anında söylemek için
+# süreç genelinde bellekte tutulan indeks. Yerel sheet kopyasından (ayna) bir kez yüklenir,
+# her kayıtta güncellenir; kopya değişince (senkron) yeniden kurulur. Canlı sheet'e gidilmez.
+import re
+import threading
+import unicodedata
+
+import dogrulama
+
+_TR_HARFLER = str.maketrans("İIıŞşĞğÜüÖöÇç", "iiissgguuoocc")
+YAKIN_MIN_UZUNLUK = 4   # Bundan kısa ID'lerde yakın eşleşme aranmaz (çok fazla yanlış alarm)
+KUYRUK = "kuyruk"       # Henüz sheet'e yazılmamış (ya da kopyaya gelmemiş) kayıt konumu
+
+
+def normallestir(kimlik):
+    """Büyük/küçük harf, boşluk, noktalama ve Türkçe karakter farklarını yok sayar; boş ID için ""."""
+    if dogrulama.bos_mu(kimlik):
+        return ""
+    metin = str(kimlik).translate(_TR_HARFLER).lower()
+    metin = unicodedata.normalize("NFKD", metin)
+    metin = "".join(h for h in metin if not unicodedata.combining(h))
+    return re.sub(r"[\W_]+", "", metin)
+
+
+def _silinmis_halleri(anahtar):
+    # Tek karakteri silinmiş halleri: iki ID'nin bu kümeleri kesişiyorsa aralarında en fazla
+    # iki harflik fark vardır; adaylar _tek_fark ile kesinleştirilir
+    return {anahtar[:i] + anahtar[i + 1:] for i in range(len(anahtar))}
+
+
+def _tek_fark(a, b):
+    """Tek harf eklenmiş/silinmiş/değişmiş ya da yan yana iki harfin yeri değişmiş mi?"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    bas = 0
+    while bas < min(len(a), len(b)) and a[bas] == b[bas]:
+        bas += 1
+    if len(a) == len(b):
+        return a[bas + 1:] == b[bas + 1:] or (a[bas:bas + 2] == b[bas:bas + 2][::-1] and a[bas + 2:] == b[bas + 2:])
+    kisa, uzun = (a, b) if len(a) < len(b) else (b, a)
+    return kisa[bas:] == uzun[bas + 1:]
+
+
+class KimlikIndeksi:
+    def __init__(self):
+        self._kilit = threading.RLock()
+        self._konumlar = {}       # normalleştirilmiş ID -> {satır no | KUYRUK}
+        self._gorunen = {}        # normalleştirilmiş ID -> ekranda gösterilecek ID
+        self._komsular = {}       # silinmiş hal -> {normalleştirilmiş ID}
+        self.surum = None
+
+    def _ekle(self, kimlik, konum):
+        anahtar = normallestir(kimlik)
+        if not anahtar:
+            return
+        self._konumlar.setdefault(anahtar, set()).add(konum)
+        self._gorunen.setdefault(anahtar, str(kimlik).strip())
+        if len(anahtar) >= YAKIN_MIN_UZUNLUK:
+            for hal in _silinmis_halleri(anahtar) | {anahtar}:
+                self._komsular.setdefault(hal, set()).add(anahtar)
+
+    def ekle(self, kimlik, konum=KUYRUK):
+        with self._kilit:
+            self._ekle(kimlik, konum)
+
+    def yeniden_kur(self, kayitlar, surum=None):
+        """kayitlar: (kimlik, konum) çiftleri."""
+        with self._kilit:
+            self._konumlar, self._gorunen, self._komsular = {}, {}, {}
+            for kimlik, konum in kayitlar:
+                self._ekle(kimlik, konum)
+            self.surum = surum
+
+    def guncel_tut(self, sheet_aynasi, kayit_kuyrugu):
+        """Yerel kopya değiştiyse indeksi kopya + kopyaya henüz gelmemiş kuyruk kayıtlarından kurar."""
+        surum = sheet_aynasi.surum()
+        if surum == self.surum:
+            return
+        veri = sheet_aynasi.veri()
+        # Boş ID hücreleri pandas'ta NaN/pd.NA olarak gelir; "nan"/"na" diye indekslenmesin
+        kayitlar = [(kimlik, satir_no) for kimlik, satir_no in zip(veri["ID"].tolist(), veri["satir_no"].tolist())
+                    if not dogrulama.bos_mu(kimlik)]
+        son_senkron = sheet_aynasi.durum()["son_senkron"] or 0
+        kayitlar += [(satir[0], KUYRUK) for satir in kayit_kuyrugu.son_eklenenler(son_senkron)]
+        self.yeniden_kur(kayitlar, surum)
+
+    def ara(self, kimlik):
+        """{"tam": {konumlar}, "yakin": [(ID, {konumlar}), ...]} döndürür."""
+        anahtar = normallestir(kimlik)
+        with self._kilit:
+            tam = set(self._konumlar.get(anahtar, ()))
+            yakinlar = set()
+            if len(anahtar) >= YAKIN_MIN_UZUNLUK:
+                for hal in _silinmis_halleri(anahtar) | {anahtar}:
+                    yakinlar |= self._komsular.get(hal, set())
+            yakin = [
+                (self._gorunen[k], set(self._konumlar[k]))
+                for k in sorted(yakinlar) if k != anahtar and _tek_fark(k, anahtar)
+            ]
+        return {"tam": tam, "yakin": yakin}
+
+
+_indeks = None
+_indeks_kilidi = threading.Lock()
+
+
+def get_indeks():
+    global _indeks
+    with _indeks_kilidi:
+        if _indeks is None:
+            _indeks = KimlikIndeksi()
+        return _indeks
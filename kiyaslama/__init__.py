@@ -0,0 +1 @@
+# Yerel sahte Gemini/Sheets ile kıyaslama araçları: python -m kiyaslama --help
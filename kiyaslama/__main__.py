@@ -0,0 +1,207 @@
+# --- UÇTAN UCA KIYASLAMA / TEKRAR OYNATMA ---
+# Okuma ve kayıt akışını gerçek API'lere gitmeden, yerel sahte Gemini sunucusu ve sahte
+# çalışma sayfasıyla çalıştırır; aşama başına p50/p95 süre, yük baytı ve verim raporlar.
+#
+#   python -m kiyaslama --hasta 40 --eszamanli 4 --gecikme 1.2 --hata-orani 0.05
+#   python -m kiyaslama --fotograflar ornekler/ --akis --json sonuc.json
+#
+# Ön işleme, önbellek ve eşzamanlılık seçenekleri aynı fotoğraflarla karşılaştırılabilir.
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from kiyaslama.ornek_goruntu import ornek_fotograf
+from kiyaslama.sahte_gemini import SahteGemini
+from kiyaslama.sahte_sheet import SahteWorksheet
+
+ASAMALAR = ["on_isleme", "okuma", "kuyruga_yazma", "hasta_toplam", "sheets_gonderim"]
+
+
+def _argumanlar(argv):
+    p = argparse.ArgumentParser(prog="python -m kiyaslama", description="Sahte Gemini/Sheets ile uçtan uca kıyaslama")
+    p.add_argument("--fotograflar", help="Örnek fotoğraf klasörü (sıralı dosyalar hemogram/biyokimya çifti olarak)")
+    p.add_argument("--ornek", type=int, default=6, help="Klasör yoksa üretilecek sentetik fotoğraf sayısı")
+    p.add_argument("--hasta", type=int, default=20, help="Oynatılacak hasta sayısı (fotoğraflar döngüyle kullanılır)")
+    p.add_argument("--eszamanli", type=int, default=4)
+    p.add_argument("--gecikme", type=float, default=0.8, help="Sahte model gecikmesi (sn)")
+    p.add_argument("--hata-orani", type=float, default=0.0)
+    p.add_argument("--supheli-orani", type=float, default=0.0, help="Hızlı modelin kontrolden geçemediği cevap oranı")
+    p.add_argument("--sheets-gecikme", type=float, default=0.3)
+    p.add_argument("--sahte-kota", type=int, help="Sahte sunucunun dakikalık istek kotası (aşılınca 429)")
+    p.add_argument("--gemini-kota", type=float, default=1e6,
+                   help="Uygulamanın Gemini kota kovası (dakikada; varsayılan pratikte sınırsız)")
+    p.add_argument("--akis", action="store_true", help="Akışlı (SSE) okuma")
+    p.add_argument("--birlesik", action="store_true", help="Belgeleri tek istekte oku (ayrı/paralel yerine)")
+    p.add_argument("--onbellek", action="store_true", help="Okuma önbelleğini kullan (varsayılan: atla)")
+    p.add_argument("--yalniz-pro", action="store_true", help="Kademeli okuma yerine yalnız Pro model")
+    p.add_argument("--uzun-kenar", type=int, default=2048)
+    p.add_argument("--format", choices=["JPEG", "WEBP"], default="JPEG")
+    p.add_argument("--kalite", type=int, default=85)
+    p.add_argument("--renkli", action="store_true", help="Gri tonlamaya çevirme")
+    p.add_argument("--json", help="Sonuçları bu dosyaya yaz")
+    return p.parse_args(argv)
+
+
+def _fotograflar(args):
+    if args.fotograflar:
+        adlar = sorted(
+            ad for ad in os.listdir(args.fotograflar) if ad.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))
+        )
+        if not adlar:
+            sys.exit(f"{args.fotograflar} içinde fotoğraf yok")
+        dosyalar = []
+        for ad in adlar:
+            with open(os.path.join(args.fotograflar, ad), "rb") as f:
+                dosyalar.append(f.read())
+    else:
+        print(f"{args.ornek} sentetik fotoğraf üretiliyor...", file=sys.stderr)
+        dosyalar = [ornek_fotograf(i) for i in range(args.ornek)]
+    # Ardışık dosyalar bir hastanın hemogram + biyokimyası
+    ciftler = [tuple(dosyalar[i:i + 2]) for i in range(0, len(dosyalar), 2)]
+    return [ciftler[i % len(ciftler)] for i in range(args.hasta)]
+
+
+def _ozet(sureler):
+    if not sureler:
+        return {"n": 0}
+    ms = np.array(sureler) * 1000
+    return {
+        "n": len(ms),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(ms, 95)), 1),
+        "ort_ms": round(float(ms.mean()), 1),
+    }
+
+
+def calistir(args):
+    # Uygulama modülleri ortam değişkenlerini import sırasında okur: önce ayarla
+    os.environ["LAB_VERI_DIZINI"] = tempfile.mkdtemp(prefix="kiyaslama_")
+    sahte = SahteGemini(
+        gecikme=args.gecikme, hata_orani=args.hata_orani, supheli_orani=args.supheli_orani,
+        dakika_kotasi=args.sahte_kota,
+    ).baslat()
+    os.environ["GEMINI_API_TABANI"] = sahte.adres
+    os.environ["KOTA_GEMINI"] = str(args.gemini_kota)
+
+    import dogrulama
+    import goruntu
+    import kuyruk
+    import okuma
+    from alanlar import SUTUNLAR, satira_cevir
+
+    hastalar = _fotograflar(args)
+    on_isleme = goruntu.OnIslemeAyarlari(
+        uzun_kenar=args.uzun_kenar, gri=not args.renkli, format=args.format, kalite=args.kalite
+    )
+    modeller = [okuma.MODEL] if args.yalniz_pro else okuma.MODEL_KADEMELERI
+    kayit_kuyrugu = kuyruk.KayitKuyrugu(os.path.join(os.environ["LAB_VERI_DIZINI"], "kuyruk.db"))
+    worksheet = SahteWorksheet(gecikme=args.sheets_gecikme, basliklar=SUTUNLAR)
+
+    sureler = {asama: [] for asama in ASAMALAR}
+    baytlar = {"orijinal": 0, "gonderilen": 0}
+    sonuclar = {"basarili": 0, "hatali": 0, "onbellekten": 0, "pro_kullanilan": 0}
+
+    def _hasta(cift):
+        # okuma.hasta_oku ile aynı adımlar; her biri ayrı ölçülsün diye tek tek çağrılır
+        baslangic = time.perf_counter()
+        partlar, raporlar = [], []
+        for dosya in cift:
+            part, rapor = goruntu.inline_part(dosya, on_isleme)
+            partlar.append(part)
+            raporlar.append(rapor)
+        t_on_isleme = time.perf_counter()
+
+        geri_bildirim = (lambda kismi: None) if args.akis else None
+        if args.birlesik:
+            veri, onbellekten, model = okuma.kademeli_oku(
+                "sahte", okuma.istek_parcalari(partlar), modeller, not args.onbellek, geri_bildirim=geri_bildirim)
+            veri["MODEL"] = model
+        else:
+            veri, onbellekten, _ = okuma.belgeleri_ayri_oku(
+                "sahte", partlar[0], partlar[1] if len(partlar) > 1 else None, modeller, not args.onbellek,
+                geri_bildirim)
+        t_okuma = time.perf_counter()
+
+        veri.update(YAS_YIL=3, YAS_AY=0, TOPLAM_AY=36)
+        kayit_kuyrugu.ekle(satira_cevir(dogrulama.tiplendir(veri)))
+        t_kuyruk = time.perf_counter()
+        return {
+            "on_isleme": t_on_isleme - baslangic,
+            "okuma": t_okuma - t_on_isleme,
+            "kuyruga_yazma": t_kuyruk - t_okuma,
+            "hasta_toplam": t_kuyruk - baslangic,
+            "raporlar": raporlar,
+            "onbellekten": onbellekten,
+            "model": veri["MODEL"],
+        }
+
+    baslangic = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.eszamanli) as havuz:
+        for gelecek in [havuz.submit(_hasta, cift) for cift in hastalar]:
+            try:
+                sonuc = gelecek.result()
+            except Exception as e:
+                sonuclar["hatali"] += 1
+                print(f"Hasta okunamadı: {e}", file=sys.stderr)
+                continue
+            sonuclar["basarili"] += 1
+            sonuclar["onbellekten"] += sonuc["onbellekten"]
+            sonuclar["pro_kullanilan"] += okuma.MODEL in sonuc["model"]
+            for asama in ASAMALAR[:4]:
+                sureler[asama].append(sonuc[asama])
+            for rapor in sonuc["raporlar"]:
+                baytlar["orijinal"] += rapor["orijinal_bayt"]
+                baytlar["gonderilen"] += rapor["yeni_bayt"]
+    okuma_bitis = time.perf_counter()
+
+    # Kuyruktaki satırlar uygulamadaki gibi toplu olarak sahte sheet'e gönderilir
+    kayit_kuyrugu.bosalt(worksheet.append_rows)
+    bitis = time.perf_counter()
+    sureler["sheets_gonderim"] = [c["sure"] for c in worksheet.cagrilar]
+    sahte.durdur()
+
+    return {
+        "ayarlar": vars(args),
+        "asamalar": {asama: _ozet(sureler[asama]) for asama in ASAMALAR},
+        "sonuclar": sonuclar,
+        "toplam_sure_sn": round(bitis - baslangic, 2),
+        "verim_hasta_sn": round(sonuclar["basarili"] / (okuma_bitis - baslangic), 2),
+        "goruntu_bayt": baytlar,
+        "gemini": dict(sahte.sayaclar),
+        "sheets": {"cagri": len(worksheet.cagrilar), "satir": sum(c["satir"] for c in worksheet.cagrilar)},
+    }
+
+
+def rapor_yaz(sonuc):
+    print(f"\n{'Aşama':<18}{'n':>6}{'p50 (ms)':>12}{'p95 (ms)':>12}{'ort (ms)':>12}")
+    for asama, ozet in sonuc["asamalar"].items():
+        if ozet["n"]:
+            print(f"{asama:<18}{ozet['n']:>6}{ozet['p50_ms']:>12}{ozet['p95_ms']:>12}{ozet['ort_ms']:>12}")
+    s, b, g = sonuc["sonuclar"], sonuc["goruntu_bayt"], sonuc["gemini"]
+    print(f"\nHasta: {s['basarili']} başarılı, {s['hatali']} hatalı · önbellekten {s['onbellekten']} · "
+          f"Pro'ya geçen {s['pro_kullanilan']}")
+    print(f"Toplam {sonuc['toplam_sure_sn']} sn · verim {sonuc['verim_hasta_sn']} hasta/sn")
+    if b["orijinal"]:
+        print(f"Görüntü: {b['orijinal'] / 2**20:.1f} MB → {b['gonderilen'] / 2**20:.1f} MB gönderildi")
+    print(f"Gemini: {g['istek']} istek ({g['hata']} sahte hata, {g['kota_asimi']} kota aşımı) · gelen {g['gelen'] / 2**20:.1f} MB · "
+          f"giden {g['giden'] / 1024:.1f} KB")
+    print(f"Sheets: {sonuc['sheets']['cagri']} çağrı, {sonuc['sheets']['satir']} satır")
+
+
+def main(argv=None):
+    args = _argumanlar(argv)
+    sonuc = calistir(args)
+    rapor_yaz(sonuc)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sonuc, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
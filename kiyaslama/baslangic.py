@@ -0,0 +1,96 @@
+# --- SOĞUK BAŞLANGIÇ KIYASLAMASI ---
+# Her ölçüm yeni bir Python sürecinde yapılır (import önbelleği yokken, uyanan konteyner gibi):
+#   1. Ana sayfanın import ettiği uygulama modüllerinin süresi ve yanlışlıkla yüklenen ağır modüller
+#   2. app.py'nin ilk çalıştırmasının (ilk çizim) süresi; Google'a bağlanılmaz
+#
+#   python -m kiyaslama.baslangic --tekrar 5 --esik-ms 300 --json baslangic.json
+#
+# Ağır bir modül ilk çizimde yüklenirse ya da medyan eşiği aşarsa çıkış kodu 1 olur.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ANA_SAYFA_MODULLERI = ["dogrulama", "goruntu", "isitma", "kimlik_indeksi", "okuma", "olcum", "ortak", "alanlar"]
+
+_IMPORT_BETIGI = """
+import json, sys, time
+import streamlit
+baslangic = time.perf_counter()
+for ad in {moduller!r}:
+    __import__(ad)
+sure = time.perf_counter() - baslangic
+import isitma
+print(json.dumps({{"sure": sure, "agir": [ad for ad in isitma.AGIR_MODULLER if ad in sys.modules]}}))
+"""
+
+_ILK_CIZIM_BETIGI = """
+import json, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=60)
+at.secrets["GEMINI_API_KEY"] = "kiyaslama"
+at.secrets["gcp_service_account"] = {{"type": "service_account"}}
+baslangic = time.perf_counter()
+at.run()
+print(json.dumps({{"sure": time.perf_counter() - baslangic, "hata": [str(e.value) for e in at.exception]}}))
+"""
+
+
+def _argumanlar(argv):
+    p = argparse.ArgumentParser(prog="python -m kiyaslama.baslangic", description="Soğuk başlangıç süresi")
+    p.add_argument("--tekrar", type=int, default=5, help="Her ölçüm için yeni süreç sayısı")
+    p.add_argument("--esik-ms", type=float, help="İlk çizim medyanı bunu aşarsa çıkış kodu 1")
+    p.add_argument("--json", help="Sonuçları bu dosyaya yaz")
+    return p.parse_args(argv)
+
+
+def _yeni_surecte(betik):
+    ortam = dict(os.environ, LAB_VERI_DIZINI=tempfile.mkdtemp(prefix="baslangic_"), PYTHONPATH=KOK)
+    cikti = subprocess.run([sys.executable, "-c", betik], cwd=KOK, env=ortam, capture_output=True, text=True,
+                           check=True)
+    return json.loads(cikti.stdout.strip().splitlines()[-1])
+
+
+def _ozet(sureler):
+    ms = np.array(sureler) * 1000
+    return {"n": len(ms), "p50_ms": round(float(np.median(ms)), 1), "en_kotu_ms": round(float(ms.max()), 1)}
+
+
+def calistir(args):
+    importlar = [_yeni_surecte(_IMPORT_BETIGI.format(moduller=ANA_SAYFA_MODULLERI)) for _ in range(args.tekrar)]
+    cizimler = [_yeni_surecte(_ILK_CIZIM_BETIGI.format(app=os.path.join(KOK, "app.py"))) for _ in range(args.tekrar)]
+    return {
+        "import": _ozet([s["sure"] for s in importlar]),
+        "ilk_cizim": _ozet([s["sure"] for s in cizimler]),
+        "agir_moduller": sorted({ad for s in importlar for ad in s["agir"]}),
+        "hatalar": sorted({h for s in cizimler for h in s["hata"]}),
+    }
+
+
+def main(argv=None):
+    args = _argumanlar(argv)
+    sonuc = calistir(args)
+    print(f"{'Ölçüm':<14}{'n':>4}{'p50 (ms)':>12}{'en kötü (ms)':>15}")
+    for ad in ("import", "ilk_cizim"):
+        ozet = sonuc[ad]
+        print(f"{ad:<14}{ozet['n']:>4}{ozet['p50_ms']:>12}{ozet['en_kotu_ms']:>15}")
+    if sonuc["agir_moduller"]:
+        print(f"İlk çizimde yüklenen ağır modüller: {', '.join(sonuc['agir_moduller'])}")
+    for hata in sonuc["hatalar"]:
+        print(f"Sayfa hatası: {hata}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sonuc, f, ensure_ascii=False, indent=2)
+
+    esik_asildi = args.esik_ms is not None and sonuc["ilk_cizim"]["p50_ms"] > args.esik_ms
+    if sonuc["agir_moduller"] or sonuc["hatalar"] or esik_asildi:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# --- SENTETİK LABORATUVAR FOTOĞRAFLARI ---
+# Gerçek örnek fotoğraf yoksa telefon fotoğrafına benzeyen (12 MP, gürültülü, beyaz zemin
+# üzerinde tablo) JPEG'ler üretir; ön işleme ve yükleme boyutları gerçekçi olsun diye.
+import io
+import random
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+BOYUT = (3024, 4032)
+SATIRLAR = ["WBC", "NEU#", "LYM#", "IG#", "HGB", "PLT", "RDW-CV", "CRP", "Prokalsitonin"]
+
+
+def ornek_fotograf(sira, boyut=BOYUT, kalite=92):
+    rastgele = random.Random(sira)
+    img = Image.new("RGB", boyut, (236, 234, 228))
+    # Kağıt dokusu ve ışık farkı: JPEG boyutu gerçek fotoğraflara yaklaşsın
+    gurultu = Image.effect_noise(boyut, 28).convert("RGB")
+    img = Image.blend(img, gurultu, 0.12)
+
+    ciz = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=90)
+    ciz.text((250, 300), f"Protokol No: PRT-{sira:05d}", fill=(20, 20, 20), font=font)
+    for i, ad in enumerate(SATIRLAR):
+        y = 600 + i * 260
+        ciz.text((250, y), ad, fill=(25, 25, 25), font=font)
+        ciz.text((1400, y), f"{rastgele.uniform(0.1, 300):.2f}", fill=(25, 25, 25), font=font)
+        ciz.line((200, y + 150, boyut[0] - 200, y + 150), fill=(120, 120, 120), width=4)
+    img = img.rotate(rastgele.uniform(-3, 3), fillcolor=(200, 200, 195)).filter(ImageFilter.GaussianBlur(1.2))
+
+    cikti = io.BytesIO()
+    img.save(cikti, format="JPEG", quality=kalite)
+    return cikti.getvalue()
@@ -0,0 +1,164 @@
+# --- SAHTE GEMINI SUNUCUSU ---
+# generateContent / streamGenerateContent (SSE) uç noktalarını taklit eden yerel HTTP sunucusu.
+# Gecikme, hata oranı ve akış parçalarının aralığı ayarlanabilir; gelen/giden bayt ve
+# istek sayıları kaydedilir. Aynı görüntü her zaman aynı değerleri döndürür.
+# dakika_kotasi verilirse son 60 sn'deki istek sayısı aşıldığında gerçek API gibi 429 döner.
+import collections
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Hastanın "normal" değerleri; görüntü özetine göre küçük sapmalarla döndürülür
+TIPIK_DEGERLER = {
+    "HGB": 12.1, "PLT": 280, "RDW": 13.2, "NEUT_HASH": 4.1, "LYMPH_HASH": 2.9,
+    "IG_HASH": 0.03, "WBC": 7.6, "CRP": 4.2, "Prokalsitonin": 0.12,
+}
+PRO_CARPANI = 2.5       # Pro model (adında "pro" geçen) bu kat daha yavaş cevap verir
+_YOL = re.compile(r"/v1beta/models/(?P<model>[^:/]+):(?P<islem>generateContent|streamGenerateContent)")
+
+
+def _cevap(govde, supheli):
+    """İstekteki şemaya göre modelin döndüreceği JSON metni."""
+    ozet = hashlib.sha256()
+    for parca in govde["contents"][0]["parts"]:
+        if "inline_data" in parca:
+            ozet.update(parca["inline_data"]["data"].encode("ascii"))
+    tohum = int.from_bytes(ozet.digest()[:8], "big")
+    rastgele = random.Random(tohum)
+
+    alanlar = govde["generationConfig"]["responseSchema"]["properties"]
+    veri = {}
+    for alan in alanlar:
+        if alan == "ID":
+            veri[alan] = f"PRT-{tohum % 100000:05d}"
+        elif alan in TIPIK_DEGERLER:
+            veri[alan] = round(TIPIK_DEGERLER[alan] * rastgele.uniform(0.85, 1.15), 2)
+        else:
+            veri[alan] = None
+    if supheli and "PLT" in veri:
+        # Hızlı modelin kontrollerden geçemediği durum: kademeli okuma Pro modele geçer
+        veri["PLT"] = None
+    return json.dumps(veri)
+
+
+def _aday(metin):
+    return {"candidates": [{"content": {"parts": [{"text": metin}], "role": "model"}}]}
+
+
+class _Isleyici(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _gonder(self, durum, govde, basliklar=()):
+        self.send_response(durum)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(govde)))
+        for ad, deger in basliklar:
+            self.send_header(ad, deger)
+        self.end_headers()
+        self.wfile.write(govde)
+        self.server.sahte._say(giden=len(govde))
+
+    def do_POST(self):
+        sahte = self.server.sahte
+        gelen = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        eslesme = _YOL.match(self.path)
+        sahte._say(istek=1, gelen=len(gelen))
+        if not eslesme:
+            return self._gonder(404, b'{"error": {"message": "bulunamadi"}}')
+
+        model, akis = eslesme["model"], eslesme["islem"] == "streamGenerateContent"
+        kalan = sahte._kota_kontrolu()
+        if kalan:
+            sahte._say(kota_asimi=1)
+            return self._gonder(429, b'{"error": {"message": "kota asildi"}}', [("Retry-After", f"{kalan:.0f}")])
+        with sahte._kilit:
+            hata = sahte._rastgele.random() < sahte.hata_orani
+            supheli = "pro" not in model and sahte._rastgele.random() < sahte.supheli_orani
+            gecikme = max(0.0, sahte._rastgele.gauss(sahte.gecikme, sahte.gecikme * sahte.sapma))
+        if "pro" in model:
+            gecikme *= PRO_CARPANI
+
+        if hata:
+            sahte._say(hata=1)
+            time.sleep(gecikme / 4)
+            return self._gonder(sahte.hata_kodu, b'{"error": {"message": "sahte gecici hata"}}')
+
+        metin = _cevap(json.loads(gelen), supheli)
+        if not akis:
+            time.sleep(gecikme)
+            return self._gonder(200, json.dumps(_aday(metin)).encode())
+
+        # SSE: ilk parça "düşünme" süresinden sonra, kalanı parça aralığıyla (chunked)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        time.sleep(gecikme)
+        boy = max(1, len(metin) // sahte.akis_parca_sayisi)
+        for i in range(0, len(metin), boy):
+            olay = f"data: {json.dumps(_aday(metin[i:i + boy]))}\r\n\r\n".encode()
+            self.wfile.write(f"{len(olay):X}\r\n".encode() + olay + b"\r\n")
+            self.wfile.flush()
+            sahte._say(giden=len(olay))
+            time.sleep(sahte.akis_parca_araligi)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class SahteGemini:
+    def __init__(self, gecikme=0.8, sapma=0.2, hata_orani=0.0, hata_kodu=503, supheli_orani=0.0,
+                 akis_parca_sayisi=8, akis_parca_araligi=0.05, tohum=0, dakika_kotasi=None):
+        self.gecikme = gecikme                  # Ortalama model gecikmesi (sn)
+        self.sapma = sapma                      # Gecikmenin bağıl standart sapması
+        self.hata_orani = hata_orani            # Geçici hata (429/503) döndürülen istek oranı
+        self.hata_kodu = hata_kodu
+        self.supheli_orani = supheli_orani      # Hızlı modelin kontrolden geçemeyen cevap oranı
+        self.akis_parca_sayisi = akis_parca_sayisi
+        self.akis_parca_araligi = akis_parca_araligi
+        self.dakika_kotasi = dakika_kotasi
+        self._kabul_edilenler = collections.deque()
+        self._rastgele = random.Random(tohum)
+        self._kilit = threading.Lock()
+        self.sayaclar = {"istek": 0, "hata": 0, "kota_asimi": 0, "gelen": 0, "giden": 0}
+        self._sunucu = ThreadingHTTPServer(("127.0.0.1", 0), _Isleyici)
+        self._sunucu.daemon_threads = True
+        self._sunucu.sahte = self
+        self._thread = None
+
+    def _say(self, **artislar):
+        with self._kilit:
+            for ad, artis in artislar.items():
+                self.sayaclar[ad] += artis
+
+    def _kota_kontrolu(self):
+        """Kota doluysa pencerenin açılmasına kalan süre, değilse None (istek sayılır)."""
+        if not self.dakika_kotasi:
+            return None
+        with self._kilit:
+            simdi = time.monotonic()
+            while self._kabul_edilenler and self._kabul_edilenler[0] <= simdi - 60:
+                self._kabul_edilenler.popleft()
+            if len(self._kabul_edilenler) >= self.dakika_kotasi:
+                return max(1.0, self._kabul_edilenler[0] + 60 - simdi)
+            self._kabul_edilenler.append(simdi)
+            return None
+
+    @property
+    def adres(self):
+        host, port = self._sunucu.server_address
+        return f"http://{host}:{port}"
+
+    def baslat(self):
+        self._thread = threading.Thread(target=self._sunucu.serve_forever, name="sahte-gemini", daemon=True)
+        self._thread.start()
+        return self
+
+    def durdur(self):
+        self._sunucu.shutdown()
+        self._sunucu.server_close()
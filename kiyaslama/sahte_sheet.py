@@ -0,0 +1,61 @@
+# --- SAHTE GOOGLE SHEETS ÇALIŞMA SAYFASI ---
+# gspread Worksheet'in uygulamanın kullandığı metotlarını taklit eder; her çağrıyı
+# (ad, satır sayısı, süre) olarak kaydeder. Gecikme gerçek API'nin tur süresini temsil eder.
+import threading
+import time
+
+
+class SahteWorksheet:
+    def __init__(self, gecikme=0.3, basliklar=None):
+        self.gecikme = gecikme
+        self.satirlar = [list(basliklar or [])]
+        self.cagrilar = []
+        self._kilit = threading.Lock()
+
+    def _cagri(self, ad, satir_sayisi, islem):
+        baslangic = time.perf_counter()
+        time.sleep(self.gecikme)
+        with self._kilit:
+            sonuc = islem()
+            self.cagrilar.append({"ad": ad, "satir": satir_sayisi, "sure": time.perf_counter() - baslangic})
+        return sonuc
+
+    def append_rows(self, satirlar, **kwargs):
+        return self._cagri("append_rows", len(satirlar), lambda: self.satirlar.extend(list(s) for s in satirlar))
+
+    def append_row(self, satir, **kwargs):
+        return self._cagri("append_row", 1, lambda: self.satirlar.append(list(satir)))
+
+    def batch_update(self, guncellemeler, **kwargs):
+        def _guncelle():
+            for guncelleme in guncellemeler:
+                satir_no = int(guncelleme["range"].split(":")[0].lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+                self.satirlar[satir_no - 1] = list(guncelleme["values"][0])
+        return self._cagri("batch_update", len(guncellemeler), _guncelle)
+
+    def col_values(self, sutun, **kwargs):
+        return self._cagri("col_values", len(self.satirlar),
+                           lambda: [s[sutun - 1] if len(s) >= sutun else "" for s in self.satirlar])
+
+    def get_all_values(self, **kwargs):
+        return self._cagri("get_all_values", len(self.satirlar), lambda: [list(s) for s in self.satirlar])
+
+    def _aralik(self, aralik):
+        # "A5:M" ya da "A2:A40" biçimindeki aralıklar; sondaki boş hücreler API'deki gibi atılır
+        bas, son = aralik.split(":")
+        ilk = int(bas.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+        son_satir = int(son.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ") or len(self.satirlar))
+        genislik = ord(son[0]) - ord("A") + 1
+        satirlar = [list(s[:genislik]) for s in self.satirlar[ilk - 1:son_satir]]
+        for satir in satirlar:
+            while satir and satir[-1] in ("", None):
+                satir.pop()
+        while satirlar and not satirlar[-1]:
+            satirlar.pop()
+        return satirlar
+
+    def get(self, aralik, **kwargs):
+        return self._cagri("get", 0, lambda: self._aralik(aralik))
+
+    def batch_get(self, araliklar, **kwargs):
+        return self._cagri("batch_get", 0, lambda: [self._aralik(aralik) for aralik in araliklar])
@@ -0,0 +1,123 @@
+# --- LAB PANELİNİN GÖMÜLMESİ VE KÜMELENMESİ ---
+# Panel sütunları log + eksik değer doldurma + standartlaştırmadan geçirilip PCA ya da UMAP
+# ile iki boyuta indirilir, KMeans ile kümelenir. Eğitilmiş model süreç boyunca tutulur;
+# sonradan gelen hastalar yeniden eğitim yapılmadan transform/predict ile yerleştirilir.
+# Yeni hasta oranı YENIDEN_EGITIM_ORANI'nı aşınca (ya da istenince) model baştan eğitilir.
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+PANEL = ["HGB", "PLT", "RDW", "NEUT_HASH", "LYMPH_HASH", "IG_HASH", "CRP", "Prokalsitonin"]
+ZORUNLU = ["HGB", "PLT", "NEUT_HASH", "LYMPH_HASH"]     # Bunlardan biri eksikse hasta çizilmez
+CARPIK = ["PLT", "NEUT_HASH", "LYMPH_HASH", "IG_HASH", "CRP", "Prokalsitonin"]   # log1p uygulanır
+YONTEMLER = ["PCA", "UMAP"]
+YENIDEN_EGITIM_ORANI = 0.2
+EN_AZ_HASTA = 10
+
+
+def _satir_anahtarlari(df):
+    # Konumlar satır numarasına değil panel değerlerine bağlı: satır silinip numaralar
+    # kaysa da düzeltilen satır yeni hasta gibi yeniden yerleştirilir
+    return pd.util.hash_pandas_object(df[PANEL], index=False).to_numpy()
+
+
+def uygun_satirlar(df):
+    panel = df.reindex(columns=PANEL).apply(pd.to_numeric, errors="coerce").astype("float64")
+    return panel[panel[ZORUNLU].notna().all(axis=1)]
+
+
+def _on_isleyici():
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+    log = FunctionTransformer(lambda x: np.log1p(np.clip(x, 0, None)), feature_names_out="one-to-one")
+    return make_pipeline(
+        ColumnTransformer(
+            [("log", log, [PANEL.index(a) for a in CARPIK])],
+            remainder="passthrough",
+        ),
+        # IG#, CRP ve prokalsitonin sık eksik: medyanla doldurulur
+        SimpleImputer(strategy="median"),
+        StandardScaler(),
+    )
+
+
+def _indirgeyici(yontem):
+    if yontem == "UMAP":
+        import umap   # Ağır (numba) import: yalnızca UMAP seçilince
+        return umap.UMAP(n_components=2, n_neighbors=15, min_dist=0.1, random_state=42)
+    from sklearn.decomposition import PCA
+    return PCA(n_components=2, random_state=42)
+
+
+class KumeModeli:
+    def __init__(self, yontem, kume_sayisi):
+        self.yontem = yontem
+        self.kume_sayisi = kume_sayisi
+        self._kilit = threading.Lock()
+        self.egitildi = None          # Eğitim zamanı
+        self.egitim_sayisi = 0
+        self.egitim_suresi = None
+        self._konumlar = {}           # satır anahtarı -> (x, y, küme, eğitimde mi)
+
+    def egit(self, df):
+        from sklearn.cluster import KMeans
+
+        panel = uygun_satirlar(df)
+        baslangic = time.monotonic()
+        with self._kilit:
+            self.on_isleyici = _on_isleyici()
+            ozellikler = self.on_isleyici.fit_transform(panel.to_numpy())
+            self.indirgeyici = _indirgeyici(self.yontem)
+            koordinatlar = self.indirgeyici.fit_transform(ozellikler)
+            self.kmeans = KMeans(n_clusters=self.kume_sayisi, n_init=10, random_state=42).fit(ozellikler)
+            self._konumlar = {
+                anahtar: (x, y, kume, True)
+                for anahtar, (x, y), kume in zip(_satir_anahtarlari(panel), koordinatlar, self.kmeans.labels_)
+            }
+            self.egitildi = time.time()
+            self.egitim_sayisi = len(panel)
+            self.egitim_suresi = time.monotonic() - baslangic
+
+    def yerlestir(self, df):
+        """df'teki uygun satırların konumlarını döndürür; eğitimde olmayanlar transform ile eklenir.
+
+        Sonuç df ile aynı index'e sahip X, Y, KUME, YENI sütunlarıdır (uygun olmayan satırlar hariç).
+        """
+        panel = uygun_satirlar(df)
+        anahtarlar = _satir_anahtarlari(panel)
+        with self._kilit:
+            yeni = [i for i, anahtar in enumerate(anahtarlar) if anahtar not in self._konumlar]
+            if yeni:
+                ozellikler = self.on_isleyici.transform(panel.iloc[yeni].to_numpy())
+                koordinatlar = self.indirgeyici.transform(ozellikler)
+                kumeler = self.kmeans.predict(ozellikler)
+                for i, (x, y), kume in zip(yeni, koordinatlar, kumeler):
+                    self._konumlar[anahtarlar[i]] = (x, y, kume, False)
+            konumlar = [self._konumlar[anahtar] for anahtar in anahtarlar]
+        return pd.DataFrame(konumlar, index=panel.index, columns=["X", "Y", "KUME", "EGITIMDE"]).assign(
+            YENI=lambda d: ~d["EGITIMDE"], KUME=lambda d: "Küme " + (d["KUME"] + 1).astype(str)
+        ).drop(columns="EGITIMDE")
+
+    def eskidi_mi(self, df):
+        """Eğitimden sonra gelen hasta oranı eşiği aştı mı?"""
+        return len(uygun_satirlar(df)) > self.egitim_sayisi * (1 + YENIDEN_EGITIM_ORANI)
+
+
+_modeller = {}
+_modeller_kilidi = threading.Lock()
+
+
+def get_model(yontem, kume_sayisi, df, yeniden_egit=False):
+    """(yöntem, küme sayısı) için eğitilmiş modeli döndürür; yoksa/eskidiyse eğitir."""
+    with _modeller_kilidi:
+        model = _modeller.get((yontem, kume_sayisi))
+        if model is None:
+            model = _modeller[(yontem, kume_sayisi)] = KumeModeli(yontem, kume_sayisi)
+    if yeniden_egit or model.egitildi is None or model.eskidi_mi(df):
+        model.egit(df)
+    return model
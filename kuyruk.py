@@ -0,0 +1,235 @@
+# --- KALICI KAYIT KUYRUĞU ---
+# Onaylanan satırlar önce yerel SQLite dosyasına yazılır (yeniden başlatmada kaybolmaz),
+# arka plandaki gönderici iş parçacığı bunları toplu append_rows ile Google Sheets'e aktarır.
+# hedef_satir verilen kayıtlar yeni satır olarak eklenmez, sheet'teki o satırın üzerine yazılır;
+# satır numarası yerel kopyadan geldiği için o satırda beklenen hasta (beklenen_kimlik) durmuyorsa
+# (arada satır eklenmiş, silinmiş, sıralanmış) güncelleme yapılmaz, kayıt kenara alınır.
+# İnternet koptuğunda satırlar kuyrukta bekler ve artan aralıklarla yeniden denenir.
+# Yazma kotası dolduğunda gönderici sırası gelene kadar bekleyip öyle satır seçer: bekleme
+# sırasında gelen satırlar da aynı append_rows çağrısına girer (birikme toplu gönderime döner).
+# Sheets'in reddettiği (bozuk satır, geçersiz aralık) bir toplu gönderimin satırları tek tek
+# denenir; EN_FAZLA_DENEME kez reddedilen satır kenara alınır ve arkasındaki yazmaları bekletmez.
+import json
+import random
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import hiz_siniri
+from ayarlar import veri_yolu
+
+TOPLU_GONDERIM = 100        # Tek append_rows çağrısındaki en fazla satır
+BEKLEME_MIN = 2.0           # Hata sonrası ilk bekleme (sn)
+BEKLEME_MAX = 300.0         # Hata sonrası en uzun bekleme (sn)
+BOSTA_KONTROL = 30.0        # Kuyruk boşken uyanma aralığı (sn)
+EN_FAZLA_DENEME = 5         # Bu kadar reddedilen satır kenara alınır (ağ/kota hataları sayılmaz)
+
+
+def _reddedildi_mi(hata):
+    """Sheets isteği geçersiz buldu mu? (4xx; yetki, zaman aşımı ve kota hataları geçicidir)"""
+    kod = getattr(getattr(hata, "response", None), "status_code", None)
+    return kod is not None and 400 <= kod < 500 and kod not in (401, 403, 408, 429)
+
+
+class KayitKuyrugu:
+    def __init__(self, yol, kota=None):
+        self.yol = yol
+        self.kota = kota            # hiz_siniri.JetonKovasi: gönderimler bu kovanın hızında toplanır
+        self.son_hata = None
+        self._uyandir = threading.Event()
+        self._bosaltma_kilidi = threading.Lock()
+        self._thread = None
+        with closing(self._baglan()) as db, db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS kayitlar (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    satir TEXT NOT NULL,
+                    eklenme REAL NOT NULL,
+                    gonderilme REAL,
+                    deneme INTEGER NOT NULL DEFAULT 0,
+                    son_hata TEXT
+                )
+            """)
+            # Eski kuyruk dosyalarında bu sütun yok
+            sutunlar = {k[1] for k in db.execute("PRAGMA table_info(kayitlar)")}
+            if "hedef_satir" not in sutunlar:
+                db.execute("ALTER TABLE kayitlar ADD COLUMN hedef_satir INTEGER")
+            if "beklenen_kimlik" not in sutunlar:
+                db.execute("ALTER TABLE kayitlar ADD COLUMN beklenen_kimlik TEXT")
+            db.execute("CREATE INDEX IF NOT EXISTS ix_bekleyen ON kayitlar(gonderilme, id)")
+
+    def _baglan(self):
+        db = sqlite3.connect(self.yol, timeout=30)
+        # Her commit diske fsync ile yazılsın (elektrik kesintisinde satır kaybolmasın)
+        db.execute("PRAGMA synchronous=FULL")
+        return db
+
+    def ekle(self, satir, hedef_satir=None, beklenen_kimlik=None):
+        """hedef_satir verilirse satır eklenmez, sheet'teki o satır (içinde beklenen_kimlik varsa) güncellenir."""
+        with closing(self._baglan()) as db, db:
+            cur = db.execute(
+                "INSERT INTO kayitlar (satir, eklenme, hedef_satir, beklenen_kimlik) VALUES (?, ?, ?, ?)",
+                (json.dumps(satir, ensure_ascii=False), time.time(), hedef_satir, beklenen_kimlik),
+            )
+            kayit_id = cur.lastrowid
+        self._uyandir.set()
+        return kayit_id
+
+    def toplu_ekle(self, satirlar, ayni_islemde=None):
+        """Birden çok satırı tek işlemde (tek fsync) kuyruğa yazar.
+
+        ayni_islemde(db) verilirse aynı işlemde çalıştırılır (kuyruk dosyasındaki başka bir tabloyu
+        satırlarla birlikte ya hep ya hiç güncellemek için).
+        """
+        simdi = time.time()
+        with closing(self._baglan()) as db, db:
+            db.executemany(
+                "INSERT INTO kayitlar (satir, eklenme) VALUES (?, ?)",
+                [(json.dumps(satir, ensure_ascii=False), simdi) for satir in satirlar],
+            )
+            if ayni_islemde is not None:
+                ayni_islemde(db)
+        self._uyandir.set()
+
+    def sayilar(self):
+        with closing(self._baglan()) as db:
+            bekleyen, gonderilen, hatali = db.execute(
+                "SELECT SUM(gonderilme IS NULL AND deneme < ?), SUM(gonderilme IS NOT NULL), "
+                "SUM(gonderilme IS NULL AND deneme >= ?) FROM kayitlar",
+                (EN_FAZLA_DENEME, EN_FAZLA_DENEME),
+            ).fetchone()
+        return {"bekleyen": bekleyen or 0, "gonderilen": gonderilen or 0, "hatali": hatali or 0}
+
+    def hatalilar(self):
+        """Kenara alınan satırlar: [(id, satır, son hata), ...]"""
+        with closing(self._baglan()) as db:
+            kayitlar = db.execute(
+                "SELECT id, satir, son_hata FROM kayitlar WHERE gonderilme IS NULL AND deneme >= ? ORDER BY id",
+                (EN_FAZLA_DENEME,),
+            ).fetchall()
+        return [(k[0], json.loads(k[1]), k[2]) for k in kayitlar]
+
+    def yeniden_dene(self, idler):
+        """Kenara alınan satırları (ör. sheet düzeltildikten sonra) yeniden kuyruğa alır."""
+        yer = ",".join("?" * len(idler))
+        with closing(self._baglan()) as db, db:
+            db.execute(f"UPDATE kayitlar SET deneme = 0 WHERE gonderilme IS NULL AND id IN ({yer})", list(idler))
+        self._uyandir.set()
+
+    def son_eklenenler(self, zaman):
+        """Bekleyen ya da zaman'dan sonra gönderilmiş satırlar (yerel kopyaya henüz gelmemiş olabilirler)."""
+        with closing(self._baglan()) as db:
+            kayitlar = db.execute(
+                "SELECT satir FROM kayitlar WHERE gonderilme IS NULL OR gonderilme >= ? ORDER BY id",
+                (zaman,),
+            ).fetchall()
+        return [json.loads(k[0]) for k in kayitlar]
+
+    def _gonder(self, idler, islem):
+        """islem() {kayıt id: sebep} döndürürse o kayıtlar gönderilmiş sayılmaz, kenara alınır."""
+        yer = ",".join("?" * len(idler))
+        try:
+            kenara = islem() or {}
+        except Exception as e:
+            self.son_hata = str(e)
+            with closing(self._baglan()) as db, db:
+                db.execute(
+                    f"UPDATE kayitlar SET deneme = deneme + ?, son_hata = ? WHERE id IN ({yer})",
+                    [int(_reddedildi_mi(e)), self.son_hata, *idler],
+                )
+            raise
+        with closing(self._baglan()) as db, db:
+            db.execute(
+                f"UPDATE kayitlar SET gonderilme = ?, son_hata = NULL WHERE id IN ({yer})",
+                [time.time(), *idler],
+            )
+            db.executemany(
+                "UPDATE kayitlar SET gonderilme = NULL, deneme = ?, son_hata = ? WHERE id = ?",
+                [(EN_FAZLA_DENEME, sebep, kayit_id) for kayit_id, sebep in kenara.items()],
+            )
+        self.son_hata = None
+        return len(idler) - len(kenara)
+
+    def bosalt(self, yazici, guncelleyici=None, en_fazla=TOPLU_GONDERIM):
+        """Bekleyen satırları sırayla gönderir; gönderilen satır sayısını döndürür.
+
+        Yeni satırlar yazici(satirlar) ile, hedef satırı olanlar guncelleyici([(satir_no, satir, beklenen_kimlik), ...])
+        ile yazılır; guncelleyici yazmadığı kayıtları {sıra: sebep} olarak döndürür, bunlar kenara alınır.
+        Reddedilmiş bir gönderimin satırları, hangisinin bozuk olduğu bulunsun diye tek tek gönderilir.
+        """
+        toplam = 0
+        with self._bosaltma_kilidi:
+            while True:
+                if self.kota is not None:
+                    time.sleep(self.kota.beklenen_sure())
+                with closing(self._baglan()) as db:
+                    kayitlar = db.execute(
+                        "SELECT id, satir, hedef_satir, deneme, beklenen_kimlik FROM kayitlar "
+                        "WHERE gonderilme IS NULL AND deneme < ? ORDER BY id LIMIT ?",
+                        (EN_FAZLA_DENEME, en_fazla),
+                    ).fetchall()
+                if not kayitlar:
+                    break
+                if kayitlar[0][3]:
+                    kayitlar = kayitlar[:1]
+
+                eklenecek = [k for k in kayitlar if k[2] is None]
+                guncellenecek = [k for k in kayitlar if k[2] is not None]
+                if eklenecek:
+                    toplam += self._gonder([k[0] for k in eklenecek],
+                                 lambda: yazici([json.loads(k[1]) for k in eklenecek]) and None)
+                if guncellenecek:
+                    if guncelleyici is None:
+                        raise RuntimeError("Satır güncellemesi için guncelleyici verilmedi")
+
+                    def _guncelle():
+                        yazilmayan = guncelleyici([(k[2], json.loads(k[1]), k[4]) for k in guncellenecek]) or {}
+                        return {guncellenecek[sira][0]: sebep for sira, sebep in yazilmayan.items()}
+
+                    toplam += self._gonder([k[0] for k in guncellenecek], _guncelle)
+        return toplam
+
+    def baslat(self, yazici, guncelleyici=None):
+        """Arka plan göndericisini başlatır (zaten çalışıyorsa bir şey yapmaz)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        # Önceki çalışmadan kalan satırlar varsa beklemeden gönderilsin
+        self._uyandir.set()
+        self._thread = threading.Thread(
+            target=self._dongu, args=(yazici, guncelleyici), name="kayit-kuyrugu", daemon=True
+        )
+        self._thread.start()
+
+    def simdi_gonder(self):
+        self._uyandir.set()
+
+    def _dongu(self, yazici, guncelleyici):
+        hata_sayisi = 0
+        while True:
+            if hata_sayisi:
+                # Üstel artış + rastgele sapma (tüm oturumlar aynı anda denemesin)
+                bekleme = min(BEKLEME_MAX, BEKLEME_MIN * 2 ** (hata_sayisi - 1))
+                bekleme = random.uniform(bekleme / 2, bekleme)
+            else:
+                bekleme = BOSTA_KONTROL
+            self._uyandir.wait(bekleme)
+            self._uyandir.clear()
+            try:
+                self.bosalt(yazici, guncelleyici)
+                hata_sayisi = 0
+            except Exception:
+                hata_sayisi += 1
+
+
+_kuyruk = None
+_kuyruk_kilidi = threading.Lock()
+
+
+def get_kuyruk():
+    global _kuyruk
+    with _kuyruk_kilidi:
+        if _kuyruk is None:
+            _kuyruk = KayitKuyrugu(veri_yolu("kuyruk.db"), kota=hiz_siniri.get_kova("sheets_yazma"))
+        return _kuyruk
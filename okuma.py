@@ -0,0 +1,498 @@
+# --- GEMINI İLE OKUMA ---
+# Prompt, model çağrısı ve cevabın JSON'a çevrilmesi. Önbellekte aynı görüntü + prompt +
+# model için kayıt varsa modele hiç gidilmez. Hemogram ve biyokimya istenirse ayrı
+# isteklerle aynı anda okunup tek satırda birleştirilir. Temiz çıktılarda hızlı model yeterli
+# olduğundan Pro model yalnızca hızlı modelin sonucu kontrollerden geçemezse çağrılır.
+import contextvars
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+import dogrulama
+import gemini_istemci
+import goruntu
+import olcum
+import onbellek
+from ayarlar import GEMINI_API_TABANI
+
+# MODEL: Gemini 3.0 Pro Preview
+MODEL = "gemini-3-pro-preview"
+# Kademeli okuma: önce hızlı model; sonuç kontrollerden geçemezse sıradaki (Pro) model
+HIZLI_MODEL = "gemini-2.5-flash"
+MODEL_KADEMELERI = [HIZLI_MODEL, MODEL]
+API_URL = GEMINI_API_TABANI + "/v1beta/models/{model}:generateContent?key={api_key}"
+AKIS_URL = GEMINI_API_TABANI + "/v1beta/models/{model}:streamGenerateContent?alt=sse&key={api_key}"
+
+# --- PROMPT ---
+# Parametre adı -> prompt'ta nasıl tarif edildiği
+ALAN_TARIFLERI = {
+    "HGB": "HGB (Hemoglobin)",
+    "PLT": "PLT (Trombosit)",
+    "RDW": "RDW",
+    "NEUT_HASH": "NEU# (Nötrofil Mutlak) -> Yoksa 'null'",
+    "LYMPH_HASH": "LYM# (Lenfosit Mutlak) -> Yoksa 'null'",
+    "IG_HASH": "IG# (İmmatür Granülosit) -> Yoksa 'null'",
+    "WBC": "WBC (Lökosit, toplam) -> Yoksa 'null'",
+    "CRP": "CRP -> Yoksa 'null'",
+    "Prokalsitonin": "Prokalsitonin -> Yoksa 'null'",
+}
+ORNEK_DEGERLER = {"PLT": "0"}
+
+# WBC sheet'e yazılmaz, yalnızca NEU#/LYM# tutarlılık kontrolü için okunur
+HEMOGRAM_ALANLARI = ["HGB", "PLT", "RDW", "NEUT_HASH", "LYMPH_HASH", "IG_HASH", "WBC"]
+BIYOKIMYA_ALANLARI = ["CRP", "Prokalsitonin"]
+TUM_ALANLAR = HEMOGRAM_ALANLARI + BIYOKIMYA_ALANLARI
+
+
+def prompt_olustur(alanlar):
+    bulunacaklar = "\n".join(f"            - {ALAN_TARIFLERI[alan]}" for alan in alanlar)
+    ornek = ", ".join(['"ID": "..."'] + [f'"{alan}": {ORNEK_DEGERLER.get(alan, "0.0")}' for alan in alanlar])
+    return f"""
+            GÖREV: Sen titiz bir veri giriş operatörüsün.
+
+            YÖNTEM (SATIR TAKİP):
+            1. Sol sütunda Parametre Adını bul.
+            2. Parmağını sağa kaydır, REFERANS ARALIĞINI ATLA, SONUÇ (Result) değerini al.
+
+            BULUNACAKLAR:
+{bulunacaklar}
+
+            KİMLİK:
+            - Sol üstteki İsim/Protokol -> 'ID'
+
+            ÇIKTI (JSON):
+            {{ {ornek} }}
+            """
+
+
+PROMPT = prompt_olustur(TUM_ALANLAR)
+
+
+class SunucuHatasi(Exception):
+    def __init__(self, status_code, metin):
+        super().__init__(f"Sunucu Hatası: {status_code}")
+        self.status_code = status_code
+        self.metin = metin
+
+
+class AyristirmaHatasi(Exception):
+    def __init__(self, metin):
+        super().__init__("Veri okunamadı. Resim net olmayabilir.")
+        self.metin = metin
+
+
+class OkumaIptal(Exception):
+    def __init__(self):
+        super().__init__("Okuma iptal edildi.")
+
+
+class IptalBayragi:
+    """Başka bir iş parçacığından okumayı durdurur; açık akış bağlantılarını hemen kapatır."""
+
+    def __init__(self):
+        self._olay = threading.Event()
+        self._kilit = threading.Lock()
+        self._yanitlar = set()
+
+    @property
+    def iptal_edildi(self):
+        return self._olay.is_set()
+
+    def iptal_et(self):
+        self._olay.set()
+        with self._kilit:
+            yanitlar = list(self._yanitlar)
+        for response in yanitlar:
+            self._kapat(response)
+
+    @staticmethod
+    def _kapat(response):
+        # Okumada bekleyen iş parçacığının hemen uyanması için soketi de kapat
+        try:
+            # urllib3 2: akış başladıktan sonra soket http.client yanıtının içinde
+            sock = getattr(response.raw.connection, "sock", None) or response.raw._fp.fp.raw._sock
+            sock.shutdown(socket.SHUT_RDWR)
+        except (AttributeError, OSError):
+            pass
+        response.close()
+
+    def izle(self, response):
+        with self._kilit:
+            self._yanitlar.add(response)
+        if self.iptal_edildi:
+            self._kapat(response)
+
+    def birak(self, response):
+        with self._kilit:
+            self._yanitlar.discard(response)
+
+
+def istek_parcalari(goruntu_partlari, prompt=PROMPT):
+    return [{"text": prompt}] + list(goruntu_partlari)
+
+
+def _istek_govdesi(content_parts, alanlar):
+    return {
+        "contents": [{"parts": content_parts}],
+        # JSON modu: cevap doğrudan şemaya uyan JSON olur (``` bloğu, açıklama metni yok)
+        "generationConfig": {
+            "responseMimeType": "application/json",
+            "responseSchema": dogrulama.yanit_semasi(alanlar),
+        },
+    }
+
+
+def _parca_metni(result):
+    parts = result['candidates'][0]['content']['parts']
+    # Düşünen modeller metin dışı parçalar da gönderebilir
+    return "".join(part.get("text", "") for part in parts if not part.get("thought"))
+
+
+def gemini_cagir(api_key, content_parts, model=MODEL, alanlar=TUM_ALANLAR):
+    """generateContent çağrısı yapar, modelin döndürdüğü metni verir."""
+    url = API_URL.format(model=model, api_key=api_key)
+    payload = _istek_govdesi(content_parts, alanlar)
+
+    # Ortak oturum: keep-alive, zaman aşımı, 429/503'te geri çekilerek yeniden deneme
+    response = gemini_istemci.get_istemci().post(url, json=payload)
+    if response.status_code != 200:
+        raise SunucuHatasi(response.status_code, response.text)
+
+    result = response.json()
+    try:
+        return _parca_metni(result)
+    except (KeyError, IndexError, TypeError):
+        raise AyristirmaHatasi(json.dumps(result, ensure_ascii=False))
+
+
+def _sse_satirlari(response):
+    # iter_lines sabit boyutlu tampon dolana kadar bekler; read1 gelen baytı hemen verir.
+    # raw okunurken gzip/deflate çözümü kendiliğinden yapılmaz (sunucu ya da vekil sıkıştırabilir)
+    tampon = b""
+    while True:
+        parca = response.raw.read1(8192, decode_content=True)
+        if not parca:
+            break
+        tampon += parca
+        *satirlar, tampon = tampon.split(b"\n")
+        for satir in satirlar:
+            yield satir.rstrip(b"\r").decode("utf-8")
+    if tampon:
+        yield tampon.decode("utf-8")
+
+
+def gemini_akis(api_key, content_parts, model=MODEL, alanlar=TUM_ALANLAR, iptal=None):
+    """streamGenerateContent (SSE) ile metni parça parça verir."""
+    url = AKIS_URL.format(model=model, api_key=api_key)
+    response = gemini_istemci.get_istemci().post(url, json=_istek_govdesi(content_parts, alanlar), stream=True)
+    if response.status_code != 200:
+        raise SunucuHatasi(response.status_code, response.text)
+
+    if iptal is not None:
+        iptal.izle(response)
+    try:
+        for satir in _sse_satirlari(response):
+            if iptal is not None and iptal.iptal_edildi:
+                raise OkumaIptal()
+            if not satir or not satir.startswith("data:"):
+                continue
+            olay = json.loads(satir[len("data:"):])
+            try:
+                yield _parca_metni(olay)
+            except (KeyError, IndexError, TypeError):
+                # Sonlandırma / kullanım bilgisi olayları metin taşımaz
+                continue
+    except Exception:
+        # Bağlantı iptal için kapatıldıysa asıl sebep iptaldir
+        if iptal is not None and iptal.iptal_edildi:
+            raise OkumaIptal()
+        raise
+    finally:
+        if iptal is not None:
+            iptal.birak(response)
+        response.close()
+
+
+def cevabi_ayristir(text_content, alanlar=TUM_ALANLAR):
+    try:
+        veri = dogrulama.json_coz(text_content)
+    except ValueError:
+        raise AyristirmaHatasi(text_content)
+    if not isinstance(veri, dict):
+        raise AyristirmaHatasi(text_content)
+    return dogrulama.tiplendir(veri, alanlar)
+
+
+def _istek_boyutu(content_parts):
+    # JSON gövdesinin yaklaşık boyutu: prompt + base64 görüntüler
+    return sum(len(p.get("text", "")) + len(p.get("inline_data", {}).get("data", "")) for p in content_parts)
+
+
+def _akisla_metin(api_key, content_parts, model, alanlar, geri_bildirim, iptal):
+    metin = ""
+    bildirilen = {}
+    for parca in gemini_akis(api_key, content_parts, model, alanlar, iptal):
+        metin += parca
+        kismi = dogrulama.kismi_json(metin)
+        if kismi != bildirilen:
+            geri_bildirim(kismi)
+            bildirilen = kismi
+    return metin
+
+
+def oku(api_key, content_parts, model=MODEL, onbellegi_atla=False, alanlar=TUM_ALANLAR,
+        geri_bildirim=None, iptal=None):
+    """(veri, onbellekten) döndürür. onbellegi_atla=True ise model yeniden çağrılır, sonuç yine saklanır.
+
+    geri_bildirim verilirse akış uç noktası kullanılır ve o ana kadar okunan alanlar her parçada
+    geri_bildirim(dict) ile bildirilir (başka bir iş parçacığından çağrılabilir).
+    """
+    depo = onbellek.get_onbellek()
+    okuma_anahtari = onbellek.anahtar(content_parts, model)
+
+    if not onbellegi_atla:
+        with olcum.aralik("onbellek", model=model) as bilgi:
+            veri = depo.getir(okuma_anahtari)
+            bilgi["isabet"] = veri is not None
+        if veri is not None:
+            veri = dogrulama.tiplendir(veri, alanlar)
+            if geri_bildirim:
+                geri_bildirim(veri)
+            return veri, True
+
+    if iptal is not None and iptal.iptal_edildi:
+        raise OkumaIptal()
+    istek_bayt = _istek_boyutu(content_parts)
+    olcum.arttir("istek_bayt", istek_bayt)
+    # Yükleme + modelin düşünme süresi + cevabın inmesi (akışta son parçaya kadar)
+    with olcum.aralik("model_istegi", model=model, istek_bayt=istek_bayt, akis=bool(geri_bildirim)):
+        if geri_bildirim:
+            metin = _akisla_metin(api_key, content_parts, model, alanlar, geri_bildirim, iptal)
+        else:
+            metin = gemini_cagir(api_key, content_parts, model, alanlar)
+    with olcum.aralik("ayristirma"):
+        veri = cevabi_ayristir(metin, alanlar)
+    with olcum.aralik("onbellege_yazma"):
+        depo.kaydet(okuma_anahtari, veri)
+    return veri, False
+
+
+def sonuc_sorunlari(veri, alanlar=TUM_ALANLAR, kimlik=True):
+    """Bir üst kademeye geçmeyi gerektiren sorunlar: makullük, tutarlılık ve boş temel alanlar."""
+    sorunlar = dogrulama.tum_sorunlar(veri, alanlar)
+    if kimlik and not veri.get("ID"):
+        sorunlar["ID"] = "Kimlik okunamadı"
+    for alan in ("HGB", "PLT"):
+        if alan in alanlar and veri.get(alan) is None:
+            sorunlar[alan] = f"{alan} boş"
+    if all(veri.get(alan) is None for alan in alanlar):
+        sorunlar["BOS"] = "Hiçbir değer okunamadı"
+    return sorunlar
+
+
+def kademeli_oku(api_key, content_parts, modeller=MODEL_KADEMELERI, onbellegi_atla=False, alanlar=TUM_ALANLAR,
+                 geri_bildirim=None, iptal=None, kimlik=True):
+    """Modelleri sırayla dener; kontrollerden geçen ilk sonucu döndürür: (veri, onbellekten, model).
+
+    Son kademe de sorunlu sonuç verirse o sonuç döner (asistan düzeltir); son kademe hata
+    verirse önceki kademenin sonucu kullanılır. kimlik=False ise boş ID sorun sayılmaz.
+    """
+    sonuc = None
+    son_hata = None
+    for sira, model in enumerate(modeller):
+        try:
+            veri, onbellekten = oku(api_key, content_parts, model, onbellegi_atla, alanlar, geri_bildirim, iptal)
+        except (AyristirmaHatasi, SunucuHatasi) as e:
+            son_hata = e
+            continue
+        sonuc = (veri, onbellekten, model)
+        if sira == len(modeller) - 1 or not sonuc_sorunlari(veri, alanlar, kimlik):
+            return sonuc
+    if sonuc is not None:
+        return sonuc
+    raise son_hata
+
+
+def belgeleri_ayri_oku(api_key, hemo_part=None, bio_part=None, modeller=MODEL_KADEMELERI, onbellegi_atla=False,
+                       geri_bildirim=None, iptal=None):
+    """Her belgeyi kendi alan listesiyle ayrı ve paralel okur.
+
+    (veri, onbellekten, uyarilar) döndürür. Belgelerden biri okunamazsa o belgenin alanları
+    boş kalır ve uyarılara eklenir; ikisi de okunamazsa ilk hata yükseltilir.
+    """
+    belgeler = []
+    if hemo_part:
+        belgeler.append(("Hemogram", hemo_part, HEMOGRAM_ALANLARI))
+    if bio_part:
+        belgeler.append(("Biyokimya", bio_part, BIYOKIMYA_ALANLARI))
+    if not belgeler:
+        raise ValueError("Okunacak belge yok.")
+
+    def _oku(belge):
+        ad, part, alanlar = belge
+        bildir = geri_bildirim
+        if geri_bildirim and ad != belgeler[0][0]:
+            # Canlı önizlemede de hemogramdaki kimlik öncelikli: diğer belgenin kimliği onu ezmesin
+            def bildir(kismi):
+                geri_bildirim({alan: deger for alan, deger in kismi.items() if alan != "ID"})
+        with olcum.aralik(ad):
+            return kademeli_oku(api_key, istek_parcalari([part], prompt_olustur(alanlar)), modeller, onbellegi_atla,
+                                alanlar, bildir, iptal)
+
+    # Aşama ölçümü (contextvars) iş parçacıklarına kendiliğinden geçmez
+    with ThreadPoolExecutor(max_workers=len(belgeler)) as havuz:
+        gelecekler = [(belge, havuz.submit(contextvars.copy_context().run, _oku, belge)) for belge in belgeler]
+
+    veri = {"ID": None, **{alan: None for alan in TUM_ALANLAR}}
+    onbellekten = True
+    uyarilar = []
+    hatalar = []
+    kimlikler = {}
+    kullanilan_modeller = []
+    for (ad, _, alanlar), gelecek in gelecekler:
+        try:
+            belge_verisi, belge_onbellekten, belge_modeli = gelecek.result()
+        except OkumaIptal:
+            raise
+        except Exception as e:
+            hatalar.append(e)
+            uyarilar.append(f"{ad} okunamadı ({e}); bu belgenin değerlerini elle girin.")
+            continue
+        onbellekten = onbellekten and belge_onbellekten
+        if belge_modeli not in kullanilan_modeller:
+            kullanilan_modeller.append(belge_modeli)
+        for alan in alanlar:
+            veri[alan] = belge_verisi.get(alan)
+        if belge_verisi.get("ID"):
+            kimlikler[ad] = belge_verisi["ID"]
+
+    if len(hatalar) == len(belgeler):
+        raise hatalar[0]
+
+    veri["MODEL"] = " + ".join(kullanilan_modeller)
+
+    # Hemogramdaki kimlik önceliklidir
+    veri["ID"] = kimlikler.get("Hemogram") or kimlikler.get("Biyokimya")
+    if len(set(kimlikler.values())) > 1:
+        uyarilar.append("Hemogram ve biyokimya kimlikleri farklı: " + " / ".join(f"{ad}: {k}" for ad, k in kimlikler.items()))
+
+    return veri, onbellekten, uyarilar
+
+
+# --- HEDEFLİ (ALAN BAZINDA) YENİDEN OKUMA ---
+# Düzenleyicide tek bir değer boş ya da açıkça yanlışsa (ör. PLT 1000 kat) bütün belge
+# yeniden okunmaz: yalnızca o parametreler kısa bir prompt'la, istenirse fotoğrafın kırpılmış
+# bir bölgesinden sorulur. Küçük istek hızlı modelde çoğunlukla yeterlidir.
+def hedefli_prompt(alanlar):
+    # Önceki (muhtemelen hatalı) değer bilerek verilmez: model ona demirlenip aynı hatayı tekrarlamasın
+    satirlar = [f"            - {ALAN_TARIFLERI[alan]}" for alan in alanlar]
+    ornek = ", ".join(['"ID": null'] + [f'"{alan}": {ORNEK_DEGERLER.get(alan, "0.0")}' for alan in alanlar])
+    bulunacaklar = "\n".join(satirlar)
+    return f"""
+            GÖREV: Görüntüde YALNIZCA aşağıdaki parametrelerin SONUÇ (Result) değerini oku.
+            Parametre adını bul, REFERANS ARALIĞINI ATLA, aynı satırdaki sonucu al.
+            Diğer parametreleri ve kimliği okuma; bulamadığın değer için 'null' yaz.
+
+            BULUNACAKLAR:
+{bulunacaklar}
+
+            ÇIKTI (JSON):
+            {{ {ornek} }}
+            """
+
+
+def alanin_belgesi(belgeler, alan):
+    """Alanın okunacağı fotoğrafın adı ("hemo"/"bio"); tek fotoğraf varsa o."""
+    belge = "bio" if alan in BIYOKIMYA_ALANLARI else "hemo"
+    return belge if belgeler.get(belge) else next((ad for ad, b in belgeler.items() if b), None)
+
+
+def alanlari_oku(api_key, belgeler, alanlar, on_isleme=None, kirplar=None, modeller=MODEL_KADEMELERI,
+                 onbellegi_atla=True):
+    """Yalnızca verilen alanları, her birini kendi fotoğrafından okur: ({alan: değer}, {alan: model}) döndürür.
+
+    kirplar ({"hemo": (sol, üst, sağ, alt), ...}) ile her fotoğrafın yalnızca ilgili bölgesi
+    gönderilebilir. Aynı soru önbellekten cevaplanmasın diye varsayılan olarak model yeniden çağrılır.
+    """
+    gruplar = {}
+    for alan in alanlar:
+        gruplar.setdefault(alanin_belgesi(belgeler, alan), []).append(alan)
+    yeni, alan_modelleri = {}, {}
+    for belge, grup in gruplar.items():
+        ayarlar = on_isleme
+        if (kirplar or {}).get(belge):
+            ayarlar = replace(on_isleme or goruntu.OnIslemeAyarlari(), kirp=kirplar[belge])
+        with olcum.aralik(f"on_isleme_{belge}"):
+            part, _ = goruntu.inline_part(belgeler[belge], ayarlar)
+        veri, _, model = kademeli_oku(api_key, istek_parcalari([part], hedefli_prompt(grup)), modeller,
+                                      onbellegi_atla, grup, kimlik=False)
+        for alan in grup:
+            yeni[alan] = veri.get(alan)
+            alan_modelleri[alan] = model
+    return yeni, alan_modelleri
+
+
+def birlestir(veri, yeni, korunan=(), alan_modelleri=None):
+    """Yeniden okunan değerleri satıra işler: (birleşik, değişenler, boş gelenler) döndürür.
+
+    Elle doğrulanmış (korunan) alanlara ve yine okunamayan (boş gelen) değerlere dokunulmaz.
+    alan_modelleri verilirse değişen alanları okuyan model MODEL sütununa eklenir
+    (ör. HIZLI_MODEL ile okunmuş satırda "<HIZLI_MODEL> + <MODEL>(PLT, CRP)").
+    """
+    birlesik = dict(veri)
+    degisenler, bos_gelenler = [], []
+    for alan, deger in yeni.items():
+        if alan in korunan:
+            continue
+        if deger is None:
+            bos_gelenler.append(alan)
+            continue
+        if birlesik.get(alan) != deger:
+            degisenler.append(alan)
+        birlesik[alan] = deger
+
+    if degisenler and alan_modelleri:
+        gruplar = {}
+        for alan in degisenler:
+            gruplar.setdefault(alan_modelleri[alan], []).append(alan)
+        onceki = birlesik.get("MODEL")
+        parcalar = [onceki] if isinstance(onceki, str) and onceki else []
+        birlesik["MODEL"] = " + ".join(parcalar + [f"{model}({', '.join(grup)})" for model, grup in gruplar.items()])
+    return birlesik, degisenler, bos_gelenler
+
+
+def hasta_oku(api_key, hemo_bytes=None, bio_bytes=None, yas_yil=0, yas_ay=0, on_isleme=None,
+              ayri_oku=True, onbellegi_atla=False, modeller=MODEL_KADEMELERI, geri_bildirim=None, iptal=None):
+    """Bir hastanın fotoğraflarını okuyup satır verisini hazırlar.
+
+    (veri, uyarilar, boyut_raporlari) döndürür.
+    """
+    # Görüntüler küçültülüp JPEG/WEBP olarak gönderilir (yükleme süresi)
+    partlar = {}
+    boyut_raporlari = []
+    for ad, dosya_bytes in (("hemo", hemo_bytes), ("bio", bio_bytes)):
+        if dosya_bytes:
+            with olcum.aralik(f"on_isleme_{ad}"):
+                partlar[ad], rapor = goruntu.inline_part(dosya_bytes, on_isleme)
+            boyut_raporlari.append(rapor)
+
+    if ayri_oku:
+        veri, onbellekten, uyarilar = belgeleri_ayri_oku(
+            api_key, partlar.get("hemo"), partlar.get("bio"), modeller, onbellegi_atla, geri_bildirim, iptal)
+    else:
+        veri, onbellekten, veri_modeli = kademeli_oku(
+            api_key, istek_parcalari(partlar.values()), modeller, onbellegi_atla,
+            geri_bildirim=geri_bildirim, iptal=iptal)
+        veri["MODEL"] = veri_modeli
+        uyarilar = []
+
+    # --- YAŞ HESAPLAMA VE VERİ BİRLEŞTİRME ---
+    veri["YAS_YIL"] = yas_yil
+    veri["YAS_AY"] = yas_ay
+    veri["TOPLAM_AY"] = (yas_yil * 12) + yas_ay
+    veri["KAYNAK"] = "🗂️ Önbellek" if onbellekten else "🤖 Model"
+    if len(modeller) > 1 and veri["MODEL"] != modeller[0]:
+        uyarilar.append(f"Hızlı model sonucu kontrollerden geçemedi, {veri['MODEL']} kullanıldı.")
+    return veri, uyarilar, boyut_raporlari
@@ -0,0 +1,173 @@
+# --- AŞAMA SÜRELERİ (ZAMANLAMA ARALIKLARI) ---
+# Bir okumanın süresi nereye gidiyor: görüntü açma/işleme/kodlama, model isteği, ayrıştırma,
+# kuyruğa yazma, Sheets gönderimi. Kod içinde `with olcum.aralik("ad"):` ile işaretlenir;
+# aktif ölçüm yoksa aralık hiçbir şey yapmaz. Ölçümler yerel JSONL dosyasına eklenir ve
+# Prometheus textfile biçiminde toplam sayaçlar yazılır (node_exporter textfile collector).
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from ayarlar import veri_yolu
+
+_aktif = contextvars.ContextVar("olcum", default=None)
+_yol = contextvars.ContextVar("olcum_yolu", default=())
+AYRAC = " › "
+
+
+class Olcum:
+    def __init__(self, tur="okuma"):
+        self.tur = tur
+        self.zaman = time.time()
+        self.baslangic = time.perf_counter()
+        self.araliklar = []
+        self.bilgi = {}
+        self.sonuc = None
+        self.sure = None
+        self._kilit = threading.Lock()
+
+    def calistir(self, fn, *args, **kwargs):
+        """fn'i bu ölçüm aktifken çalıştırır (iş parçacığına ölçümü taşımak için)."""
+        token = _aktif.set(self)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _aktif.reset(token)
+
+    def _ekle(self, kayit):
+        with self._kilit:
+            self.araliklar.append(kayit)
+
+    def arttir(self, ad, miktar):
+        with self._kilit:
+            self.bilgi[ad] = self.bilgi.get(ad, 0) + miktar
+
+    def asama_toplamlari(self):
+        """Aralık adına (son bileşen) göre toplam süreler; paralel belgelerde süreler toplanır."""
+        toplamlar = {}
+        for kayit in self.araliklar:
+            ad = kayit["ad"].split(AYRAC)[-1]
+            toplamlar[ad] = toplamlar.get(ad, 0.0) + kayit["sure"]
+        return toplamlar
+
+    def sonuclandir(self, sonuc, **bilgi):
+        """Ölçümü bitirir ve dosyalara yazar; özet sözlüğünü döndürür."""
+        self.sure = time.perf_counter() - self.baslangic
+        self.sonuc = sonuc
+        self.bilgi.update(bilgi)
+        kayit = self.ozet()
+        get_depo().ekle(kayit)
+        return kayit
+
+    def ozet(self):
+        return {
+            "zaman": self.zaman,
+            "tur": self.tur,
+            "sonuc": self.sonuc,
+            "sure": self.sure,
+            "asamalar": self.asama_toplamlari(),
+            "araliklar": sorted(self.araliklar, key=lambda k: k["baslangic"]),
+            **self.bilgi,
+        }
+
+
+@contextmanager
+def aralik(ad, **bilgi):
+    """Aktif ölçüme bir zaman aralığı ekler. Dönen sözlüğe sonradan bilgi eklenebilir."""
+    olcum = _aktif.get()
+    if olcum is None:
+        yield bilgi
+        return
+    yol = _yol.get() + (ad,)
+    token = _yol.set(yol)
+    baslangic = time.perf_counter()
+    try:
+        yield bilgi
+    except BaseException as e:
+        bilgi.setdefault("hata", type(e).__name__)
+        raise
+    finally:
+        _yol.reset(token)
+        olcum._ekle({
+            "ad": AYRAC.join(yol),
+            "baslangic": baslangic - olcum.baslangic,
+            "sure": time.perf_counter() - baslangic,
+            **bilgi,
+        })
+
+
+def arttir(ad, miktar):
+    """Aktif ölçümün sayaçlarından birini artırır (ör. istek baytı)."""
+    olcum = _aktif.get()
+    if olcum is not None:
+        olcum.arttir(ad, miktar)
+
+
+def olay(tur, sure, sonuc="basarili", **bilgi):
+    """Bir okumaya bağlı olmayan tek aşamalı ölçüm (ör. arka plandaki Sheets gönderimi)."""
+    get_depo().ekle({"zaman": time.time(), "tur": tur, "sonuc": sonuc, "sure": sure,
+                     "asamalar": {tur: sure}, **bilgi})
+
+
+# --- KAYIT: JSONL + PROMETHEUS TEXTFILE ---
+_PROM_ON_EK = "lab_asistani"
+
+
+def _etiket(deger):
+    return str(deger).replace("\\", "\\\\").replace('"', '\\"')
+
+
+class OlcumDeposu:
+    def __init__(self, jsonl_yolu, prom_yolu):
+        self.jsonl_yolu = jsonl_yolu
+        self.prom_yolu = prom_yolu
+        self._kilit = threading.Lock()
+        self._asama = {}        # aşama -> [toplam sn, sayı]
+        self._islem = {}        # (tür, sonuç) -> sayı
+        self._bayt = 0
+
+    def ekle(self, kayit):
+        with self._kilit:
+            with open(self.jsonl_yolu, "a", encoding="utf-8") as f:
+                f.write(json.dumps(kayit, ensure_ascii=False, default=str) + "\n")
+            for asama, sure in kayit.get("asamalar", {}).items():
+                toplam = self._asama.setdefault(asama, [0.0, 0])
+                toplam[0] += sure
+                toplam[1] += 1
+            anahtar = (kayit["tur"], kayit["sonuc"])
+            self._islem[anahtar] = self._islem.get(anahtar, 0) + 1
+            self._bayt += kayit.get("istek_bayt", 0)
+            self._prometheus_yaz()
+
+    def _prometheus_yaz(self):
+        satirlar = [
+            f"# HELP {_PROM_ON_EK}_asama_saniye Aşama süreleri (bu süreç başladığından beri)",
+            f"# TYPE {_PROM_ON_EK}_asama_saniye summary",
+        ]
+        for asama, (toplam, sayi) in sorted(self._asama.items()):
+            satirlar.append(f'{_PROM_ON_EK}_asama_saniye_sum{{asama="{_etiket(asama)}"}} {toplam:.6f}')
+            satirlar.append(f'{_PROM_ON_EK}_asama_saniye_count{{asama="{_etiket(asama)}"}} {sayi}')
+        satirlar.append(f"# TYPE {_PROM_ON_EK}_islem_toplam counter")
+        for (tur, sonuc), sayi in sorted(self._islem.items()):
+            satirlar.append(f'{_PROM_ON_EK}_islem_toplam{{tur="{_etiket(tur)}",sonuc="{_etiket(sonuc)}"}} {sayi}')
+        satirlar.append(f"# TYPE {_PROM_ON_EK}_istek_bayt_toplam counter")
+        satirlar.append(f"{_PROM_ON_EK}_istek_bayt_toplam {self._bayt}")
+        # Toplayıcı yarım dosya okumasın
+        gecici = self.prom_yolu + ".tmp"
+        with open(gecici, "w", encoding="utf-8") as f:
+            f.write("\n".join(satirlar) + "\n")
+        os.replace(gecici, self.prom_yolu)
+
+
+_depo = None
+_depo_kilidi = threading.Lock()
+
+
+def get_depo():
+    global _depo
+    with _depo_kilidi:
+        if _depo is None:
+            _depo = OlcumDeposu(veri_yolu("olcumler.jsonl"), veri_yolu("olcumler.prom"))
+        return _depo
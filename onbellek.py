@@ -0,0 +1,99 @@
+# --- OKUMA ÖNBELLEĞİ ---
+# Aynı fotoğraf (yeniden çalıştırma, iptal, ağ hatası sonrası) tekrar okunduğunda modele
+# yeniden gitmemek için çözümlenmiş JSON'u yerel SQLite dosyasında saklarız.
+# Anahtar: işlenmiş görüntü baytları + prompt + model adının SHA-256 özeti.
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+from ayarlar import veri_yolu
+
+EN_FAZLA_BAYT = 20 * 1024 * 1024    # Toplam saklanan JSON boyutu sınırı
+EN_UZUN_SURE = 30 * 24 * 3600       # Bu süreden eski kayıtlar silinir (sn)
+
+
+def anahtar(content_parts, model):
+    """Prompt metni ve görüntü parçalarından içerik adresli anahtar üretir."""
+    ozet = hashlib.sha256()
+    ozet.update(model.encode("utf-8"))
+    for part in content_parts:
+        ozet.update(b"\x00")
+        if "text" in part:
+            ozet.update(b"text:" + part["text"].encode("utf-8"))
+        else:
+            veri = part["inline_data"]
+            ozet.update(veri["mime_type"].encode("utf-8") + b":" + veri["data"].encode("ascii"))
+    return ozet.hexdigest()
+
+
+class OkumaOnbellegi:
+    def __init__(self, yol, en_fazla_bayt=EN_FAZLA_BAYT, en_uzun_sure=EN_UZUN_SURE):
+        self.yol = yol
+        self.en_fazla_bayt = en_fazla_bayt
+        self.en_uzun_sure = en_uzun_sure
+        with closing(self._baglan()) as db, db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS okumalar (
+                    anahtar TEXT PRIMARY KEY,
+                    veri TEXT NOT NULL,
+                    boyut INTEGER NOT NULL,
+                    olusturma REAL NOT NULL,
+                    son_erisim REAL NOT NULL
+                )
+            """)
+
+    def _baglan(self):
+        return sqlite3.connect(self.yol, timeout=30)
+
+    def getir(self, anahtar):
+        simdi = time.time()
+        with closing(self._baglan()) as db, db:
+            kayit = db.execute(
+                "SELECT veri FROM okumalar WHERE anahtar = ? AND olusturma >= ?",
+                (anahtar, simdi - self.en_uzun_sure),
+            ).fetchone()
+            if kayit is None:
+                return None
+            db.execute("UPDATE okumalar SET son_erisim = ? WHERE anahtar = ?", (simdi, anahtar))
+        return json.loads(kayit[0])
+
+    def kaydet(self, anahtar, veri):
+        metin = json.dumps(veri, ensure_ascii=False)
+        simdi = time.time()
+        with closing(self._baglan()) as db, db:
+            db.execute(
+                "INSERT OR REPLACE INTO okumalar (anahtar, veri, boyut, olusturma, son_erisim) VALUES (?, ?, ?, ?, ?)",
+                (anahtar, metin, len(metin.encode("utf-8")), simdi, simdi),
+            )
+        self.temizle()
+
+    def temizle(self):
+        """Süresi dolanları, ardından boyut sınırı aşılıyorsa en uzun süre kullanılmayanları siler."""
+        with closing(self._baglan()) as db, db:
+            db.execute("DELETE FROM okumalar WHERE olusturma < ?", (time.time() - self.en_uzun_sure,))
+            toplam = db.execute("SELECT COALESCE(SUM(boyut), 0) FROM okumalar").fetchone()[0]
+            if toplam <= self.en_fazla_bayt:
+                return
+            silinecekler = []
+            for kayit_anahtari, boyut in db.execute("SELECT anahtar, boyut FROM okumalar ORDER BY son_erisim"):
+                if toplam <= self.en_fazla_bayt:
+                    break
+                silinecekler.append((kayit_anahtari,))
+                toplam -= boyut
+            db.executemany("DELETE FROM okumalar WHERE anahtar = ?", silinecekler)
+
+
+_onbellek = None
+_onbellek_kilidi = threading.Lock()
+
+
+def get_onbellek():
+    global _onbellek
+    with _onbellek_kilidi:
+        if _onbellek is None:
+            _onbellek = OkumaOnbellegi(veri_yolu("onbellek.db"))
+        return _onbellek
@@ -0,0 +1,366 @@
+# --- SAYFALARIN ORTAK PARÇALARI ---
+# Ana sayfa (app.py) ve pages/ altındaki sayfalar aynı ayarları, Sheets bağlantısını
+# ve kayıt kuyruğunu kullanır.
+# pandas/numpy kullanan modüller (indeksler, referans) yalnızca düzenleyici ve analiz
+# aşamasında gerektiği için fonksiyon içinde import edilir; ana sayfa bunlarsız açılır.
+import time
+from datetime import datetime
+
+import streamlit as st
+
+import ayna
+import baglanti
+import dogrulama
+import goruntu
+import hiz_siniri
+import kimlik_indeksi
+import kuyruk
+import okuma
+import olcum
+
+SHEET_NAME = "Hasta Takip"
+
+
+def ayarlari_yukle():
+    """Secrets'ı okur, Sheets bağlantısını kurar ve Gemini API anahtarını döndürür."""
+    try:
+        if "GEMINI_API_KEY" in st.secrets:
+            api_key = st.secrets["GEMINI_API_KEY"]
+        else:
+            st.error("API Key eksik! Secrets ayarlarını kontrol et.")
+            st.stop()
+
+        if "gcp_service_account" in st.secrets:
+            sheets_secrets = st.secrets["gcp_service_account"]
+        else:
+            st.error("Google Sheets yetkisi eksik! Secrets ayarlarını kontrol et.")
+            st.stop()
+    except Exception as e:
+        st.error(f"Ayar hatası: {e}")
+        st.stop()
+
+    # --- GOOGLE SHEETS BAĞLANTISI ---
+    # İstemci ve sayfa süreç boyunca baglanti modülünde tutulur; yeniden çalıştırmada tekrar yetkilendirilmez.
+    try:
+        baglanti.baglan(sheets_secrets, SHEET_NAME)
+    except Exception as e:
+        st.error(f"Google Sheets Bağlantı Hatası: {e}")
+        st.stop()
+
+    return api_key
+
+
+def _olculu(tur, islem, sayi):
+    # Arka plandaki Sheets çağrılarının süresi de ölçüm dosyalarına yazılır
+    baslangic = time.perf_counter()
+    try:
+        sonuc = baglanti.sheets_ile(islem, kota="sheets_yazma")
+    except Exception as e:
+        olcum.olay(tur, time.perf_counter() - baslangic, sonuc="hata", satir=sayi, hata=str(e))
+        raise
+    olcum.olay(tur, time.perf_counter() - baslangic, satir=sayi)
+    return sonuc
+
+
+def kayit_kuyrugu():
+    # Onaylanan satırlar önce yerel kuyruğa yazılır, arka planda toplu olarak Sheets'e gönderilir
+    kayit_kuyrugu = kuyruk.get_kuyruk()
+    kayit_kuyrugu.baslat(
+        lambda satirlar: _olculu("sheets_ekleme", lambda sheet: sheet.append_rows(satirlar), len(satirlar)),
+        _satirlari_guncelle_ve_kirlet,
+    )
+    return kayit_kuyrugu
+
+
+def _satirlari_guncelle_ve_kirlet(hedefli):
+    # Yerel kopyadaki eski değerler sıradaki (tam) senkronda düzelir
+    yazilmayan = _olculu("sheets_guncelleme", lambda sheet: satirlari_guncelle(sheet, hedefli), len(hedefli))
+    ayna.get_ayna().kirli_isaretle()
+    return yazilmayan
+
+
+def satirlari_guncelle(sheet, hedefli):
+    """Hedef satırları günceller; satırda artık beklenen hasta yoksa yazmaz: {sıra: sebep} döndürür.
+
+    Satır numaraları yerel kopyadan gelir; sheet'te arada satır eklenmiş/silinmiş/sıralanmışsa
+    başka bir hastanın satırının üzerine yazılmasın diye önce A sütunu okunur.
+    """
+    kimlikler = sheet.col_values(1) if any(beklenen for _, _, beklenen in hedefli) else []
+    guncellemeler, yazilmayan = [], {}
+    for sira, (satir_no, satir, beklenen) in enumerate(hedefli):
+        mevcut = kimlikler[satir_no - 1] if satir_no <= len(kimlikler) else ""
+        if beklenen and kimlik_indeksi.normallestir(mevcut) != kimlik_indeksi.normallestir(beklenen):
+            yazilmayan[sira] = (f"Satır {satir_no} artık {beklenen} değil ({mevcut or 'boş'}); "
+                                "yerel kopyayı güncelleyip yeniden kaydedin")
+            continue
+        guncellemeler.append({"range": f"A{satir_no}:{ayna.SON_SUTUN}{satir_no}", "values": [satir]})
+    if guncellemeler:
+        sheet.batch_update(guncellemeler)
+    return yazilmayan
+
+
+def kimlik_indeksi_al(kayit_kuyrugu):
+    """Kayıtlı ID indeksini döndürür; yerel kopya senkronla değiştiyse önce yeniden kurar."""
+    indeks = kimlik_indeksi.get_indeks()
+    indeks.guncel_tut(ayna.get_ayna(), kayit_kuyrugu)
+    return indeks
+
+
+def _konum_metni(konumlar):
+    satirlar = sorted(k for k in konumlar if k != kimlik_indeksi.KUYRUK)
+    parcalar = [f"satır {', '.join(map(str, satirlar))}"] if satirlar else []
+    if kimlik_indeksi.KUYRUK in konumlar:
+        parcalar.append("yeni kaydedildi")
+    return " · ".join(parcalar)
+
+
+def mukerrer_kontrolu(indeks, kimlik):
+    """Aynı/benzer ID daha önce kaydedildiyse uyarır.
+
+    Kullanıcı mevcut satırı güncellemeyi seçerse o satırın numarasını, aksi halde None döndürür.
+    """
+    sonuc = indeks.ara(kimlik)
+    for benzer, konumlar in sonuc["yakin"]:
+        st.info(f"🔁 Benzer ID kayıtlı: **{benzer}** ({_konum_metni(konumlar)}) — yazım farkı olabilir, kontrol edin.")
+    if not sonuc["tam"]:
+        return None
+
+    st.warning(f"⚠️ Bu ID zaten kayıtlı ({_konum_metni(sonuc['tam'])}).")
+    satirlar = sorted(k for k in sonuc["tam"] if k != kimlik_indeksi.KUYRUK)
+    if not satirlar:
+        # Henüz sheet'e ulaşmamış kaydın satır numarası belli değil; yalnızca yeni satır olabilir
+        return None
+    secenekler = ["Yeni satır olarak ekle"] + [f"Satır {satir_no}'i güncelle" for satir_no in satirlar]
+    secim = st.radio("Kayıt şekli", secenekler, horizontal=True,
+                     help="Satır numaraları yerel kopyaya göredir; sheet'te satır silindiyse önce yerel kopyayı güncelleyin.")
+    return None if secim == secenekler[0] else satirlar[secenekler.index(secim) - 1]
+
+
+def mukerrer_uyarilari(indeks, df, etiket_sutunu=None):
+    """Toplu girişte kayıtlı ya da tabloda birden çok kez geçen ID'leri listeler."""
+    tablodaki = {}
+    for _, satir in df.iterrows():
+        anahtar = kimlik_indeksi.normallestir(satir.get("ID"))
+        if anahtar:
+            tablodaki[anahtar] = tablodaki.get(anahtar, 0) + 1
+    for _, satir in df.iterrows():
+        etiket = f"{satir.get(etiket_sutunu)}: " if etiket_sutunu else ""
+        sonuc = indeks.ara(satir.get("ID"))
+        if sonuc["tam"]:
+            st.warning(f"⚠️ {etiket}ID {satir.get('ID')} zaten kayıtlı ({_konum_metni(sonuc['tam'])})")
+        elif tablodaki.get(kimlik_indeksi.normallestir(satir.get("ID")), 0) > 1:
+            st.warning(f"⚠️ {etiket}ID {satir.get('ID')} bu tabloda birden çok kez var")
+        for benzer, konumlar in sonuc["yakin"]:
+            st.info(f"🔁 {etiket}benzer ID kayıtlı: {benzer} ({_konum_metni(konumlar)})")
+
+
+def kuyruk_paneli(kayit_kuyrugu):
+    with st.sidebar:
+        st.markdown("#### 📤 Kayıt Kuyruğu")
+        kuyruk_durumu = kayit_kuyrugu.sayilar()
+        k1, k2 = st.columns(2)
+        k1.metric("Bekleyen", kuyruk_durumu["bekleyen"])
+        k2.metric("Gönderilen", kuyruk_durumu["gonderilen"])
+        if kayit_kuyrugu.son_hata:
+            st.warning(f"Son gönderim hatası: {kayit_kuyrugu.son_hata}")
+        if kuyruk_durumu["hatali"]:
+            with st.expander(f"⛔ Gönderilemeyen: {kuyruk_durumu['hatali']} satır"):
+                st.caption("Sheets bu satırları defalarca reddetti; diğer kayıtlar gönderilmeye devam ediyor.")
+                hatalilar = kayit_kuyrugu.hatalilar()
+                for _, satir, hata in hatalilar:
+                    st.text(f"{satir[0] if satir else '—'}: {hata}")
+                if st.button("🔁 Yeniden Dene"):
+                    kayit_kuyrugu.yeniden_dene([kayit_id for kayit_id, _, _ in hatalilar])
+        kota_uyarisi("sheets_yazma", "Sheets yazma")
+        if kuyruk_durumu["bekleyen"] and st.button("🔄 Şimdi Gönder"):
+            kayit_kuyrugu.simdi_gonder()
+
+
+def kota_uyarisi(ad, etiket):
+    """Kota kovası doluysa şimdi gönderilecek bir isteğin tahmini beklemesi (tüm oturumlar ortak)."""
+    bekleme = hiz_siniri.get_kova(ad).beklenen_sure()
+    if bekleme >= 1:
+        st.caption(f"⏳ {etiket} kotası dolu: yeni istek ~{bekleme:.0f} sn sırada bekleyecek")
+
+
+def ayna_paneli():
+    """Sheet'in yerel kopyasının durumu; eskimişse arka planda günceller."""
+    sheet_aynasi = ayna.get_ayna()
+    sheet_aynasi.arka_planda_senkronize(baglanti.sheets_ile)
+    with st.sidebar.expander("🪞 Yerel Kopya"):
+        durum = sheet_aynasi.durum()
+        son = datetime.fromtimestamp(durum["son_senkron"]).strftime("%d.%m %H:%M") if durum["son_senkron"] else "—"
+        st.caption(f"{durum['satir']} hasta · son senkron: {son}")
+        if sheet_aynasi.son_hata:
+            st.warning(f"Senkron hatası: {sheet_aynasi.son_hata}")
+        c1, c2 = st.columns(2)
+        try:
+            if c1.button("🔄 Güncelle"):
+                sonuc = baglanti.sheets_ile(sheet_aynasi.senkronize)
+                st.success(f"{sonuc['yeni']} yeni satır")
+            if c2.button("Tam senkron"):
+                sonuc = baglanti.sheets_ile(lambda sheet: sheet_aynasi.senkronize(sheet, tam=True))
+                st.success(f"{sonuc['yeni']} satır yeniden alındı")
+        except Exception as e:
+            st.error(f"Senkron hatası: {e}")
+    return sheet_aynasi
+
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def kohort_verisi(surum):
+    """Analiz sayfaları için yerel kopya + türetilmiş indeksler (sayısal sütunlar float64).
+
+    Veri sürümüyle anahtarlanır; sürüm aynıysa yeniden çalıştırmada kopya tekrar okunmaz.
+    İndeksler süreç genelindeki özellik katmanından gelir (yalnızca yeni/değişen satırlar hesaplanır).
+    """
+    import indeksler
+
+    df = ayna.get_ayna().veri()
+    df = df.join(indeksler.get_katman().guncelle(df, surum), on="satir_no")
+    return df.astype({sutun: "float64" for sutun in df.columns if sutun not in ("satir_no", "ID", "MODEL")})
+
+
+def olcum_paneli():
+    """Son okumanın aşama süreleri (kenar çubuğunda, kapalı)."""
+    son = st.session_state.get("son_olcum")
+    if not son:
+        return
+    with st.sidebar.expander(f"⏱️ Son Okuma: {son['sure']:.1f} sn"):
+        kaynak = "önbellek" if son.get("onbellek") else son.get("model", "—")
+        st.caption(f"{son['sonuc']} · {kaynak} · istek {son.get('istek_bayt', 0) / 1024:.0f} KB")
+        st.dataframe(
+            [{"Aşama": a["ad"], "Başlangıç (ms)": round(a["baslangic"] * 1000), "Süre (ms)": round(a["sure"] * 1000)}
+             for a in son["araliklar"]],
+            hide_index=True,
+            use_container_width=True,
+        )
+
+
+def on_isleme_paneli():
+    with st.sidebar.expander("🖼️ Görüntü Ön İşleme"):
+        return goruntu.OnIslemeAyarlari(
+            uzun_kenar=st.number_input("Uzun kenar (px)", min_value=512, max_value=4096, value=2048, step=128),
+            gri=st.checkbox("Gri tonlama", value=True),
+            kontrast=st.checkbox("Kontrast artır", value=False),
+            kirp="otomatik" if st.checkbox("Tablo bölgesine kırp", value=False) else None,
+            format=st.selectbox("Format", ["JPEG", "WEBP"]),
+            kalite=st.slider("Kalite", min_value=50, max_value=95, value=85),
+        )
+
+
+def kontrol_sutunlari(df):
+    """Makul aralık dışı değer içeren sütunların başlığını ⚠️ ile işaretler (data_editor column_config)."""
+    sorunlu = set()
+    for _, satir in df.iterrows():
+        sorunlu.update(dogrulama.tum_sorunlar(satir))
+    return {
+        alan: st.column_config.Column(f"⚠️ {alan}", help="Değer makul aralık dışında ya da diğer değerlerle tutarsız, lütfen kontrol edin.")
+        for alan in sorunlu
+    }
+
+
+def kontrol_uyarilari(df, etiket_sutunu=None):
+    for _, satir in df.iterrows():
+        for sorun in dogrulama.tum_sorunlar(satir).values():
+            etiket = f"{satir.get(etiket_sutunu)}: " if etiket_sutunu else ""
+            st.warning(f"🔎 {etiket}{sorun}")
+
+
+def referans_uyarilari(df, etiket_sutunu=None):
+    """Okuma hatası değil, klinik bilgi: yaşa göre referans aralığı dışındaki değerler."""
+    import referans
+
+    tablo = referans.get_tablo()
+    for _, satir in df.iterrows():
+        for sorun in tablo.satir_sorunlari(satir).values():
+            etiket = f"{satir.get(etiket_sutunu)}: " if etiket_sutunu else ""
+            st.info(f"📏 {etiket}{sorun}")
+
+
+def indeks_degerleri(veri):
+    """Editördeki hasta için türetilmiş indeksler (NLR, PLR, ...), düzeltmelerle birlikte güncellenir."""
+    import indeksler
+
+    degerler = indeksler.satir_indeksleri(veri)
+    for kolon, indeks in zip(st.columns(len(indeksler.INDEKSLER)), indeksler.INDEKSLER):
+        deger = degerler[indeks.ad]
+        kolon.metric(indeks.ad, "—" if deger is None else f"{deger:.2f}", help=indeks.aciklama)
+
+
+def model_paneli():
+    """Okumada kullanılacak model sırasını döndürür."""
+    with st.sidebar.expander("🤖 Model"):
+        secim = st.radio(
+            "Okuma modu",
+            ["Kademeli (önce hızlı model)", "Yalnız Pro model"],
+            help="Kademeli modda Pro model yalnızca hızlı modelin sonucu kontrollerden geçemezse çağrılır.",
+        )
+    return okuma.MODEL_KADEMELERI if secim.startswith("Kademeli") else [okuma.MODEL]
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def kirpma_onizlemesi(dosya_bytes, kirp):
+    """Kırpılacak bölgenin küçük önizlemesi (kaydırıcı her değiştiğinde fotoğraf yeniden çözülmesin)."""
+    veri, _, _ = goruntu.hazirla(dosya_bytes, goruntu.OnIslemeAyarlari(uzun_kenar=480, gri=False, kirp=kirp))
+    return veri
+
+
+def elle_duzeltilenler(okunan_df, duzenlenmis_df):
+    """Editörde okunan değerden farklı girilmiş alanlar (boş/NaN farkı sayılmaz)."""
+    import pandas as pd
+
+    okunan, duzenlenmis = okunan_df.iloc[0], duzenlenmis_df.iloc[0]
+    return {
+        alan for alan in okuma.TUM_ALANLAR
+        if alan in duzenlenmis.index
+        and not (pd.isna(okunan.get(alan)) and pd.isna(duzenlenmis[alan]))
+        and okunan.get(alan) != duzenlenmis[alan]
+    }
+
+
+BELGE_ADLARI = {"hemo": "Hemogram", "bio": "Biyokimya"}
+
+
+def alan_okuma_paneli(veri, belgeler, korunan):
+    """Seçilen alanları yeniden okuma isteği: basıldıysa (alanlar, {belge: kirp}), yoksa None döndürür.
+
+    Boş ya da kontrollerden geçemeyen alanlar önceden seçilir; elle düzeltilmiş (korunan)
+    alanlar listede yer almaz. Her fotoğrafın kırpılacak bölgesi ayrı seçilir.
+    """
+    secenekler = [alan for alan in okuma.TUM_ALANLAR if alan not in korunan]
+    if not secenekler:
+        return None
+    sorunlu = okuma.sonuc_sorunlari(dogrulama.tiplendir(dict(veri)), kimlik=False)
+    with st.expander("🎯 Alanı Yeniden Oku", expanded=bool(set(sorunlu) & set(secenekler))):
+        st.caption("Yalnızca seçilen değerler fotoğraftan tekrar sorulur; diğer değerler ve düzeltmeleriniz korunur.")
+        if korunan:
+            st.caption(f"🔒 Elle düzeltildiği için dokunulmayacak: {', '.join(sorted(korunan))}")
+        alanlar = st.multiselect("Yeniden okunacak alanlar", secenekler,
+                                 default=[alan for alan in secenekler if alan in sorunlu])
+        kirplar = {}
+        for belge in dict.fromkeys(okuma.alanin_belgesi(belgeler, alan) for alan in alanlar):
+            c1, c2 = st.columns([3, 2])
+            c1.caption(f"{BELGE_ADLARI[belge]} bölgesi")
+            dikey = c1.slider("Dikey bölge (%)", 0, 100, (0, 100), step=5, key=f"kirp_dikey_{belge}")
+            yatay = c1.slider("Yatay bölge (%)", 0, 100, (0, 100), step=5, key=f"kirp_yatay_{belge}")
+            kirp = None
+            if (dikey, yatay) != ((0, 100), (0, 100)) and dikey[0] < dikey[1] and yatay[0] < yatay[1]:
+                kirp = (yatay[0] / 100, dikey[0] / 100, yatay[1] / 100, dikey[1] / 100)
+            kirplar[belge] = kirp
+            c2.image(kirpma_onizlemesi(belgeler[belge], kirp))
+        if st.button("🎯 Seçilenleri Yeniden Oku", disabled=not alanlar):
+            return alanlar, kirplar
+    return None
+
+
+CANLI_ALANLAR = ["ID", "HGB", "PLT", "RDW", "NEUT_HASH", "LYMPH_HASH", "IG_HASH", "CRP", "Prokalsitonin"]
+
+
+def canli_degerler(yer, degerler):
+    """Akış sırasında gelen değerleri yer tutucuda (st.empty) metrik olarak gösterir."""
+    degerler = dict(degerler)
+    with yer.container():
+        for satir in (CANLI_ALANLAR[:5], CANLI_ALANLAR[5:]):
+            for kolon, alan in zip(st.columns(5), satir):
+                deger = degerler.get(alan)
+                kolon.metric(alan, "…" if deger is None else deger)
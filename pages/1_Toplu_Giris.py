@@ -0,0 +1,180 @@
+import streamlit as st
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import dogrulama
+import kimlik_indeksi
+import okuma
+import olcum
+import ortak
+from alanlar import SUTUNLAR, satira_cevir
+
+# --- 1. AYARLAR ---
+st.set_page_config(page_title="Toplu Giriş - Lab Asistanı", page_icon="📦", layout="wide")
+
+# Session State Başlatma (Hafıza)
+if 'toplu_sonuclar' not in st.session_state:
+    st.session_state.toplu_sonuclar = None
+
+API_KEY = ortak.ayarlari_yukle()
+kayit_kuyrugu = ortak.kayit_kuyrugu()
+
+# --- ARAYÜZ ---
+st.title("📦 Toplu Veri Girişi")
+st.caption("Retrospektif veri toplama için: çok sayıda hastanın çıktısını yükleyin, hepsini birlikte okuyup toplu onaylayın.")
+
+ortak.kuyruk_paneli(kayit_kuyrugu)
+ortak.ayna_paneli()
+on_isleme = ortak.on_isleme_paneli()
+modeller = ortak.model_paneli()
+
+# --- DOSYA YÜKLEME ---
+st.markdown("### 1. Laboratuvar Sonuçları")
+col1, col2 = st.columns(2)
+with col1:
+    hemo_files = st.file_uploader("Hemogramlar", type=["jpg", "png", "jpeg"], accept_multiple_files=True, key="toplu_hemo")
+with col2:
+    bio_files = st.file_uploader("Biyokimyalar", type=["jpg", "png", "jpeg"], accept_multiple_files=True, key="toplu_bio")
+
+hemo_dosyalari = {f.name: f for f in hemo_files or []}
+bio_dosyalari = {f.name: f for f in bio_files or []}
+
+# --- HASTA LİSTESİ (EŞLEŞTİRME VE YAŞ) ---
+# Dosyalar ada göre sıralanıp sırayla eşleştirilir; yanlış eşleşme tablodan düzeltilebilir.
+hemo_adlari = sorted(hemo_dosyalari)
+bio_adlari = sorted(bio_dosyalari)
+hasta_sayisi = max(len(hemo_adlari), len(bio_adlari))
+
+if hasta_sayisi:
+    st.markdown("### 2. Eşleştirme ve Yaş Bilgileri")
+    st.info("Her satır bir hasta. Yaşları girin; eşleşme yanlışsa biyokimya dosyasını değiştirin.")
+
+    hastalar = pd.DataFrame({
+        "HEMOGRAM": [hemo_adlari[i] if i < len(hemo_adlari) else None for i in range(hasta_sayisi)],
+        "BIYOKIMYA": [bio_adlari[i] if i < len(bio_adlari) else None for i in range(hasta_sayisi)],
+        "YAS_YIL": [0] * hasta_sayisi,
+        "YAS_AY": [0] * hasta_sayisi,
+    })
+    hastalar = st.data_editor(
+        hastalar,
+        column_config={
+            "HEMOGRAM": st.column_config.SelectboxColumn("Hemogram", options=hemo_adlari),
+            "BIYOKIMYA": st.column_config.SelectboxColumn("Biyokimya", options=bio_adlari),
+            "YAS_YIL": st.column_config.NumberColumn("Yaş (YIL)", min_value=0, step=1),
+            "YAS_AY": st.column_config.NumberColumn("Yaş (AY)", min_value=0, max_value=11, step=1),
+        },
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        key="toplu_hastalar",
+    )
+
+    col_ayar1, col_ayar2, col_ayar3 = st.columns(3)
+    with col_ayar1:
+        eszamanli = st.slider("Eşzamanlı okuma", min_value=1, max_value=8, value=4,
+                              help="Aynı anda modele gönderilen hasta sayısı.")
+    with col_ayar2:
+        ayri_oku = st.checkbox("⚡ Belgeleri ayrı ve paralel oku", value=True)
+    with col_ayar3:
+        onbellegi_atla = st.checkbox("♻️ Önbelleği atla", value=False)
+
+    # --- ADIM 1: TOPLU OKUMA ---
+    ortak.kota_uyarisi("gemini", "Gemini")
+    if st.button(f"🔍 {len(hastalar)} Hastayı Oku (Kaydetmez)", type="primary"):
+
+        def _hasta_oku(hasta):
+            hemo = hemo_dosyalari.get(hasta["HEMOGRAM"])
+            bio = bio_dosyalari.get(hasta["BIYOKIMYA"])
+            yas_yil = int(hasta["YAS_YIL"]) if pd.notna(hasta["YAS_YIL"]) else 0
+            yas_ay = int(hasta["YAS_AY"]) if pd.notna(hasta["YAS_AY"]) else 0
+            olcum_kaydi = olcum.Olcum("toplu_okuma")
+            try:
+                data, uyarilar, _ = olcum_kaydi.calistir(
+                    okuma.hasta_oku,
+                    API_KEY,
+                    hemo.getvalue() if hemo else None,
+                    bio.getvalue() if bio else None,
+                    yas_yil, yas_ay, on_isleme,
+                    ayri_oku=ayri_oku, onbellegi_atla=onbellegi_atla, modeller=modeller,
+                )
+            except Exception as e:
+                olcum_kaydi.sonuclandir("hata", hata=type(e).__name__)
+                raise
+            olcum_kaydi.sonuclandir("basarili", model=data.get("MODEL"), onbellek=data["KAYNAK"] == "🗂️ Önbellek")
+            data["DURUM"] = " | ".join(uyarilar)
+            return data
+
+        satirlar = {}
+        ilerleme = st.progress(0.0, text="Okunuyor...")
+        canli_tablo = st.empty()
+
+        with ThreadPoolExecutor(max_workers=eszamanli) as havuz:
+            gelecekler = {}
+            for sira, hasta in hastalar.iterrows():
+                if hasta["HEMOGRAM"] not in hemo_dosyalari and hasta["BIYOKIMYA"] not in bio_dosyalari:
+                    continue
+                gelecekler[havuz.submit(_hasta_oku, hasta)] = (sira, hasta)
+
+            # Biten hasta tabloya hemen eklenir
+            for tamamlanan, gelecek in enumerate(as_completed(gelecekler), start=1):
+                sira, hasta = gelecekler[gelecek]
+                try:
+                    data = gelecek.result()
+                    data["SEC"] = True
+                except Exception as e:
+                    data = {"YAS_YIL": hasta["YAS_YIL"], "YAS_AY": hasta["YAS_AY"], "DURUM": f"❌ {e}", "SEC": False}
+                data["DOSYA"] = hasta["HEMOGRAM"] if hasta["HEMOGRAM"] in hemo_dosyalari else hasta["BIYOKIMYA"]
+                satirlar[sira] = data
+
+                ilerleme.progress(tamamlanan / len(gelecekler), text=f"{tamamlanan}/{len(gelecekler)} hasta okundu")
+                canli_tablo.dataframe(pd.DataFrame(list(satirlar.values())), hide_index=True, use_container_width=True)
+
+        if satirlar:
+            st.session_state.toplu_sonuclar = pd.DataFrame([satirlar[sira] for sira in sorted(satirlar)])
+            st.rerun()
+
+# --- ADIM 2: TOPLU KONTROL VE ONAY ---
+if st.session_state.toplu_sonuclar is not None:
+    st.markdown("---")
+    st.markdown("### 3. Kontrol ve Toplu Onay")
+    st.info("⚠️ Değerleri kontrol edin, gerekirse düzeltin. Kaydedilmeyecek satırların **SEÇ** kutusunu kaldırın.")
+
+    sonuclar = st.session_state.toplu_sonuclar
+    existing_cols = [col for col in ["SEC", "DOSYA", "KAYNAK"] + SUTUNLAR + ["DURUM"] if col in sonuclar.columns]
+
+    duzenlenmis_df = st.data_editor(
+        sonuclar,
+        column_order=existing_cols,
+        column_config={"SEC": st.column_config.CheckboxColumn("SEÇ"), **ortak.kontrol_sutunlari(sonuclar)},
+        disabled=["DOSYA", "KAYNAK", "MODEL", "DURUM"],
+        num_rows="fixed",
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    secilenler = duzenlenmis_df[duzenlenmis_df["SEC"].fillna(False).astype(bool)]
+    ortak.kontrol_uyarilari(secilenler, etiket_sutunu="DOSYA")
+    ortak.referans_uyarilari(secilenler, etiket_sutunu="DOSYA")
+    indeks = ortak.kimlik_indeksi_al(kayit_kuyrugu)
+    ortak.mukerrer_uyarilari(indeks, secilenler, etiket_sutunu="DOSYA")
+    col_save, col_cancel = st.columns([1, 4])
+
+    # --- ADIM 3: TOPLU KAYIT ---
+    with col_save:
+        if st.button(f"✅ {len(secilenler)} Satırı Onayla ve Kaydet", type="primary", disabled=secilenler.empty):
+            try:
+                kayit_kuyrugu.toplu_ekle([
+                    satira_cevir(dogrulama.tiplendir(final_data.to_dict())) for _, final_data in secilenler.iterrows()
+                ])
+                for kimlik in secilenler["ID"] if "ID" in secilenler.columns else []:
+                    indeks.ekle(kimlik, kimlik_indeksi.KUYRUK)
+
+                st.success(f"{len(secilenler)} hasta kaydedildi — Sheets'e arka planda gönderiliyor.")
+                st.session_state.toplu_sonuclar = None
+
+            except Exception as e:
+                st.error(f"Kayıt Hatası: {e}")
+
+    with col_cancel:
+        if st.button("❌ İptal / Temizle"):
+            st.session_state.toplu_sonuclar = None
+            st.rerun()
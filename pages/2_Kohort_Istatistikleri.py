@@ -0,0 +1,84 @@
+import streamlit as st
+import altair as alt
+import istatistik
+import ortak
+import referans
+
+# --- 1. AYARLAR ---
+st.set_page_config(page_title="Kohort İstatistikleri - Lab Asistanı", page_icon="📊", layout="wide")
+
+ortak.ayarlari_yukle()
+
+# --- ÖNBELLEKLİ HESAPLAR ---
+# Hepsi veri sürümüyle anahtarlanır: sürüm aynıysa yeniden çalıştırmada ve widget
+# değişikliğinde sonuç bellekten gelir; sheet'e ya da yerel kopyaya tekrar gidilmez.
+@st.cache_data(max_entries=64, show_spinner="Tablo 1 hesaplanıyor...")
+def tablo_bir(surum, yontem, esik):
+    df = ortak.kohort_verisi(surum)
+    grup = None if yontem == "Yok" else istatistik.grupla(df, yontem, esik)
+    return istatistik.tablo_bir(df, grup)
+
+
+@st.cache_data(max_entries=64, show_spinner="Gruplar karşılaştırılıyor...")
+def grup_karsilastirmasi(surum, yontem, esik):
+    df = ortak.kohort_verisi(surum)
+    return istatistik.grup_karsilastirmasi(df, istatistik.grupla(df, yontem, esik))
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def grafik_verisi(surum, yontem, esik, alan):
+    df = ortak.kohort_verisi(surum)
+    return df.assign(GRUP=istatistik.grupla(df, yontem, esik))[["GRUP", alan]].dropna()
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def referans_ozeti(surum, referans_surumu):
+    # referans_surumu yalnızca anahtar: tablo değişince özet yeniden hesaplanır
+    return referans.get_tablo().ozet(ortak.kohort_verisi(surum))
+
+
+# --- ARAYÜZ ---
+st.title("📊 Kohort İstatistikleri")
+st.caption("Toplanan hastaların yerel kopyası üzerinden Tablo 1 ve grup karşılaştırmaları.")
+
+sheet_aynasi = ortak.ayna_paneli()
+surum = sheet_aynasi.surum()
+df = ortak.kohort_verisi(surum)
+
+if df.empty:
+    st.info("Henüz yerel kopyada hasta yok. Kenar çubuğundan 'Güncelle' ile sheet'i indirin.")
+    st.stop()
+
+st.metric("Hasta sayısı", len(df))
+
+col1, col2 = st.columns(2)
+with col1:
+    yontem = st.selectbox("Gruplama", istatistik.GRUPLAMALAR)
+with col2:
+    esik = None
+    if yontem in istatistik.VARSAYILAN_ESIKLER:
+        esik = st.number_input("Eşik", min_value=0.0, value=istatistik.VARSAYILAN_ESIKLER[yontem], step=0.1)
+
+st.markdown("### Tablo 1")
+try:
+    tablo = tablo_bir(surum, yontem, esik)
+    st.dataframe(tablo, use_container_width=True)
+    st.download_button("⬇️ Tablo 1 (CSV)", tablo.to_csv().encode("utf-8"), "tablo1.csv", "text/csv")
+except Exception as e:
+    st.error(f"Tablo 1 hesaplanamadı: {e}")
+
+st.markdown("### Yaşa Göre Referans Dışı Değerler")
+referans_tablosu = referans.get_tablo()
+st.dataframe(referans_ozeti(surum, referans_tablosu.surum), use_container_width=True)
+
+if yontem != "Yok":
+    st.markdown("### Grup Karşılaştırması")
+    st.dataframe(grup_karsilastirmasi(surum, yontem, esik), hide_index=True, use_container_width=True)
+
+    alan = st.selectbox("Dağılım grafiği", istatistik.DEGISKENLER,
+                        format_func=lambda a: istatistik.ETIKETLER.get(a, a))
+    grafik = alt.Chart(grafik_verisi(surum, yontem, esik, alan)).mark_boxplot().encode(
+        x=alt.X("GRUP:N", title=None, sort=None),
+        y=alt.Y(f"{alan}:Q", title=istatistik.ETIKETLER.get(alan, alan)),
+    )
+    st.altair_chart(grafik, use_container_width=True)
@@ -0,0 +1,70 @@
+import streamlit as st
+import altair as alt
+from datetime import datetime
+import indeksler
+import istatistik
+import kumeleme
+import ortak
+
+# --- 1. AYARLAR ---
+st.set_page_config(page_title="Kümeleme - Lab Asistanı", page_icon="🧭", layout="wide")
+
+ortak.ayarlari_yukle()
+
+# --- ARAYÜZ ---
+st.title("🧭 Lab Paneli Haritası")
+st.caption("Hemogram + biyokimya panelinin iki boyutlu izdüşümü ve kümeleri (keşif amaçlı).")
+
+sheet_aynasi = ortak.ayna_paneli()
+surum = sheet_aynasi.surum()
+df = ortak.kohort_verisi(surum)
+
+if len(kumeleme.uygun_satirlar(df)) < kumeleme.EN_AZ_HASTA:
+    st.info(f"Harita için HGB, PLT, NEU# ve LYM# değerleri olan en az {kumeleme.EN_AZ_HASTA} hasta gerekli.")
+    st.stop()
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    yontem = st.radio("İzdüşüm", kumeleme.YONTEMLER, horizontal=True,
+                      help="UMAP yerel yapıyı daha iyi gösterir ama ilk eğitimi uzun sürer.")
+with col2:
+    kume_sayisi = st.slider("Küme sayısı", min_value=2, max_value=8, value=3)
+with col3:
+    renk = st.selectbox("Renklendirme", ["Küme", "Yaş grubu"] + indeksler.INDEKS_ADLARI + ["CRP", "Prokalsitonin"])
+
+yeniden_egit = st.button("🔁 Modeli yeniden eğit",
+                         help="Yeni hastalar normalde mevcut modele yerleştirilir; model ancak hasta sayısı belirgin artınca baştan eğitilir.")
+
+with st.spinner(f"{yontem} modeli hazırlanıyor..."):
+    model = kumeleme.get_model(yontem, kume_sayisi, df, yeniden_egit=yeniden_egit)
+    konumlar = model.yerlestir(df)
+
+grafik_verisi = konumlar.join(df[["ID", "TOPLAM_AY", "CRP", "Prokalsitonin"] + indeksler.INDEKS_ADLARI])
+grafik_verisi["Yaş grubu"] = istatistik.grupla(grafik_verisi, "Yaş grubu")
+grafik_verisi["Küme"] = grafik_verisi["KUME"]
+
+if renk in ("Küme", "Yaş grubu"):
+    renk_kodu = alt.Color(f"{renk}:N")
+else:
+    # Oranlar çok çarpık: log ölçek
+    renk_kodu = alt.Color(f"{renk}:Q", scale=alt.Scale(type="symlog", scheme="viridis"))
+
+grafik = alt.Chart(grafik_verisi.reset_index(drop=True)).mark_circle().encode(
+    x=alt.X("X:Q", title=f"{yontem} 1"),
+    y=alt.Y("Y:Q", title=f"{yontem} 2"),
+    color=renk_kodu,
+    size=alt.condition("datum.YENI", alt.value(90), alt.value(30)),
+    tooltip=["ID", "TOPLAM_AY", "Küme", "NLR", "PLR", "CRP"],
+).interactive()
+st.altair_chart(grafik, use_container_width=True)
+
+egitim = datetime.fromtimestamp(model.egitildi).strftime("%d.%m %H:%M")
+st.caption(
+    f"Model {egitim} tarihinde {model.egitim_sayisi} hastayla {model.egitim_suresi:.1f} sn'de eğitildi · "
+    f"sonradan yerleştirilen (büyük nokta): {int(konumlar['YENI'].sum())} hasta"
+)
+
+st.markdown("### Küme Özeti")
+ozet_sutunlari = kumeleme.PANEL + indeksler.INDEKS_ADLARI
+kume_ozeti = df.loc[konumlar.index, ozet_sutunlari].groupby(konumlar["KUME"]).median().round(2)
+st.dataframe(kume_ozeti.assign(n=konumlar.groupby("KUME").size()), use_container_width=True)
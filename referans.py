@@ -0,0 +1,132 @@
+# --- YAŞA GÖRE PEDİATRİK REFERANS ARALIKLARI ---
+# Her tetkik için yaş (ay) sınırlarına göre sıralı küçük bir aralık tablosu tutulur.
+# Tüm sütun tek seferde np.searchsorted ile tabloya yerleştirilir (satır satır döngü yok);
+# on binlerce satır tablo değiştiğinde anında yeniden işaretlenebilir.
+# Varsayılan değerler genel pediatri kaynaklarından yaklaşık aralıklardır; laboratuvarın kendi
+# aralıkları .lab_veri/referans.json dosyasına aynı biçimde yazılarak kullanılabilir.
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import dogrulama
+from ayarlar import veri_yolu
+
+# alan: [(bu yaştan itibaren (ay), alt sınır, üst sınır), ...] — bir sonraki satırın yaşına kadar geçerli
+VARSAYILAN_ARALIKLAR = {
+    "HGB": [(0, 13.4, 19.9), (1, 10.7, 17.1), (2, 9.4, 13.0), (6, 10.5, 13.5), (24, 11.5, 13.5), (72, 11.5, 15.5), (144, 12.0, 16.0)],
+    "PLT": [(0, 150, 450), (1, 200, 550), (24, 150, 450)],
+    "RDW": [(0, 13.0, 18.0), (1, 12.0, 16.5), (6, 11.5, 14.5)],
+    "NEUT_HASH": [(0, 1.5, 10.0), (1, 1.0, 8.5), (12, 1.5, 8.5), (48, 1.5, 8.0), (96, 1.8, 8.0)],
+    "LYMPH_HASH": [(0, 2.0, 11.0), (12, 3.0, 9.5), (24, 2.0, 8.0), (48, 1.5, 7.0), (96, 1.2, 5.8), (192, 1.0, 4.8)],
+}
+DUSUK, NORMAL, YUKSEK = -1, 0, 1
+
+
+def _yas_metni(alt_ay, ust_ay):
+    def _ay(ay):
+        return f"{ay // 12} yaş" if ay >= 24 and ay % 12 == 0 else f"{ay} ay"
+    return f"{_ay(alt_ay)}+" if ust_ay is None else f"{_ay(alt_ay)}–{_ay(ust_ay)}"
+
+
+class ReferansTablosu:
+    def __init__(self, araliklar=VARSAYILAN_ARALIKLAR):
+        self._tablo = {}
+        for alan, satirlar in araliklar.items():
+            satirlar = sorted(satirlar)
+            self._tablo[alan] = (
+                np.array([s[0] for s in satirlar], dtype=float),
+                np.array([s[1] for s in satirlar], dtype=float),
+                np.array([s[2] for s in satirlar], dtype=float),
+            )
+        # Önbellek anahtarı: tablo değişince işaretler yeniden hesaplanır
+        self.surum = hashlib.sha1(json.dumps(araliklar, sort_keys=True).encode()).hexdigest()[:12]
+
+    @property
+    def alanlar(self):
+        return list(self._tablo)
+
+    def _sira(self, alan, aylar):
+        sinirlar = self._tablo[alan][0]
+        aylar = np.asarray(aylar, dtype=float)
+        sira = np.searchsorted(sinirlar, aylar, side="right") - 1
+        gecerli = ~np.isnan(aylar) & (sira >= 0)
+        return np.where(gecerli, sira, 0), gecerli
+
+    def araliklar(self, alan, aylar):
+        """Her yaş (ay) için (alt, üst) dizileri; yaşı bilinmeyenlerde NaN."""
+        _, alt, ust = self._tablo[alan]
+        sira, gecerli = self._sira(alan, aylar)
+        return np.where(gecerli, alt[sira], np.nan), np.where(gecerli, ust[sira], np.nan)
+
+    def isaretle(self, df):
+        """Her referanslı tetkik için -1 (düşük) / 0 / 1 (yüksek) sütunları; değer ya da yaş yoksa <NA>."""
+        aylar = pd.to_numeric(df["TOPLAM_AY"], errors="coerce").astype("float64").to_numpy()
+        sonuc = {}
+        for alan in self.alanlar:
+            if alan not in df:
+                continue
+            deger = pd.to_numeric(df[alan], errors="coerce").astype("float64").to_numpy()
+            alt, ust = self.araliklar(alan, aylar)
+            isaret = np.where(deger < alt, DUSUK, np.where(deger > ust, YUKSEK, NORMAL))
+            bilinmiyor = np.isnan(deger) | np.isnan(alt)
+            sonuc[alan] = pd.array(np.where(bilinmiyor, 0, isaret), dtype="Int8")
+            sonuc[alan][bilinmiyor] = pd.NA
+        return pd.DataFrame(sonuc, index=df.index)
+
+    def ozet(self, df):
+        """Tetkik başına değerlendirilebilen satır sayısı ve düşük/yüksek oranları (%)."""
+        isaretler = self.isaretle(df)
+        return pd.DataFrame({
+            "n": isaretler.notna().sum(),
+            "Düşük (%)": (isaretler == DUSUK).sum() / isaretler.notna().sum() * 100,
+            "Yüksek (%)": (isaretler == YUKSEK).sum() / isaretler.notna().sum() * 100,
+        }).round(1)
+
+    def satir_sorunlari(self, veri):
+        """Tek hasta için yaşa göre referans dışı değerleri {alan: açıklama} olarak döndürür."""
+        def _sayi(deger):
+            try:
+                return dogrulama.sayiya_cevir(deger)
+            except ValueError:
+                return None
+        # Editörde elle yazılmış "10,2" gibi değerler de sayıya çevrilir
+        df = pd.DataFrame([{alan: _sayi(veri.get(alan)) for alan in ["TOPLAM_AY"] + self.alanlar}], dtype="float64")
+        isaretler = self.isaretle(df).iloc[0]
+        ay = df["TOPLAM_AY"].iloc[0]
+        sorunlar = {}
+        for alan, isaret in isaretler.items():
+            if pd.isna(isaret) or isaret == NORMAL:
+                continue
+            sinirlar, alt, ust = self._tablo[alan]
+            sira = int(np.searchsorted(sinirlar, ay, side="right") - 1)
+            sonraki = int(sinirlar[sira + 1]) if sira + 1 < len(sinirlar) else None
+            yon = "düşük" if isaret == DUSUK else "yüksek"
+            sorunlar[alan] = (
+                f"{alan} = {float(df[alan].iloc[0]):g} yaşa göre {yon} "
+                f"(referans {alt[sira]:g}–{ust[sira]:g}, {_yas_metni(int(sinirlar[sira]), sonraki)})"
+            )
+        return sorunlar
+
+
+_tablo = None
+_tablo_zamani = None
+_tablo_kilidi = threading.Lock()
+
+
+def get_tablo():
+    """Geçerli referans tablosu; referans.json değiştiyse yeniden yüklenir."""
+    global _tablo, _tablo_zamani
+    yol = veri_yolu("referans.json")
+    zaman = os.path.getmtime(yol) if os.path.exists(yol) else None
+    with _tablo_kilidi:
+        if _tablo is None or zaman != _tablo_zamani:
+            araliklar = VARSAYILAN_ARALIKLAR
+            if zaman is not None:
+                with open(yol, encoding="utf-8") as f:
+                    araliklar = {alan: [tuple(s) for s in satirlar] for alan, satirlar in json.load(f).items()}
+            _tablo, _tablo_zamani = ReferansTablosu(araliklar), zaman
+        return _tablo
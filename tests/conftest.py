@@ -0,0 +1,7 @@
+# Modüller depo kökünden import edilir; yerel dosyalar (kuyruk, önbellek) geçici klasöre yazılır
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LAB_VERI_DIZINI", tempfile.mkdtemp(prefix="lab_test_"))
@@ -0,0 +1,74 @@
+import pytest
+
+import ayna
+from alanlar import SUTUNLAR
+from kiyaslama.sahte_sheet import SahteWorksheet
+
+
+def _satir(kimlik, hgb=11.0):
+    satir = [""] * len(SUTUNLAR)
+    satir[SUTUNLAR.index("ID")] = kimlik
+    satir[SUTUNLAR.index("HGB")] = str(hgb)
+    return satir
+
+
+@pytest.fixture
+def sheet():
+    sheet = SahteWorksheet(gecikme=0, basliklar=SUTUNLAR)
+    sheet.append_rows([_satir(f"H-{i}") for i in range(1, 31)])
+    sheet.cagrilar.clear()
+    return sheet
+
+
+@pytest.fixture
+def sheet_aynasi(tmp_path, sheet):
+    sheet_aynasi = ayna.SheetAynasi(str(tmp_path / "ayna.db"))
+    assert sheet_aynasi.senkronize(sheet) == {"yeni": 30, "tam": True}
+    sheet.cagrilar.clear()
+    return sheet_aynasi
+
+
+def _kimlikler(sheet_aynasi):
+    return sheet_aynasi.veri()["ID"].tolist()
+
+
+def test_artimli_senkron_yalniz_yenileri_ekler(sheet, sheet_aynasi):
+    sheet.append_rows([_satir("H-31"), _satir("H-32")])
+    sheet.cagrilar.clear()
+    surum = sheet_aynasi.surum()
+
+    assert sheet_aynasi.senkronize(sheet) == {"yeni": 2, "tam": False}
+    assert [c["ad"] for c in sheet.cagrilar] == ["batch_get"]
+    assert _kimlikler(sheet_aynasi)[-3:] == ["H-30", "H-31", "H-32"]
+    assert sheet_aynasi.surum() == surum + 1
+    # Değişiklik yoksa sürüm artmaz
+    assert sheet_aynasi.senkronize(sheet) == {"yeni": 0, "tam": False}
+    assert sheet_aynasi.surum() == surum + 1
+
+
+def test_eski_satirlarda_silme_tam_senkron_yapar(sheet, sheet_aynasi):
+    # Kontrol edilen son satırların çok gerisinde bir satır siliniyor
+    del sheet.satirlar[3]
+
+    assert sheet_aynasi.senkronize(sheet)["tam"] is True
+    assert "H-3" not in _kimlikler(sheet_aynasi)
+    assert len(_kimlikler(sheet_aynasi)) == 29
+
+
+def test_eski_satirlarda_siralama_tam_senkron_yapar(sheet, sheet_aynasi):
+    sheet.satirlar[2], sheet.satirlar[3] = sheet.satirlar[3], sheet.satirlar[2]
+
+    assert sheet_aynasi.senkronize(sheet)["tam"] is True
+    assert _kimlikler(sheet_aynasi)[:3] == ["H-1", "H-3", "H-2"]
+
+
+def test_satir_uzerine_yazilinca_kopya_kirlenir(sheet, sheet_aynasi):
+    # ID aynı kalıp değer değişince ID sütunu bunu göremez; güncellemeyi yapan taraf kopyayı kirletir
+    sheet.batch_update([{"range": f"A2:{ayna.SON_SUTUN}2", "values": [_satir("H-1", hgb=9.5)]}])
+    sheet_aynasi.kirli_isaretle()
+    assert sheet_aynasi.durum()["kirli"] is True
+
+    assert sheet_aynasi.senkronize(sheet)["tam"] is True
+    assert sheet_aynasi.veri()["HGB"].tolist()[0] == 9.5
+    assert sheet_aynasi.durum()["kirli"] is False
+    assert sheet_aynasi.senkronize(sheet)["tam"] is False
@@ -0,0 +1,122 @@
+import pytest
+
+import dogrulama
+
+
+@pytest.mark.parametrize("deger, beklenen", [
+    (12.3, 12.3),
+    (7, 7.0),
+    ("12,3", 12.3),
+    ("12.3", 12.3),
+    ("1.234,5", 1234.5),
+    ("1,234.5", 1234.5),
+    ("1.234.5", 1234.5),        # Birden çok nokta: sonuncusu ondalık
+    ("<0.05", 0.05),
+    ("< 0,05", 0.05),
+    (">200", 200.0),
+    ("250 x10^3/µL", 250.0),
+    ("11.2 g/dL", 11.2),
+    ("12.", 12.0),
+    ("1e3", 1000.0),
+    ("2,5E-2", 0.025),
+    ("1.2e+2 mg/L", 120.0),
+])
+def test_sayiya_cevir(deger, beklenen):
+    assert dogrulama.sayiya_cevir(deger) == pytest.approx(beklenen)
+
+
+@pytest.mark.parametrize("deger", [None, "", "  ", "null", "None", "NaN", "-", "yok", "N/A", float("nan"), True])
+def test_sayiya_cevir_bos(deger):
+    assert dogrulama.sayiya_cevir(deger) is None
+
+
+def test_sayiya_cevir_sayi_degil():
+    with pytest.raises(ValueError):
+        dogrulama.sayiya_cevir("pozitif")
+
+
+def test_uslu_deger_makul_aralik_disi():
+    # "1e3" eskiden 1.0 okunup makul sayılıyordu
+    assert "HGB" in dogrulama.kontrol_et({"HGB": "1e3"}, ["HGB"])
+
+
+def test_tiplendir_birim_donusumu():
+    veri = dogrulama.tiplendir({"ID": " PRT-1 ", "HGB": "112", "PLT": "250000", "WBC": "8500", "NEUT_HASH": "4,2"})
+    assert veri["ID"] == "PRT-1"
+    assert veri["HGB"] == pytest.approx(11.2)       # g/L -> g/dL
+    assert veri["PLT"] == 250                        # /µL -> 10³/µL, tam sayı
+    assert isinstance(veri["PLT"], int)
+    assert veri["WBC"] == pytest.approx(8.5)
+    assert veri["NEUT_HASH"] == pytest.approx(4.2)
+
+
+@pytest.mark.parametrize("alan, esik", [(alan, esik) for alan, (esik, _) in dogrulama.BIRIM_DONUSUMLERI.items()])
+def test_tiplendir_esik(alan, esik):
+    # Eşiğin kendisi dönüştürülmez, üstü dönüştürülür
+    assert dogrulama.tiplendir({alan: esik}, [alan])[alan] == esik
+    _, bolen = dogrulama.BIRIM_DONUSUMLERI[alan]
+    assert dogrulama.tiplendir({alan: esik * 2}, [alan])[alan] == pytest.approx(esik * 2 / bolen, abs=0.5)
+
+
+def test_tiplendir_bos_ve_cevrilemeyen():
+    veri = dogrulama.tiplendir({"ID": "  ", "HGB": None, "CRP": "pozitif"})
+    assert veri["ID"] is None
+    assert veri["HGB"] is None
+    assert veri["CRP"] == "pozitif"     # kontrol_et ayrıca işaretler
+
+
+@pytest.mark.parametrize("alan", list(dogrulama.MAKUL_ARALIKLAR))
+def test_kontrol_et_makul_araliklar(alan):
+    alt, ust = dogrulama.MAKUL_ARALIKLAR[alan]
+    assert dogrulama.kontrol_et({alan: alt}, [alan]) == {}
+    assert dogrulama.kontrol_et({alan: ust}, [alan]) == {}
+    assert alan in dogrulama.kontrol_et({alan: ust + 1}, [alan])
+    assert alan in dogrulama.kontrol_et({alan: alt - 1}, [alan])
+
+
+def test_kontrol_et_sayi_degil_ve_bos():
+    sorunlar = dogrulama.kontrol_et({"CRP": "pozitif", "HGB": None})
+    assert "sayı değil" in sorunlar["CRP"]
+    assert "HGB" not in sorunlar
+
+
+def test_tutarlilik_kontrolu():
+    assert dogrulama.tutarlilik_kontrolu({"WBC": 10, "NEUT_HASH": 6, "LYMPH_HASH": 3, "IG_HASH": 0.1}) == {}
+    assert "WBC" in dogrulama.tutarlilik_kontrolu({"WBC": 5, "NEUT_HASH": 6, "LYMPH_HASH": 3})
+    assert "IG_HASH" in dogrulama.tutarlilik_kontrolu({"WBC": 10, "NEUT_HASH": 1, "LYMPH_HASH": 8, "IG_HASH": 2})
+
+
+@pytest.mark.parametrize("metin, beklenen", [
+    ('', {}),
+    ('{"ID": "PRT', {}),
+    ('{"ID": "PRT-1", "HGB": 11.', {"ID": "PRT-1"}),
+    ('{"ID": "PRT-1", "HGB": 11.2', {"ID": "PRT-1"}),
+    ('{"ID": "PRT-1", "HGB": 11.2,', {"ID": "PRT-1", "HGB": 11.2}),
+    ('{"ID": "A \\"B\\"", "PLT": null, "CRP": -1.5e1}', {"ID": 'A "B"', "PLT": None, "CRP": -15.0}),
+])
+def test_kismi_json(metin, beklenen):
+    assert dogrulama.kismi_json(metin) == beklenen
+
+
+def test_json_coz_kod_blogu():
+    assert dogrulama.json_coz('```json\n{"ID": "A", "HGB": 1}\n```') == {"ID": "A", "HGB": 1}
+
+
+def test_editor_tablosundaki_bos_kimlik():
+    # Düzenleyiciden gelen tabloda boş ID NaN/pd.NA olur; sheet'e "nan" yazılmamalı
+    import pandas as pd
+
+    from alanlar import satira_cevir
+
+    df = pd.DataFrame([{"ID": None, "HGB": "11,2", "PLT": None}, {"ID": "PRT-1", "HGB": None, "PLT": 250}])
+    veri = dogrulama.tiplendir(df.iloc[0].to_dict())
+    assert veri["ID"] is None
+    assert veri["HGB"] == pytest.approx(11.2)
+    assert veri["PLT"] is None
+    assert satira_cevir(veri)[0] == ""
+    assert dogrulama.tiplendir(df.iloc[1].to_dict())["ID"] == "PRT-1"
+
+    tipli = df.astype({"ID": "string", "PLT": "Int64"})
+    assert dogrulama.tiplendir(tipli.iloc[0].to_dict())["ID"] is None
+    assert dogrulama.tiplendir(tipli.iloc[1].to_dict())["PLT"] == 250
+    assert dogrulama.kontrol_et(tipli.iloc[0].to_dict()) == {}
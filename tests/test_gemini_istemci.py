@@ -0,0 +1,101 @@
+import pytest
+
+import gemini_istemci
+import hiz_siniri
+from gemini_istemci import DevreAcik, DevreKesici
+
+
+class SahteSaat:
+    def __init__(self):
+        self.simdi = 1000.0
+
+    def __call__(self):
+        return self.simdi
+
+
+@pytest.fixture
+def saat():
+    return SahteSaat()
+
+
+def test_devre_esige_kadar_kapali_kalir(saat):
+    devre = DevreKesici(esik=3, bekleme=60, saat=saat)
+    for _ in range(2):
+        devre.izin_ver()
+        devre.basarisiz()
+    devre.izin_ver()
+    devre.basarili()
+    # Araya giren başarı sayacı sıfırlar
+    for _ in range(2):
+        devre.basarisiz()
+    devre.izin_ver()
+
+
+def test_devre_acilir_ve_bekleme_bitince_yari_acik(saat):
+    devre = DevreKesici(esik=3, bekleme=60, saat=saat)
+    for _ in range(3):
+        devre.basarisiz()
+    with pytest.raises(DevreAcik) as hata:
+        devre.izin_ver()
+    assert hata.value.kalan == pytest.approx(60)
+
+    saat.simdi += 59
+    with pytest.raises(DevreAcik):
+        devre.izin_ver()
+
+    saat.simdi += 1
+    devre.izin_ver()                # yarı açık: tek deneme geçer
+    with pytest.raises(DevreAcik):
+        devre.izin_ver()            # deneme sürerken diğerleri beklemez, hata alır
+
+
+def test_yari_acik_deneme_basariliysa_kapanir(saat):
+    devre = DevreKesici(esik=1, bekleme=60, saat=saat)
+    devre.basarisiz()
+    saat.simdi += 60
+    devre.izin_ver()
+    devre.basarili()
+    devre.izin_ver()
+    devre.izin_ver()
+
+
+def test_yari_acik_deneme_basarisizsa_yeniden_acilir(saat):
+    devre = DevreKesici(esik=1, bekleme=60, saat=saat)
+    devre.basarisiz()
+    saat.simdi += 60
+    devre.izin_ver()
+    devre.basarisiz()
+    with pytest.raises(DevreAcik) as hata:
+        devre.izin_ver()
+    assert hata.value.kalan == pytest.approx(60)
+
+
+class _Yanit:
+    def __init__(self, kod):
+        self.status_code = kod
+        self.headers = {}
+        self.kapandi = False
+
+    def close(self):
+        self.kapandi = True
+
+
+class _Oturum:
+    def __init__(self, kodlar):
+        self.kodlar = list(kodlar)
+        self.yanitlar = []
+
+    def post(self, url, **kwargs):
+        self.yanitlar.append(_Yanit(self.kodlar.pop(0)))
+        return self.yanitlar[-1]
+
+
+def test_yeniden_denenen_yanitlar_kapatilir(monkeypatch):
+    monkeypatch.setitem(hiz_siniri._kovalar, "gemini",
+                        hiz_siniri.JetonKovasi("gemini", 6000, uyu=lambda sure: None))
+    monkeypatch.setattr(gemini_istemci.time, "sleep", lambda sure: None)
+    istemci = gemini_istemci.GeminiIstemcisi()
+    istemci.session = _Oturum([503, 429, 200])
+
+    assert istemci.post("https://ornek", {}).status_code == 200
+    assert [y.kapandi for y in istemci.session.yanitlar] == [True, True, False]
@@ -0,0 +1,92 @@
+import pytest
+
+import hiz_siniri
+
+
+class SahteSaat:
+    """Uyuyunca ileri giden saat: kova testleri gerçek zamanı beklemez."""
+
+    def __init__(self):
+        self.simdi = 1000.0
+
+    def __call__(self):
+        return self.simdi
+
+    def uyu(self, sure):
+        self.simdi += sure
+
+
+@pytest.fixture
+def saat():
+    return SahteSaat()
+
+
+def _kova(saat, dakikada=60, ani_kapasite=None):
+    return hiz_siniri.JetonKovasi("test", dakikada, ani_kapasite, saat=saat, uyu=saat.uyu)
+
+
+def test_ani_kapasite_beklemeden_gecer(saat):
+    kova = _kova(saat)
+    assert kova.ani_kapasite == 6
+    assert [kova.al() for _ in range(kova.ani_kapasite)] == [0.0] * 6
+    assert kova.al() > 0
+
+
+def test_ani_kapasiteden_sonra_sabit_hiz(saat):
+    kova = _kova(saat)
+    zamanlar = []
+    for _ in range(30):
+        kova.al()
+        zamanlar.append(saat.simdi)
+    araliklar = [b - a for a, b in zip(zamanlar[kova.ani_kapasite:], zamanlar[kova.ani_kapasite + 1:])]
+    assert araliklar == pytest.approx([60 / (60 - kova.ani_kapasite)] * len(araliklar))
+
+
+@pytest.mark.parametrize("dakikada", [10, 60, 300])
+def test_hicbir_dakikada_kota_asilmaz(saat, dakikada):
+    kova = _kova(saat, dakikada)
+    baslangic = saat.simdi
+    zamanlar = []
+    while saat.simdi < baslangic + 180:
+        kova.al()
+        zamanlar.append(saat.simdi)
+    for i, t in enumerate(zamanlar):
+        assert sum(1 for u in zamanlar[i:] if u < t + 60) <= dakikada
+
+
+def test_beklenen_sure(saat):
+    kova = _kova(saat)
+    assert kova.beklenen_sure() == 0.0
+    for _ in range(kova.ani_kapasite):
+        kova.al()
+    aralik = 60 / (60 - kova.ani_kapasite)
+    assert kova.beklenen_sure() == pytest.approx(aralik)
+    # Tahmin, sıradaki al()'ın gerçekten beklediği süredir
+    assert kova.al() == pytest.approx(aralik)
+    saat.uyu(60)
+    assert kova.beklenen_sure() == 0.0
+
+
+def test_geri_bas_herkesi_bekletir(saat):
+    kova = _kova(saat)
+    kova.geri_bas(30)
+    assert kova.beklenen_sure() == pytest.approx(30)
+    baslangic = saat.simdi
+    assert kova.al() == pytest.approx(30)
+    assert saat.simdi == pytest.approx(baslangic + 30)
+    # Cezadan sonra istekler art arda değil, kota hızında gider
+    assert kova.al() == pytest.approx(60 / (60 - kova.ani_kapasite))
+
+
+def test_geri_bas_daha_uzun_sirayi_kisaltmaz(saat):
+    kova = _kova(saat, dakikada=10, ani_kapasite=1)
+    for _ in range(5):
+        kova.al()
+    once = kova.beklenen_sure()
+    kova.geri_bas(1)
+    assert kova.beklenen_sure() == pytest.approx(once)
+
+
+def test_durum(saat):
+    kova = _kova(saat)
+    assert kova.durum() == {"ad": "test", "dakikada": 60, "bekleyen": 0, "beklenen_sure": 0.0}
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+import isler
+import okuma
+
+
+@pytest.fixture
+def yonetici():
+    yonetici = isler.IsYoneticisi(eszamanli=2)
+    yield yonetici
+    yonetici._havuz.shutdown(wait=True)
+
+
+def _bekleyen_okuma(basladi, birak):
+    def okuma_fn(geri_bildirim=None, iptal=None):
+        basladi.set()
+        while not birak.wait(0.01):
+            if iptal.iptal_edildi:
+                raise okuma.OkumaIptal()
+        return {"ID": "H-1"}
+    return okuma_fn
+
+
+def _bitmesini_bekle(is_):
+    for _ in range(500):
+        if is_.bitti_mi:
+            return
+        time.sleep(0.01)
+    raise AssertionError("iş bitmedi")
+
+
+def test_baska_oturum_isi_goremez_durduramaz_birakamaz(yonetici):
+    basladi, birak = threading.Event(), threading.Event()
+    is_ = yonetici.gonder("okuma", _bekleyen_okuma(basladi, birak), sahip="oturum-a")
+    assert basladi.wait(5)
+
+    assert yonetici.getir(is_.id, sahip="oturum-b") is None
+    assert yonetici.getir(is_.id) is None
+    yonetici.iptal_et(is_.id, sahip="oturum-b")
+    yonetici.birak(is_.id, sahip="oturum-b")
+    assert not is_.iptal.iptal_edildi
+
+    birak.set()
+    _bitmesini_bekle(is_)
+    assert yonetici.getir(is_.id, sahip="oturum-b") is None
+    assert yonetici.getir(is_.id, sahip="oturum-a").sonuc == {"ID": "H-1"}
+
+
+def test_sahip_isi_durdurup_birakabilir(yonetici):
+    basladi, birak = threading.Event(), threading.Event()
+    is_ = yonetici.gonder("okuma", _bekleyen_okuma(basladi, birak), sahip="oturum-a")
+    assert basladi.wait(5)
+
+    yonetici.iptal_et(is_.id, sahip="oturum-a")
+    _bitmesini_bekle(is_)
+    assert is_.durum == isler.IPTAL
+
+    yonetici.birak(is_.id, sahip="oturum-a")
+    assert yonetici.getir(is_.id, sahip="oturum-a") is None
@@ -0,0 +1,131 @@
+import math
+
+import pandas as pd
+import pytest
+
+import kimlik_indeksi
+from kimlik_indeksi import KUYRUK, KimlikIndeksi, normallestir
+
+
+@pytest.fixture
+def indeks():
+    indeks = KimlikIndeksi()
+    indeks.yeniden_kur([("PRT-12345", 2), ("Ayşe Yılmaz", 3), ("ŞIK-2024", 4), ("AB1", 5)], surum=1)
+    return indeks
+
+
+@pytest.mark.parametrize("kimlik, beklenen", [
+    ("PRT-12345", "prt12345"),
+    (" prt 12345 ", "prt12345"),
+    ("İSTANBUL", "istanbul"),
+    ("ışık", "isik"),
+    ("ŞİŞLİ", "sisli"),
+    ("Güneş Öztürk Çağ", "gunesozturkcag"),
+    (12345, "12345"),
+    (None, ""),
+    (math.nan, ""),
+    (pd.NA, ""),
+])
+def test_normallestir(kimlik, beklenen):
+    assert normallestir(kimlik) == beklenen
+
+
+def test_tam_eslesme(indeks):
+    assert indeks.ara("PRT-12345") == {"tam": {2}, "yakin": []}
+    assert indeks.ara("prt 12345")["tam"] == {2}
+
+
+def test_turkce_karakterler_ayni_kimlik(indeks):
+    assert indeks.ara("AYSE YILMAZ")["tam"] == {3}
+    assert indeks.ara("ayşe yılmaz")["tam"] == {3}
+    assert indeks.ara("sik2024")["tam"] == {4}
+    assert indeks.ara("ŞİK-2024")["tam"] == {4}
+
+
+@pytest.mark.parametrize("kimlik", [
+    "PRT-12346",     # değişmiş
+    "PRT-1234",      # silinmiş
+    "PRT-123456",    # eklenmiş
+    "PRT-12354",     # yer değiştirmiş
+    "PTR-12345",
+])
+def test_tek_farkli_yakin_eslesme(indeks, kimlik):
+    sonuc = indeks.ara(kimlik)
+    assert sonuc["tam"] == set()
+    assert sonuc["yakin"] == [("PRT-12345", {2})]
+
+
+@pytest.mark.parametrize("kimlik", [
+    "PRT-12399",     # iki değişiklik
+    "PRT-123",       # iki silme
+    "PRT-54321",
+    "XYZ-99999",
+    "",
+])
+def test_eslesmeyenler(indeks, kimlik):
+    assert indeks.ara(kimlik) == {"tam": set(), "yakin": []}
+
+
+def test_kisa_kimlikte_yakin_aranmaz(indeks):
+    assert kimlik_indeksi.YAKIN_MIN_UZUNLUK > 3
+    assert indeks.ara("AB2") == {"tam": set(), "yakin": []}
+    assert indeks.ara("AB1")["tam"] == {5}
+
+
+def test_ekle_ve_birden_cok_konum(indeks):
+    indeks.ekle("prt12345")
+    indeks.ekle("PRT-77777")
+    assert indeks.ara("PRT-12345")["tam"] == {2, KUYRUK}
+    assert indeks.ara("PRT-77778")["yakin"] == [("PRT-77777", {KUYRUK})]
+
+
+def test_yeniden_kur_eskiyi_siler(indeks):
+    indeks.yeniden_kur([("YENI-0001", 9)], surum=2)
+    assert indeks.surum == 2
+    assert indeks.ara("PRT-12345") == {"tam": set(), "yakin": []}
+    assert indeks.ara("YENI-0002")["yakin"] == [("YENI-0001", {9})]
+
+
+class _Ayna:
+    def __init__(self, veri):
+        self._veri = veri
+
+    def surum(self):
+        return 1
+
+    def veri(self):
+        return self._veri
+
+    def durum(self):
+        return {"son_senkron": 0}
+
+
+class _Kuyruk:
+    def son_eklenenler(self, zaman):
+        return [["Q-1001"]]
+
+
+def test_guncel_tut_bos_kimlikleri_atlar():
+    veri = pd.DataFrame({"ID": pd.array(["PRT-12345", None, "NA"], dtype="string"), "satir_no": [2, 3, 4]})
+    veri.loc[5] = [math.nan, 6]
+    indeks = KimlikIndeksi()
+    indeks.guncel_tut(_Ayna(veri), _Kuyruk())
+
+    assert indeks.ara("PRT-12345")["tam"] == {2}
+    assert indeks.ara("Q-1001")["tam"] == {KUYRUK}
+    assert indeks.ara("na")["tam"] == {4}
+    assert indeks.ara("nan")["tam"] == set()
+
+
+@pytest.mark.parametrize("a, b, beklenen", [
+    ("abcd", "abcd", True),
+    ("abcd", "abce", True),
+    ("abcd", "abc", True),
+    ("abcd", "xabcd", True),
+    ("abcd", "bacd", True),
+    ("abcd", "badc", False),
+    ("abcd", "ab", False),
+    ("abcd", "wxyz", False),
+])
+def test_tek_fark(a, b, beklenen):
+    assert kimlik_indeksi._tek_fark(a, b) is beklenen
@@ -0,0 +1,143 @@
+import pytest
+
+import hiz_siniri
+import kuyruk
+import ortak
+from kiyaslama.sahte_sheet import SahteWorksheet
+
+
+@pytest.fixture
+def kayit_kuyrugu(tmp_path):
+    return kuyruk.KayitKuyrugu(str(tmp_path / "kuyruk.db"))
+
+
+def test_bosalt_ekleme_ve_guncellemeyi_ayirir(kayit_kuyrugu):
+    kayit_kuyrugu.ekle(["A", 1])
+    kayit_kuyrugu.ekle(["B", 2], hedef_satir=7)
+    kayit_kuyrugu.ekle(["C", 3])
+    eklenen, guncellenen = [], []
+
+    assert kayit_kuyrugu.bosalt(eklenen.append, guncellenen.append) == 3
+    assert eklenen == [[["A", 1], ["C", 3]]]
+    assert guncellenen == [[(7, ["B", 2], None)]]
+    assert kayit_kuyrugu.sayilar() == {"bekleyen": 0, "gonderilen": 3, "hatali": 0}
+    assert kayit_kuyrugu.bosalt(eklenen.append, guncellenen.append) == 0
+
+
+def test_hedef_satirda_baska_hasta_varsa_kenara_alinir(kayit_kuyrugu):
+    kayit_kuyrugu.ekle(["H-1", 2], hedef_satir=2, beklenen_kimlik="H-1")
+    kayit_kuyrugu.ekle(["H-2", 3], hedef_satir=4, beklenen_kimlik="H-2")
+    # H-1'in yerel kopyadaki satır numarası eskimiş: sheet'te önüne bir satır eklenmiş
+    sheet = SahteWorksheet(gecikme=0, basliklar=["ID", "Değer"])
+    sheet.append_rows([["H-9", 0], ["h-1 ", 1], ["H-2", 1]])
+
+    assert kayit_kuyrugu.bosalt(lambda satirlar: None, lambda hedefli: ortak.satirlari_guncelle(sheet, hedefli)) == 1
+    assert sheet.satirlar[1:] == [["H-9", 0], ["h-1 ", 1], ["H-2", 3]]
+    assert kayit_kuyrugu.sayilar() == {"bekleyen": 0, "gonderilen": 1, "hatali": 1}
+    (_, satir, hata), = kayit_kuyrugu.hatalilar()
+    assert satir == ["H-1", 2] and "H-9" in hata
+
+
+def test_bosalt_toplu_gonderim_siniri(kayit_kuyrugu):
+    kayit_kuyrugu.toplu_ekle([[i] for i in range(5)])
+    gonderimler = []
+    assert kayit_kuyrugu.bosalt(gonderimler.append, en_fazla=2) == 5
+    assert [len(g) for g in gonderimler] == [2, 2, 1]
+
+
+def test_bosalt_guncelleyici_yoksa_hata(kayit_kuyrugu):
+    kayit_kuyrugu.ekle(["B"], hedef_satir=3)
+    with pytest.raises(RuntimeError):
+        kayit_kuyrugu.bosalt(lambda satirlar: None)
+
+
+def test_bosalt_hatada_satirlar_bekler(kayit_kuyrugu):
+    kayit_kuyrugu.ekle(["A"])
+
+    def yazici(satirlar):
+        raise ConnectionError("bağlantı yok")
+
+    with pytest.raises(ConnectionError):
+        kayit_kuyrugu.bosalt(yazici)
+    assert kayit_kuyrugu.son_hata == "bağlantı yok"
+    assert kayit_kuyrugu.sayilar()["bekleyen"] == 1
+
+    gonderilen = []
+    assert kayit_kuyrugu.bosalt(gonderilen.append) == 1
+    assert gonderilen == [[["A"]]]
+    assert kayit_kuyrugu.son_hata is None
+
+
+def test_bosalt_kota_sirasini_bekler(tmp_path, monkeypatch):
+    simdi = [0.0]
+    kova = hiz_siniri.JetonKovasi("sheets_yazma", 60, saat=lambda: simdi[0], uyu=lambda s: None)
+    kova.geri_bas(12)
+    beklemeler = []
+    monkeypatch.setattr(kuyruk.time, "sleep", beklemeler.append)
+    kayit_kuyrugu = kuyruk.KayitKuyrugu(str(tmp_path / "kuyruk.db"), kota=kova)
+    kayit_kuyrugu.ekle(["A"])
+
+    kayit_kuyrugu.bosalt(lambda satirlar: None)
+    assert beklemeler[0] == pytest.approx(12)
+
+
+class SheetsHatasi(Exception):
+    """gspread APIError gibi: durum kodu response üzerinde."""
+
+    def __init__(self, kod):
+        super().__init__(f"HTTP {kod}")
+        self.response = type("Yanit", (), {"status_code": kod})()
+
+
+def _bozuk_satiri_reddeden(gonderilen):
+    def yazici(satirlar):
+        if ["BOZUK"] in satirlar:
+            raise SheetsHatasi(400)
+        gonderilen.extend(satirlar)
+    return yazici
+
+
+def test_reddedilen_satir_kenara_alinir(kayit_kuyrugu):
+    kayit_kuyrugu.toplu_ekle([["A"], ["BOZUK"], ["C"]])
+    gonderilen = []
+    yazici = _bozuk_satiri_reddeden(gonderilen)
+
+    for _ in range(kuyruk.EN_FAZLA_DENEME):
+        with pytest.raises(SheetsHatasi):
+            kayit_kuyrugu.bosalt(yazici)
+    # İlk ret tüm gönderimi, sonrakiler yalnızca bozuk satırı tek başına denedi
+    assert gonderilen == [["A"]]
+    assert kayit_kuyrugu.sayilar() == {"bekleyen": 1, "gonderilen": 1, "hatali": 1}
+
+    # Bozuk satır artık arkasındaki yazmaları bekletmez
+    assert kayit_kuyrugu.bosalt(yazici) == 1
+    assert gonderilen == [["A"], ["C"]]
+    assert [(satir, hata) for _, satir, hata in kayit_kuyrugu.hatalilar()] == [(["BOZUK"], "HTTP 400")]
+
+
+@pytest.mark.parametrize("hata", [ConnectionError("bağlantı yok"), SheetsHatasi(429), SheetsHatasi(503),
+                                  SheetsHatasi(403), RuntimeError("ayarlanmadı")])
+def test_gecici_hatalar_sayilmaz(kayit_kuyrugu, hata):
+    kayit_kuyrugu.ekle(["A"])
+
+    def yazici(satirlar):
+        raise hata
+
+    for _ in range(kuyruk.EN_FAZLA_DENEME + 2):
+        with pytest.raises(type(hata)):
+            kayit_kuyrugu.bosalt(yazici)
+    assert kayit_kuyrugu.sayilar()["hatali"] == 0
+    assert kayit_kuyrugu.sayilar()["bekleyen"] == 1
+
+
+def test_kenara_alinan_yeniden_denenir(kayit_kuyrugu):
+    kayit_kuyrugu.ekle(["BOZUK"])
+    for _ in range(kuyruk.EN_FAZLA_DENEME):
+        with pytest.raises(SheetsHatasi):
+            kayit_kuyrugu.bosalt(_bozuk_satiri_reddeden([]))
+    kayit_id, _, _ = kayit_kuyrugu.hatalilar()[0]
+
+    kayit_kuyrugu.yeniden_dene([kayit_id])
+    gonderilen = []
+    assert kayit_kuyrugu.bosalt(gonderilen.append) == 1
+    assert kayit_kuyrugu.sayilar() == {"bekleyen": 0, "gonderilen": 1, "hatali": 0}
@@ -0,0 +1,37 @@
+import okuma
+
+
+def test_birlestir_korunan_ve_bos_gelen():
+    veri = {"ID": "A", "HGB": 11.0, "PLT": 318, "CRP": 4.0, "MODEL": okuma.HIZLI_MODEL}
+    birlesik, degisenler, bos_gelenler = okuma.birlestir(veri, {"HGB": 9.0, "PLT": 294, "CRP": None}, {"HGB"})
+    assert birlesik["HGB"] == 11.0          # elle düzeltildi
+    assert birlesik["PLT"] == 294
+    assert birlesik["CRP"] == 4.0           # yine okunamadı, eski değer kalır
+    assert (degisenler, bos_gelenler) == (["PLT"], ["CRP"])
+    assert birlesik["MODEL"] == okuma.HIZLI_MODEL
+
+
+def test_birlestir_model_sutunu():
+    veri = {"PLT": 318, "CRP": 4.0, "RDW": 13.0, "MODEL": okuma.HIZLI_MODEL}
+    yeni = {"PLT": 294, "CRP": 3.5, "RDW": 13.0}
+    modeller = {"PLT": okuma.MODEL, "CRP": okuma.MODEL, "RDW": okuma.HIZLI_MODEL}
+    birlesik, degisenler, _ = okuma.birlestir(veri, yeni, (), modeller)
+    assert degisenler == ["PLT", "CRP"]
+    assert birlesik["MODEL"] == f"{okuma.HIZLI_MODEL} + {okuma.MODEL}(PLT, CRP)"
+    # Değişen yoksa MODEL olduğu gibi kalır
+    assert okuma.birlestir(veri, {"RDW": 13.0}, (), modeller)[0]["MODEL"] == okuma.HIZLI_MODEL
+
+
+def test_alanin_belgesi():
+    belgeler = {"hemo": b"h", "bio": b"b"}
+    assert okuma.alanin_belgesi(belgeler, "PLT") == "hemo"
+    assert okuma.alanin_belgesi(belgeler, "CRP") == "bio"
+    # Tek fotoğrafta iki belge de olabilir
+    assert okuma.alanin_belgesi({"hemo": b"h"}, "CRP") == "hemo"
+    assert okuma.alanin_belgesi({"bio": b"b"}, "PLT") == "bio"
+
+
+def test_hedefli_prompt_yalniz_istenen_alanlar():
+    prompt = okuma.hedefli_prompt(["PLT"])
+    assert '"PLT"' in prompt
+    assert '"HGB"' not in prompt
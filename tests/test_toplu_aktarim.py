@@ -0,0 +1,104 @@
+import pytest
+
+import baglanti
+import toplu_aktarim
+
+
+class SahteOkuma:
+    """okuma.hasta_oku yerine: okunan dosyaları sayar, istenen dosyada çalışmayı keser."""
+
+    def __init__(self, kesilecek=None):
+        self.okunanlar = []
+        self.kesilecek = kesilecek
+
+    def __call__(self, api_key, hemo_bytes, bio_bytes, yas_yil, yas_ay, on_isleme, **kwargs):
+        if hemo_bytes == self.kesilecek:
+            raise KeyboardInterrupt
+        self.okunanlar.append(hemo_bytes)
+        veri = {"ID": hemo_bytes.decode(), "HGB": 11.0, "PLT": 250, "MODEL": "sahte", "KAYNAK": "🤖 Model",
+                "YAS_YIL": yas_yil, "YAS_AY": yas_ay, "TOPLAM_AY": yas_yil * 12 + yas_ay}
+        return veri, [], []
+
+
+class SahteSayfa:
+    def __init__(self):
+        self.eklenen = []
+
+    def append_rows(self, satirlar, **kwargs):
+        self.eklenen.extend(satirlar)
+
+
+@pytest.fixture
+def klasor(tmp_path, monkeypatch):
+    fotograflar = tmp_path / "fotograflar"
+    fotograflar.mkdir()
+    for i in range(5):
+        (fotograflar / f"hasta{i}.jpg").write_bytes(f"H-{i}".encode())
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setenv("gcp_service_account", "{}")
+    monkeypatch.setattr(baglanti, "baglan", lambda *a, **k: None)
+    return fotograflar
+
+
+@pytest.fixture
+def sayfa(monkeypatch):
+    sayfa = SahteSayfa()
+    monkeypatch.setattr(baglanti, "sheets_ile", lambda islem, kota=None: islem(sayfa))
+    return sayfa
+
+
+def _calistir(klasor, tmp_path, *ek):
+    return toplu_aktarim.calistir(toplu_aktarim._argumanlar(
+        [str(klasor), "--cikti", str(tmp_path / "sonuc.csv"), "--eszamanli", "1", *ek]))
+
+
+def test_kesilen_calisma_kaldigi_yerden_devam_eder(klasor, tmp_path, monkeypatch, sayfa):
+    ilk = SahteOkuma(kesilecek=b"H-3")
+    monkeypatch.setattr(toplu_aktarim.okuma, "hasta_oku", ilk)
+    assert _calistir(klasor, tmp_path, "--sheet") == 130
+    assert ilk.okunanlar[:3] == [b"H-0", b"H-1", b"H-2"]
+    assert sayfa.eklenen == []      # Kesilen çalışmada sheet'e yazılmaz
+
+    ikinci = SahteOkuma()
+    monkeypatch.setattr(toplu_aktarim.okuma, "hasta_oku", ikinci)
+    assert _calistir(klasor, tmp_path, "--sheet") == 0
+    # Kesilmeden önce biten her dosya (sırası gelmemiş olsa da) kaydedildi; hiçbiri iki kez okunmaz
+    assert b"H-3" in ikinci.okunanlar
+    assert sorted(ilk.okunanlar + ikinci.okunanlar) == [f"H-{i}".encode() for i in range(5)]
+    assert sorted(satir[0] for satir in sayfa.eklenen) == [f"H-{i}" for i in range(5)]
+
+    # Üçüncü çalıştırma ne okur ne gönderir
+    ucuncu = SahteOkuma()
+    monkeypatch.setattr(toplu_aktarim.okuma, "hasta_oku", ucuncu)
+    assert _calistir(klasor, tmp_path, "--sheet") == 0
+    assert ucuncu.okunanlar == []
+    assert len(sayfa.eklenen) == 5
+
+
+def test_degisen_dosya_yeniden_okunur(klasor, tmp_path, monkeypatch):
+    monkeypatch.setattr(toplu_aktarim.okuma, "hasta_oku", SahteOkuma())
+    assert _calistir(klasor, tmp_path) == 0
+    (klasor / "hasta1.jpg").write_bytes(b"H-1-yeni")
+
+    okuma = SahteOkuma()
+    monkeypatch.setattr(toplu_aktarim.okuma, "hasta_oku", okuma)
+    assert _calistir(klasor, tmp_path) == 0
+    assert okuma.okunanlar == [b"H-1-yeni"]
+
+
+def test_kuyruga_yazarken_cokerse_iki_kez_gonderilmez(klasor, tmp_path, monkeypatch, sayfa):
+    monkeypatch.setattr(toplu_aktarim.okuma, "hasta_oku", SahteOkuma())
+    asil = toplu_aktarim.Ilerleme.sheete_aktarildi
+
+    def cokme(self, db, anahtarlar):
+        raise RuntimeError("süreç öldü")
+
+    monkeypatch.setattr(toplu_aktarim.Ilerleme, "sheete_aktarildi", cokme)
+    with pytest.raises(RuntimeError):
+        _calistir(klasor, tmp_path, "--sheet")
+    assert sayfa.eklenen == []
+
+    monkeypatch.setattr(toplu_aktarim.Ilerleme, "sheete_aktarildi", asil)
+    assert _calistir(klasor, tmp_path, "--sheet") == 0
+    assert _calistir(klasor, tmp_path, "--sheet") == 0
+    assert sorted(satir[0] for satir in sayfa.eklenen) == [f"H-{i}" for i in range(5)]
@@ -0,0 +1,326 @@
+# --- ARŞİV FOTOĞRAFLARINI ARAYÜZSÜZ TOPLU OKUMA ---
+# Binlerce arşiv fotoğrafını tek tek arayüzden okutmak yerine komut satırından:
+#
+#   python toplu_aktarim.py fotograflar/ --cikti sonuc.csv
+#   python toplu_aktarim.py liste.csv --cikti sonuc.parquet --eszamanli 8 --sheet
+#
+# Girdi bir klasör (her fotoğraf bir hasta, belge türü bilinmediği için birleşik okuma,
+# yaş 0) ya da Toplu Giriş sayfasıyla aynı sütunlara sahip bir liste olabilir:
+#   HEMOGRAM, BIYOKIMYA (liste dosyasına göre yol), YAS_YIL, YAS_AY
+# Klasörden yaş girilecek liste şablonu: python toplu_aktarim.py fotograflar/ --sablon liste.csv
+#
+# Her biten hasta ilerleme dosyasına (SQLite) yazılır; yarıda kesilen çalışma aynı komutla
+# kaldığı yerden devam eder. --sheet ile başarılı satırlar aynı dosyadaki kayıt kuyruğu
+# üzerinden sheet'e eklenir; gönderilemeyenler bir sonraki çalıştırmada tekrar denenir.
+# Gemini anahtarı ve servis hesabı GEMINI_API_KEY / .streamlit/secrets.toml'dan okunur.
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+
+try:
+    import tomllib
+except ModuleNotFoundError:     # Python < 3.11
+    import tomli as tomllib
+
+import pandas as pd
+
+import baglanti
+import goruntu
+import hiz_siniri
+import kuyruk
+import okuma
+import olcum
+from alanlar import SUTUNLAR, satira_cevir
+
+UZANTILAR = (".jpg", ".jpeg", ".png", ".webp")
+SHEET_NAME = "Hasta Takip"
+LISTE_SUTUNLARI = ["HEMOGRAM", "BIYOKIMYA", "YAS_YIL", "YAS_AY"]
+
+
+def _argumanlar(argv):
+    p = argparse.ArgumentParser(prog="python toplu_aktarim.py", description="Lab fotoğraflarını toplu oku")
+    p.add_argument("girdi", help="Fotoğraf klasörü ya da liste (CSV)")
+    p.add_argument("--cikti", help="Sonuç dosyası (.csv ya da .parquet)")
+    p.add_argument("--sablon", help="Klasördeki fotoğraflardan yaş girilecek liste şablonu yaz ve çık")
+    p.add_argument("--ilerleme", help="İlerleme dosyası (varsayılan: <cikti>.ilerleme.db)")
+    p.add_argument("--eszamanli", type=int, default=4, help="Aynı anda okunan hasta sayısı")
+    p.add_argument("--sheet", action="store_true", help="Başarılı satırları Google Sheets'e de ekle")
+    p.add_argument("--hatalilari-atla", action="store_true", help="Önceki çalıştırmada hata alanları yeniden deneme")
+    p.add_argument("--yalniz-pro", action="store_true", help="Kademeli okuma yerine yalnız Pro model")
+    p.add_argument("--onbellegi-atla", action="store_true")
+    p.add_argument("--uzun-kenar", type=int, default=2048)
+    p.add_argument("--format", choices=["JPEG", "WEBP"], default="JPEG")
+    p.add_argument("--kalite", type=int, default=85)
+    p.add_argument("--renkli", action="store_true", help="Gri tonlamaya çevirme")
+    args = p.parse_args(argv)
+    if not args.sablon and not args.cikti:
+        p.error("--cikti ya da --sablon gerekli")
+    # Parquet motoru yoksa hata bütün toplu okuma bittikten sonra değil, başlamadan verilsin
+    if args.cikti and args.cikti.lower().endswith(".parquet") and not _parquet_destegi():
+        p.error("Parquet çıktısı için pyarrow gerekli (pip install pyarrow); ya da --cikti sonuc.csv kullanın")
+    return args
+
+
+def _parquet_destegi():
+    return any(importlib.util.find_spec(motor) for motor in ("pyarrow", "fastparquet"))
+
+
+def _gizli(ad):
+    """Önce ortam değişkeni, yoksa uygulamanın .streamlit/secrets.toml dosyası."""
+    if ad in os.environ:
+        return os.environ[ad]
+    for klasor in (os.getcwd(), os.path.dirname(os.path.abspath(__file__))):
+        yol = os.path.join(klasor, ".streamlit", "secrets.toml")
+        if os.path.exists(yol):
+            with open(yol, "rb") as f:
+                deger = tomllib.load(f).get(ad)
+            if deger is not None:
+                return deger
+    return None
+
+
+# --- GİRDİ: KLASÖR YA DA LİSTE ---
+def hastalari_oku(girdi):
+    """Her hasta için {HEMOGRAM, BIYOKIMYA, YAS_YIL, YAS_AY}; yollar mutlak."""
+    if os.path.isdir(girdi):
+        adlar = sorted(ad for ad in os.listdir(girdi) if ad.lower().endswith(UZANTILAR))
+        return [
+            {"HEMOGRAM": os.path.join(os.path.abspath(girdi), ad), "BIYOKIMYA": None, "YAS_YIL": 0, "YAS_AY": 0}
+            for ad in adlar
+        ]
+
+    liste = pd.read_csv(girdi, dtype={"HEMOGRAM": "string", "BIYOKIMYA": "string"})
+    eksik = [s for s in LISTE_SUTUNLARI if s not in liste.columns]
+    if eksik:
+        sys.exit(f"{girdi}: eksik sütun(lar): {', '.join(eksik)}")
+    kok = os.path.dirname(os.path.abspath(girdi))
+
+    def _yol(deger):
+        return os.path.join(kok, deger) if pd.notna(deger) and deger else None
+
+    return [
+        {
+            "HEMOGRAM": _yol(satir.HEMOGRAM),
+            "BIYOKIMYA": _yol(satir.BIYOKIMYA),
+            "YAS_YIL": int(satir.YAS_YIL) if pd.notna(satir.YAS_YIL) else 0,
+            "YAS_AY": int(satir.YAS_AY) if pd.notna(satir.YAS_AY) else 0,
+        }
+        for satir in liste.itertuples()
+    ]
+
+
+def _anahtar(hasta):
+    # Dosya değişirse (boyut/zaman) ya da yaş düzeltilirse hasta yeniden okunur
+    parcalar = [str(hasta["YAS_YIL"]), str(hasta["YAS_AY"])]
+    for tur in ("HEMOGRAM", "BIYOKIMYA"):
+        yol = hasta[tur]
+        if yol:
+            durum = os.stat(yol)
+            parcalar += [yol, str(durum.st_size), str(durum.st_mtime_ns)]
+        else:
+            parcalar.append("-")
+    return hashlib.sha1("|".join(parcalar).encode("utf-8")).hexdigest()
+
+
+# --- İLERLEME (KALDIĞI YERDEN DEVAM) ---
+class Ilerleme:
+    def __init__(self, yol):
+        self.yol = yol
+        with closing(self._baglan()) as db, db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS sonuclar (
+                    anahtar TEXT PRIMARY KEY,
+                    durum TEXT NOT NULL,
+                    veri TEXT,
+                    hata TEXT,
+                    sheet INTEGER NOT NULL DEFAULT 0,
+                    zaman REAL NOT NULL
+                )
+            """)
+
+    def _baglan(self):
+        return sqlite3.connect(self.yol, timeout=30)
+
+    def tamamlananlar(self, hatalilar_dahil):
+        durumlar = ("basarili", "hata") if hatalilar_dahil else ("basarili",)
+        with closing(self._baglan()) as db:
+            return {
+                k[0] for k in db.execute(
+                    f"SELECT anahtar FROM sonuclar WHERE durum IN ({','.join('?' * len(durumlar))})", durumlar)
+            }
+
+    def yaz(self, anahtar, veri=None, hata=None):
+        with closing(self._baglan()) as db, db:
+            db.execute(
+                "INSERT OR REPLACE INTO sonuclar (anahtar, durum, veri, hata, zaman) VALUES (?, ?, ?, ?, ?)",
+                (anahtar, "hata" if hata else "basarili",
+                 json.dumps(veri, ensure_ascii=False, default=str) if veri is not None else None, hata, time.time()),
+            )
+
+    def sonuclar(self):
+        with closing(self._baglan()) as db:
+            return {k[0]: (json.loads(k[1]) if k[1] else None, k[2])
+                    for k in db.execute("SELECT anahtar, veri, hata FROM sonuclar")}
+
+    def sheete_aktarilacaklar(self, anahtarlar):
+        with closing(self._baglan()) as db:
+            return [
+                (k[0], json.loads(k[1]))
+                for k in db.execute("SELECT anahtar, veri FROM sonuclar WHERE durum = 'basarili' AND sheet = 0")
+                if k[0] in anahtarlar
+            ]
+
+    def sheete_aktarildi(self, db, anahtarlar):
+        """Kayıt kuyruğunun işlemi içinde çağrılır (aynı dosya): satırlar ya kuyruğa girip işaretlenir ya hiçbiri."""
+        db.executemany("UPDATE sonuclar SET sheet = 1 WHERE anahtar = ?", [(a,) for a in anahtarlar])
+
+
+# --- OKUMA ---
+def _hasta_oku(api_key, hasta, on_isleme, modeller, onbellegi_atla):
+    def _bayt(yol):
+        if not yol:
+            return None
+        with open(yol, "rb") as f:
+            return f.read()
+
+    olcum_kaydi = olcum.Olcum("toplu_aktarim")
+    try:
+        veri, uyarilar, _ = olcum_kaydi.calistir(
+            okuma.hasta_oku,
+            api_key,
+            _bayt(hasta["HEMOGRAM"]),
+            _bayt(hasta["BIYOKIMYA"]),
+            hasta["YAS_YIL"], hasta["YAS_AY"], on_isleme,
+            # Klasör girdisinde belge türü bilinmez: tek fotoğraf tüm alanlarla okunur
+            ayri_oku=bool(hasta["HEMOGRAM"] and hasta["BIYOKIMYA"]),
+            onbellegi_atla=onbellegi_atla, modeller=modeller,
+        )
+    except Exception as e:
+        olcum_kaydi.sonuclandir("hata", hata=type(e).__name__)
+        raise
+    olcum_kaydi.sonuclandir("basarili", model=veri.get("MODEL"), onbellek=veri["KAYNAK"] == "🗂️ Önbellek")
+    veri["DURUM"] = " | ".join(uyarilar)
+    return veri
+
+
+def _sheete_yaz(ilerleme, anahtarlar):
+    sheets_secrets = _gizli("gcp_service_account")
+    if not sheets_secrets:
+        print("Servis hesabı bulunamadı (gcp_service_account); sheet'e yazılmadı.", file=sys.stderr)
+        return
+    baglanti.baglan(sheets_secrets, SHEET_NAME)
+    kayit_kuyrugu = kuyruk.KayitKuyrugu(ilerleme.yol, kota=hiz_siniri.get_kova("sheets_yazma"))
+    aktarilacak = ilerleme.sheete_aktarilacaklar(anahtarlar)
+    if aktarilacak:
+        # Kuyruğa yazma ve "aktarıldı" işareti tek işlemde: arada çökerse satırlar iki kez eklenmez
+        kayit_kuyrugu.toplu_ekle(
+            [satira_cevir(veri) for _, veri in aktarilacak],
+            ayni_islemde=lambda db: ilerleme.sheete_aktarildi(db, [anahtar for anahtar, _ in aktarilacak]),
+        )
+    try:
+        gonderilen = kayit_kuyrugu.bosalt(
+            lambda satirlar: baglanti.sheets_ile(lambda sheet: sheet.append_rows(satirlar), kota="sheets_yazma"))
+    except Exception as e:
+        print(f"Sheet'e gönderilemedi ({e}); satırlar kuyrukta, tekrar çalıştırınca gönderilir.", file=sys.stderr)
+        return
+    print(f"Sheet: {gonderilen} satır eklendi.", file=sys.stderr)
+
+
+def _cikti_yaz(yol, hastalar, anahtarlar, sonuclar):
+    satirlar = []
+    for hasta, anahtar in zip(hastalar, anahtarlar):
+        veri, hata = sonuclar.get(anahtar, (None, "okunmadı"))
+        satir = {"HEMOGRAM": hasta["HEMOGRAM"], "BIYOKIMYA": hasta["BIYOKIMYA"]}
+        satir.update({sutun: (veri or {}).get(sutun) for sutun in SUTUNLAR})
+        satir.update(YAS_YIL=hasta["YAS_YIL"], YAS_AY=hasta["YAS_AY"],
+                     DURUM=(veri or {}).get("DURUM", ""), HATA=hata or "")
+        satirlar.append(satir)
+    df = pd.DataFrame(satirlar)
+    if yol.lower().endswith(".parquet"):
+        df.to_parquet(yol, index=False)
+    else:
+        df.to_csv(yol, index=False)
+
+
+def calistir(args):
+    hastalar = hastalari_oku(args.girdi)
+    if not hastalar:
+        sys.exit(f"{args.girdi}: okunacak fotoğraf yok")
+
+    if args.sablon:
+        kok = os.path.dirname(os.path.abspath(args.sablon))
+        pd.DataFrame([
+            {**h, "HEMOGRAM": os.path.relpath(h["HEMOGRAM"], kok), "BIYOKIMYA": ""} for h in hastalar
+        ])[LISTE_SUTUNLARI].to_csv(args.sablon, index=False)
+        print(f"{args.sablon}: {len(hastalar)} satır; yaşları ve biyokimya eşleşmelerini doldurun.", file=sys.stderr)
+        return 0
+
+    api_key = _gizli("GEMINI_API_KEY")
+    if not api_key:
+        sys.exit("GEMINI_API_KEY bulunamadı (ortam değişkeni ya da .streamlit/secrets.toml)")
+
+    ilerleme = Ilerleme(args.ilerleme or args.cikti + ".ilerleme.db")
+    anahtarlar = [_anahtar(h) for h in hastalar]
+    tamamlanan = ilerleme.tamamlananlar(hatalilar_dahil=args.hatalilari_atla)
+    bekleyen = [(h, a) for h, a in zip(hastalar, anahtarlar) if a not in tamamlanan]
+    print(f"{len(hastalar)} hasta · {len(hastalar) - len(bekleyen)} önceki çalıştırmada tamamlanmış · "
+          f"{len(bekleyen)} okunacak", file=sys.stderr)
+
+    on_isleme = goruntu.OnIslemeAyarlari(
+        uzun_kenar=args.uzun_kenar, gri=not args.renkli, format=args.format, kalite=args.kalite
+    )
+    modeller = [okuma.MODEL] if args.yalniz_pro else okuma.MODEL_KADEMELERI
+    hatali = 0
+    baslangic = time.perf_counter()
+    havuz = ThreadPoolExecutor(max_workers=args.eszamanli)
+    gelecekler, islenen = {}, set()
+    try:
+        gelecekler = {
+            havuz.submit(_hasta_oku, api_key, hasta, on_isleme, modeller, args.onbellegi_atla): (hasta, anahtar)
+            for hasta, anahtar in bekleyen
+        }
+        for sira, gelecek in enumerate(as_completed(gelecekler), start=1):
+            islenen.add(gelecek)
+            hasta, anahtar = gelecekler[gelecek]
+            ad = os.path.basename(hasta["HEMOGRAM"] or hasta["BIYOKIMYA"])
+            try:
+                veri = gelecek.result()
+            except Exception as e:
+                hatali += 1
+                ilerleme.yaz(anahtar, hata=f"{type(e).__name__}: {e}")
+                print(f"[{sira}/{len(bekleyen)}] {ad}: HATA {e}", file=sys.stderr)
+                continue
+            ilerleme.yaz(anahtar, veri=veri)
+            gecen = time.perf_counter() - baslangic
+            print(f"[{sira}/{len(bekleyen)}] {ad}: {veri.get('ID')} · {sira / gecen:.2f} hasta/sn", file=sys.stderr)
+    except KeyboardInterrupt:
+        havuz.shutdown(wait=False, cancel_futures=True)
+        # Sırası gelmeden biten okumalar da kaydedilsin; devamda yeniden okunmasınlar
+        for gelecek, (_, anahtar) in gelecekler.items():
+            if gelecek not in islenen and gelecek.done() and not gelecek.cancelled() and gelecek.exception() is None:
+                ilerleme.yaz(anahtar, veri=gelecek.result())
+        print("\nDurduruldu; aynı komutla kaldığı yerden devam edebilirsiniz.", file=sys.stderr)
+        return 130
+    havuz.shutdown()
+
+    _cikti_yaz(args.cikti, hastalar, anahtarlar, ilerleme.sonuclar())
+    print(f"{args.cikti}: {len(hastalar)} satır ({hatali} hatalı)", file=sys.stderr)
+    if args.sheet:
+        _sheete_yaz(ilerleme, set(anahtarlar))
+    return 1 if hatali else 0
+
+
+def main(argv=None):
+    sys.exit(calistir(_argumanlar(argv)))
+
+
+if __name__ == "__main__":
+    main()